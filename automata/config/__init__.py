@@ -8,6 +8,7 @@ Environment variables:
 - CONVERSATION_DB_PATH: The abs path to use for storing conversation data.
 - TASK_DB_PATH: The output path for new tasks.
 - MAX_WORKERS: The maximum number of workers to run concurrently.
+- SYMBOL_GRAPH_CACHE_DIR: The directory used to persist built symbol graphs. Caching is disabled when unset.
 
 Note that the environment variables are loaded from a .env file using the `load_dotenv()` function from the `dotenv` library.
 """
@@ -28,3 +29,4 @@ TASK_DB_PATH = os.getenv("TASK_DB_PATH", os.path.join("..", "task_db.sqlite3"))
 TASK_OUTPUT_PATH = os.getenv("TASKS_OUTPUT_PATH", os.path.join("..", "local_tasks"))
 REPOSITORY_NAME = os.getenv("REPOSITORY_NAME", "emrgnt-cmplxty/Automata")
 MAX_WORKERS = int(os.getenv("MAX_WORKERS", 8))
+SYMBOL_GRAPH_CACHE_DIR = os.getenv("SYMBOL_GRAPH_CACHE_DIR")
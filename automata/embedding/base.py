@@ -1,7 +1,7 @@
 import abc
 import logging
 from enum import Enum
-from typing import Any, Dict, Sequence
+from typing import Any, Dict, List, Sequence
 
 import numpy as np
 
@@ -24,6 +24,10 @@ class EmbeddingVectorProvider(abc.ABC):
     def build_embedding_vector(self, symbol_source: str) -> np.ndarray:
         pass
 
+    def batch_build_embedding_vector(self, symbol_sources: List[str]) -> List[np.ndarray]:
+        """Builds the embeddings of several sources, providers which batch requests override it"""
+        return [self.build_embedding_vector(symbol_source) for symbol_source in symbol_sources]
+
 
 class Embedding(abc.ABC):
     """Abstract base class for different types of embeddings"""
@@ -121,6 +125,25 @@ class EmbeddingSimilarityCalculator:
 
         return similarity_dict
 
+    def calculate_query_similarity_matrix(
+        self, ordered_embeddings: Sequence[Embedding], query_texts: List[str]
+    ) -> np.ndarray:
+        """
+        Calculates the similarity of several queries to the embeddings at once, the queries
+        being embedded in a single batch.
+
+        Returns:
+            An array with a row per query and a column per embedding, in the given orders.
+        """
+        query_embedding_vectors = np.array(
+            self.embedding_provider.batch_build_embedding_vector(query_texts)
+        )
+        embeddings_norm = self._normalize_embeddings(
+            np.array([ele.vector for ele in ordered_embeddings]), self.norm_type
+        )
+        queries_norm = self._normalize_embeddings(query_embedding_vectors, self.norm_type)
+        return np.dot(queries_norm, embeddings_norm.T)
+
     def _calculate_embedding_similarity(
         self, ordered_embeddings: np.ndarray, embedding_array: np.ndarray
     ) -> np.ndarray:
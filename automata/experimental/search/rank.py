@@ -1,10 +1,43 @@
-from typing import Dict, Hashable, List, Optional, Tuple
+import hashlib
+import heapq
+import logging
+import os
+import pickle
+import time
+from collections import deque
+from enum import Enum
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
 import networkx as nx
+import numpy as np
 from networkx.exception import NetworkXError
 from pydantic import BaseModel
+from scipy import sparse
 
 from automata.symbol.base import Symbol
+from automata.symbol.parser import parse_symbol
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolRankEngine(Enum):
+    """The implementation of the SymbolRank power iteration."""
+
+    # Iterates over the adjacency of a stochastic `DiGraph` in python
+    PYTHON = "python"
+    # Iterates with sparse matrix-vector products over a CSR transition matrix
+    SPARSE = "sparse"
 
 
 class SymbolRankConfig(BaseModel):
@@ -14,12 +47,26 @@ class SymbolRankConfig(BaseModel):
     max_iterations: int = 100
     tolerance: float = 1.0e-6
     weight_key: str = "weight"
+    engine: SymbolRankEngine = SymbolRankEngine.SPARSE
+    # If set, the iteration also stops once the order of this many top ranks is unchanged
+    # for `top_k_stability_iterations` consecutive iterations
+    top_k_stability: Optional[int] = None
+    top_k_stability_iterations: int = 3
+    # The residual per out-edge below which the approximate ranks stop pushing from a node
+    push_residual_threshold: float = 1.0e-5
+    # The number of most similar symbols the approximate ranks are personalized to
+    push_seed_count: int = 32
+    # The number of largest ranks kept in the basis vector of each node of a `SymbolRankBasis`
+    rank_basis_size: int = 256
+    # The number of most similar symbols whose basis vectors make up the ranks of a query
+    rank_basis_seed_count: int = 256
 
     @staticmethod
     def validate_config(config) -> None:
         """
         Raises:
-            ValueError: If alpha is not in (0, 1), or tolerance is not in (1e-4, 1e-8).
+            ValueError: If alpha is not in (0, 1), or tolerance is not in (1e-4, 1e-8),
+                or the top-k stability rule is set with a non-positive k.
         """
         if not 0 < config.alpha < 1:
             raise ValueError(f"alpha must be in (0,1), but got {config.alpha}")
@@ -27,20 +74,236 @@ class SymbolRankConfig(BaseModel):
         if not 1.0e-8 < config.tolerance < 1.0e-4:
             raise ValueError(f"tolerance must be in (1e-4,1e-8), but got {config.tolerance}")
 
+        if config.top_k_stability is not None and config.top_k_stability < 1:
+            raise ValueError(f"top_k_stability must be positive, but got {config.top_k_stability}")
+
+
+def get_graph_cache_key(graph: nx.DiGraph, config: SymbolRankConfig, *option_names: str) -> str:
+    """Computes a cache key for ranks derived from a graph, from its edges and the config."""
+    hasher = hashlib.sha256()
+    for option_name in option_names:
+        hasher.update(f"{option_name}={getattr(config, option_name)}".encode())
+    for node in graph:
+        hasher.update(f"node={node}".encode())
+    for source, target, weight in graph.edges(data=config.weight_key, default=1):
+        hasher.update(f"edge={source}>{target}={weight}".encode())
+    return hasher.hexdigest()
+
+
+class SymbolRankStats(NamedTuple):
+    """The statistics of a SymbolRank power iteration."""
+
+    iterations: int
+    # The L1 change of the ranks at each iteration, the largest one over the queries of a batch
+    residuals: List[float]
+    wall_time: float
+    node_count: int
+    # Whether the change of the ranks fell below the tolerance
+    converged: bool
+    # Whether the iteration stopped because the order of the top ranks was stable
+    top_k_stable: bool
+
+
+class _IterationMonitor:
+    """Records the statistics of an iteration, and applies the top-k stability rule."""
+
+    def __init__(self, node_count: int, config: "SymbolRankConfig") -> None:
+        self.node_count = node_count
+        self.config = config
+        self.residuals: List[float] = []
+        self.start_time = time.perf_counter()
+        self._last_top: Optional[Tuple] = None
+        self._stable_iterations = 0
+
+    def record(self, residual: float) -> None:
+        self.residuals.append(float(residual))
+
+    def is_top_k_stable(self, get_top: Callable[[int], Tuple]) -> bool:
+        """Whether the top ranks given by `get_top(k)` kept their order for long enough."""
+        if self.config.top_k_stability is None:
+            return False
+        top = get_top(self.config.top_k_stability)
+        self._stable_iterations = self._stable_iterations + 1 if top == self._last_top else 0
+        self._last_top = top
+        return self._stable_iterations >= self.config.top_k_stability_iterations
+
+    def get_stats(self, converged: bool, top_k_stable: bool = False) -> SymbolRankStats:
+        return SymbolRankStats(
+            len(self.residuals),
+            self.residuals,
+            time.perf_counter() - self.start_time,
+            self.node_count,
+            converged,
+            top_k_stable,
+        )
+
+
+def to_persisted_node(node: Hashable) -> Tuple[bool, Hashable]:
+    """
+    Converts a graph node to the form in which ranks are persisted. Symbols are stored by
+    their URI, so that loading them does not depend on the process which stored them.
+    """
+    return (True, node.uri) if isinstance(node, Symbol) else (False, node)
 
-class SymbolRank:
-    """Computes the PageRank algorithm on symbols in a graph"""
 
-    def __init__(self, graph: nx.DiGraph, config: SymbolRankConfig) -> None:
+def from_persisted_node(persisted_node: Tuple[bool, Hashable]) -> Hashable:
+    """Converts a node stored by `to_persisted_node` back to a graph node."""
+    is_symbol, node = persisted_node
+    return parse_symbol(cast(str, node)) if is_symbol else node
+
+
+class ApproximateRank(NamedTuple):
+    """
+    An approximate SymbolRank, whose exact value lies in [rank, rank + error_bound] for
+    the personalization restricted to the seed symbols.
+    """
+
+    symbol: Symbol
+    rank: float
+    error_bound: float
+
+
+class TransitionStructure(NamedTuple):
+    """The transition structure of a graph, as iterated by the sparse engine."""
+
+    # The nodes of the graph, in the order of the rows and columns of the matrix
+    nodes: List[Hashable]
+    node_indices: Dict[Hashable, int]
+    # The transposed, row-normalized transition matrix
+    matrix: sparse.csr_matrix
+    dangling_indices: np.ndarray
+
+
+class SymbolRank:
+    """
+    Computes the PageRank algorithm on symbols in a graph
+
+    The transition structure of the graph is prepared on the first query and reused by
+    the following ones, so `invalidate` must be called after the graph is modified,
+    unless it was modified through `update_edges` or replaced through `update_graph`.
+
+    The sparse engine keeps the last converged ranks of each warm start key, and starts
+    the next query with the same key from them rather than from uniform ranks.
+
+    The statistics of the last power iteration are kept in `last_stats`, and passed to
+    the `stats_callback` when one is given, including for iterations which fail.
+
+    The global ranks, which are not personalized to a query, are computed once per graph
+    and kept until it changes. They are also persisted in `global_rank_dir` when given,
+    keyed by the graph and by every option of the config which affects them.
+    """
+
+    WARM_START_CACHE_SIZE = 128
+    GLOBAL_RANK_CACHE_VERSION = 2
+    GLOBAL_RANK_MAGIC = b"AUTOMATA-GLOBAL-SYMBOL-RANK"
+    # The options of the config which the global ranks depend on
+    GLOBAL_RANK_OPTIONS = (
+        "alpha",
+        "max_iterations",
+        "tolerance",
+        "weight_key",
+        "engine",
+        "top_k_stability",
+        "top_k_stability_iterations",
+    )
+
+    def __init__(
+        self,
+        graph: nx.DiGraph,
+        config: SymbolRankConfig,
+        stats_callback: Optional[Callable[[SymbolRankStats], None]] = None,
+        global_rank_dir: Optional[str] = None,
+    ) -> None:
         self.graph = graph
         self.config = config
         self.config.validate_config(self.config)
+        self.stats_callback = stats_callback
+        self.global_rank_dir = global_rank_dir
+        self._global_ranks: Optional[List[Tuple[Symbol, float]]] = None
+        self._global_rank_lookup: Optional[Dict[Symbol, float]] = None
+        # Whether the persisted global ranks of the current graph were already looked up
+        self._global_ranks_loaded = False
+        self.last_stats: Optional[SymbolRankStats] = None
+        self._transition_structure: Optional[TransitionStructure] = None
+        self._stochastic_graph: Optional[nx.DiGraph] = None
+        self._dangling_nodes: Optional[List[Hashable]] = None
+        # The row-normalized transition matrix, for pushing along the out-edges of a node
+        self._forward_matrix: Optional[sparse.csr_matrix] = None
+        # Maps a warm start key to the nodes and the ranks the last query with it converged to
+        self._warm_starts: Dict[Hashable, Tuple[List[Hashable], np.ndarray]] = {}
+
+    @property
+    def transition_structure(self) -> TransitionStructure:
+        if self._transition_structure is None:
+            self._transition_structure = self._prepare_transition_structure()
+        return self._transition_structure
+
+    def invalidate(self) -> None:
+        """Discards the prepared transition structure, e.g. after the graph was modified."""
+        self._transition_structure = None
+        self._stochastic_graph = None
+        self._dangling_nodes = None
+        self._forward_matrix = None
+        self._global_ranks = None
+        self._global_rank_lookup = None
+        self._global_ranks_loaded = False
+
+    def update_graph(self, graph: nx.DiGraph) -> None:
+        """
+        Replaces the graph, e.g. by a rankable subgraph rebuilt after an index update.
+        The warm starts are kept, and are renormalized over the nodes of the new graph.
+        """
+        self.graph = graph
+        self.invalidate()
+
+    def update_edges(
+        self,
+        added_edges: Iterable[Tuple] = (),
+        removed_edges: Iterable[Tuple] = (),
+    ) -> None:
+        """
+        Adds and removes edges of the graph and updates the prepared transition structure
+        in place, by recomputing only the transitions out of the sources of the changed
+        edges. The structure is invalidated instead when the nodes of the graph change.
+
+        Args:
+            added_edges: The edges to add, as (source, target) or (source, target, data).
+            removed_edges: The (source, target) edges to remove.
+        """
+        added_edges, removed_edges = list(added_edges), list(removed_edges)
+        node_count = self.graph.number_of_nodes()
+        self.graph.add_edges_from(added_edges)
+        self.graph.remove_edges_from(removed_edges)
+        if self.graph.number_of_nodes() != node_count or not self.graph.is_directed():
+            self.invalidate()
+            return
+
+        sources = {edge[0] for edge in added_edges + removed_edges}
+        transition_weights = {source: self._get_transition_weights(source) for source in sources}
+        if self._transition_structure is not None:
+            self._transition_structure = self._update_transition_structure(
+                self._transition_structure, transition_weights
+            )
+            self._forward_matrix = None
+        self._global_ranks = None
+        self._global_rank_lookup = None
+        self._global_ranks_loaded = False
+        if self._stochastic_graph is not None:
+            for source, weights in transition_weights.items():
+                self._stochastic_graph.remove_edges_from(
+                    list(self._stochastic_graph.out_edges(source))
+                )
+                for target, weight in weights.items():
+                    data = {**self.graph[source][target], self.config.weight_key: weight}
+                    self._stochastic_graph.add_edge(source, target, **data)
+            self._dangling_nodes = self._get_dangling_nodes(self._stochastic_graph)
 
     def get_ranks(
         self,
         query_to_symbol_similarity: Optional[Dict[Symbol, float]] = None,
         initial_weights: Optional[Dict[Symbol, float]] = None,
         dangling: Optional[Dict[Symbol, float]] = None,
+        warm_start_key: Optional[Hashable] = None,
     ) -> List[Tuple[Symbol, float]]:
         # sourcery skip: inline-immediately-returned-variable, use-dict-items
         """
@@ -67,8 +330,22 @@ class SymbolRank:
         their  connectivity within the graph. This amalgamation of natural language processing,
         information retrieval, and graph theory methods results in a ranking of code symbols,
         significantly aiding tasks like code understanding, navigation, recommendation, and search.
+
+        Queries which are repeated, e.g. after the graph was updated, can pass a
+        `warm_start_key` identifying their personalization, so that the sparse engine starts
+        from the ranks the previous query with the key converged to. It is ignored when
+        `initial_weights` are given.
         """
-        stochastic_graph = self._prepare_graph()
+        if self.config.engine == SymbolRankEngine.SPARSE:
+            return self._get_sparse_ranks(
+                query_to_symbol_similarity, initial_weights, dangling, warm_start_key
+            )
+
+        monitor = _IterationMonitor(self.graph.number_of_nodes(), self.config)
+        if self._stochastic_graph is None or self._dangling_nodes is None:
+            self._stochastic_graph = self._prepare_graph()
+            self._dangling_nodes = self._get_dangling_nodes(self._stochastic_graph)
+        stochastic_graph, dangling_nodes = self._stochastic_graph, self._dangling_nodes
         node_count = stochastic_graph.number_of_nodes()
 
         rank_vec = self._prepare_initial_ranks(stochastic_graph, initial_weights)
@@ -76,7 +353,6 @@ class SymbolRank:
             node_count, stochastic_graph, query_to_symbol_similarity
         )
         dangling_weights = self._prepare_dangling_weights(dangling, prepared_similarity)
-        dangling_nodes = self._get_dangling_nodes(stochastic_graph)
 
         for _ in range(self.config.max_iterations):
             last_rank_vec = rank_vec
@@ -95,15 +371,383 @@ class SymbolRank:
                 )
 
             err = sum(abs(rank_vec[node] - last_rank_vec[node]) for node in rank_vec)
-            if err < node_count * self.config.tolerance:
+            monitor.record(err)
+            converged = err < node_count * self.config.tolerance
+            if converged or monitor.is_top_k_stable(
+                lambda k: tuple(heapq.nlargest(k, rank_vec, key=rank_vec.get))  # type: ignore
+            ):
+                self._set_stats(monitor.get_stats(converged, not converged))
                 sorted_dict = sorted(rank_vec.items(), key=lambda x: x[1], reverse=True)
                 return sorted_dict
 
+        self._set_stats(monitor.get_stats(False))
         raise NetworkXError(
             "SymbolRank: power iteration failed to converge in %d iterations."
             % self.config.max_iterations
         )
 
+    def get_ranks_batch(
+        self,
+        query_to_symbol_similarities: np.ndarray,
+        symbols: Optional[Sequence[Symbol]] = None,
+        top_k: Optional[int] = None,
+    ) -> List[List[Tuple[Symbol, float]]]:
+        """
+        Calculates the SymbolRanks of several queries at once, iterating all of them together
+        with products of the sparse transition matrix and a dense matrix of rank vectors.
+
+        Each query gets the ranks `get_ranks` gives for its similarities, with uniform initial
+        weights and the similarities as dangling weights. A query whose similarities sum to
+        zero gets a uniform personalization, as it does with `get_ranks`. A query stops iterating
+        when it converges, so later iterations only carry the queries which have not yet
+        converged.
+        The top-k stability rule does not apply to batches.
+
+        Args:
+            query_to_symbol_similarities: An array with a row of similarities per query.
+            symbols: The symbol of each column of the array, the nodes of the graph in graph
+                order by default. Every node of the graph must have a column.
+            top_k: The number of top ranks to return per query, or None for all of them.
+
+        Returns:
+            The ranks of each query, ordered by decreasing rank.
+
+        Raises:
+            NetworkXError: If a node has no similarity, or if a query fails to converge.
+        """
+        nodes, node_indices, transition_matrix, dangling_indices = self.transition_structure
+        node_count = len(nodes)
+        alpha = self.config.alpha
+        monitor = _IterationMonitor(node_count, self.config)
+
+        similarities = np.atleast_2d(np.asarray(query_to_symbol_similarities, dtype=np.float64))
+        similarity_sums = similarities.sum(axis=1, keepdims=True)
+        # A query without any similarity falls back to a uniform personalization below
+        is_zero_sum = similarity_sums[:, 0] == 0.0
+        similarities = similarities / np.where(is_zero_sum[:, None], 1.0, similarity_sums)
+        if symbols is not None:
+            column_indices: Dict[Hashable, int] = {
+                symbol: index for index, symbol in enumerate(symbols)
+            }
+            missing = [node for node in nodes if node not in column_indices]
+            if missing:
+                raise NetworkXError(
+                    f"query_to_symbol_similarity dictionary must have a value for every node. Missing {len(missing)} nodes."
+                )
+            similarities = similarities[:, [column_indices[node] for node in nodes]]
+        elif similarities.shape[1] != node_count:
+            raise NetworkXError(
+                f"Expected a similarity for each of the {node_count} nodes, got {similarities.shape[1]}."
+            )
+        similarities[is_zero_sum] = 1.0 / node_count
+
+        # The columns are the queries, as a product with the transition matrix expects
+        personalization = np.ascontiguousarray(similarities.T)
+        teleport = (1.0 - alpha) * personalization
+        rank_mat = np.full(personalization.shape, 1.0 / node_count)
+        active = np.arange(personalization.shape[1])
+        results: List[List[Tuple[Symbol, float]]] = [[] for _ in range(len(active))]
+
+        for _ in range(self.config.max_iterations):
+            last_rank_mat = rank_mat
+            danglesums = alpha * last_rank_mat[dangling_indices].sum(axis=0)
+            rank_mat = alpha * (transition_matrix @ last_rank_mat) + (
+                danglesums * personalization + teleport
+            )
+            errs = np.abs(rank_mat - last_rank_mat).sum(axis=0)
+            monitor.record(errs.max(initial=0.0))
+            converged = errs < node_count * self.config.tolerance
+            for column in np.flatnonzero(converged):
+                results[active[column]] = self._get_top_ranks(nodes, rank_mat[:, column], top_k)
+            if converged.all():
+                self._set_stats(monitor.get_stats(True))
+                return results
+            if converged.any():
+                remaining = ~converged
+                active = active[remaining]
+                rank_mat = rank_mat[:, remaining]
+                personalization = personalization[:, remaining]
+                teleport = teleport[:, remaining]
+
+        self._set_stats(monitor.get_stats(False))
+        raise NetworkXError(
+            "SymbolRank: power iteration failed to converge in %d iterations."
+            % self.config.max_iterations
+        )
+
+    def get_approximate_ranks(
+        self, query_to_symbol_similarity: Dict[Symbol, float], top_k: int = 10
+    ) -> List[ApproximateRank]:
+        """
+        Approximates the top ranks of a query by forward push, in the style of Andersen,
+        Chung and Lang, so that only the neighborhood of the most similar symbols is visited.
+
+        The query is personalized to its `push_seed_count` most similar symbols in the graph.
+        Each seed starts with its normalized similarity as residual. Pushing a node moves
+        (1 - alpha) of its residual to its rank and alpha to the residuals of the targets of
+        its out-edges, or of the seeds when it is dangling. Nodes are pushed until each
+        residual is below `push_residual_threshold` times the out-degree of its node.
+
+        The ranks never exceed the exact ones, and are short of them by at most the total
+        residual left, which is returned as the error bound of every rank.
+
+        Raises:
+            ValueError: If no symbol of the query is in the graph.
+        """
+        nodes, node_indices, _, _ = self.transition_structure
+        if self._forward_matrix is None:
+            self._forward_matrix = self.transition_structure.matrix.T.tocsr()
+        indptr, indices, data = (
+            self._forward_matrix.indptr,
+            self._forward_matrix.indices,
+            self._forward_matrix.data,
+        )
+        alpha = self.config.alpha
+        threshold = self.config.push_residual_threshold
+
+        seed_similarities = heapq.nsmallest(
+            self.config.push_seed_count,
+            (
+                (similarity, node_indices[symbol])
+                for symbol, similarity in query_to_symbol_similarity.items()
+                if symbol in node_indices and similarity > 0
+            ),
+            key=lambda seed: (-seed[0], seed[1]),
+        )
+        if not seed_similarities:
+            raise ValueError("No symbol of the query is in the graph")
+        similarity_sum = sum(similarity for similarity, _ in seed_similarities)
+        seeds = [(index, similarity / similarity_sum) for similarity, index in seed_similarities]
+
+        def above_threshold(index: int, residual: float) -> bool:
+            return residual >= threshold * max(indptr[index + 1] - indptr[index], 1)
+
+        ranks: Dict[int, float] = {}
+        residuals: Dict[int, float] = dict(seeds)
+        queue = deque(index for index, residual in seeds if above_threshold(index, residual))
+        queued = set(queue)
+        while queue:
+            index = queue.popleft()
+            queued.discard(index)
+            residual = residuals.pop(index)
+            ranks[index] = ranks.get(index, 0.0) + (1.0 - alpha) * residual
+
+            start, end = indptr[index], indptr[index + 1]
+            if start == end:
+                targets: Iterable[Tuple[int, float]] = seeds
+            else:
+                targets = zip(indices[start:end].tolist(), data[start:end].tolist())
+            for target, weight in targets:
+                target_residual = residuals.get(target, 0.0) + alpha * residual * weight
+                residuals[target] = target_residual
+                if target not in queued and above_threshold(target, target_residual):
+                    queue.append(target)
+                    queued.add(target)
+
+        error_bound = sum(residuals.values())
+        top_ranks = sorted(ranks.items(), key=lambda rank: (-rank[1], rank[0]))[:top_k]
+        return [ApproximateRank(nodes[index], rank, error_bound) for index, rank in top_ranks]  # type: ignore
+
+    def _get_sparse_ranks(
+        self,
+        query_to_symbol_similarity: Optional[Dict[Symbol, float]],
+        initial_weights: Optional[Dict[Symbol, float]],
+        dangling: Optional[Dict[Symbol, float]],
+        warm_start_key: Optional[Hashable] = None,
+    ) -> List[Tuple[Symbol, float]]:
+        """
+        Calculates the same ranks as the python engine, with each iteration computed as a
+        product of the transposed transition matrix and the rank vector.
+
+        Ranks are returned in the same order, i.e. by decreasing rank and then in the order
+        of the initial weights, or of the graph when there are none.
+        """
+        monitor = _IterationMonitor(self.graph.number_of_nodes(), self.config)
+        nodes, node_indices, transition_matrix, dangling_indices = self.transition_structure
+        node_count = len(nodes)
+        alpha = self.config.alpha
+
+        warm_start = self._get_warm_start(warm_start_key, nodes)
+        if initial_weights is not None:
+            rank_vec = self._to_vector(
+                nodes, self._prepare_initial_ranks(self.graph, initial_weights)
+            )
+        elif warm_start is not None:
+            rank_vec = warm_start
+        else:
+            rank_vec = np.full(node_count, 1.0 / node_count)
+        prepared_similarity = self._prepare_query_to_symbol_similarity(
+            node_count, self.graph, query_to_symbol_similarity
+        )
+        similarity_vec = self._to_vector(nodes, prepared_similarity)
+        dangling_vec = self._to_vector(
+            nodes, self._prepare_dangling_weights(dangling, prepared_similarity)
+        )
+        teleport_vec = (1.0 - alpha) * similarity_vec
+
+        for _ in range(self.config.max_iterations):
+            last_rank_vec = rank_vec
+            danglesum = alpha * last_rank_vec[dangling_indices].sum()
+            rank_vec = alpha * (transition_matrix @ last_rank_vec) + (
+                danglesum * dangling_vec + teleport_vec
+            )
+            err = np.abs(rank_vec - last_rank_vec).sum()
+            monitor.record(err)
+            converged = err < node_count * self.config.tolerance
+            if converged or monitor.is_top_k_stable(lambda k: self._get_top_indices(rank_vec, k)):
+                self._set_stats(monitor.get_stats(converged, not converged))
+                if warm_start_key is not None:
+                    self._set_warm_start(warm_start_key, nodes, rank_vec)
+                return self._get_sorted_ranks(nodes, node_indices, rank_vec, initial_weights)
+
+        self._set_stats(monitor.get_stats(False))
+        raise NetworkXError(
+            "SymbolRank: power iteration failed to converge in %d iterations."
+            % self.config.max_iterations
+        )
+
+    def _prepare_transition_structure(self) -> TransitionStructure:
+        """
+        Builds the transposed transition matrix of the graph in CSR format, where the entry
+        at (j, i) is the weight of the edge from node i to node j normalized by the weighted
+        out-degree of node i, like the edges of `nx.stochastic_graph`.
+
+        The adjacency of an undirected graph is symmetric, which is the same as converting
+        it with `to_directed` first.
+        """
+        nodes = list(self.graph)
+        adjacency = nx.to_scipy_sparse_array(
+            self.graph,
+            nodelist=nodes,
+            weight=self.config.weight_key,
+            dtype=np.float64,
+            format="csr",
+        )
+        out_degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+        is_dangling = out_degrees == 0.0
+        inverse_out_degrees = np.divide(
+            1.0, out_degrees, out=np.zeros_like(out_degrees), where=~is_dangling
+        )
+        transition_matrix = sparse.csr_matrix((sparse.diags(inverse_out_degrees) @ adjacency).T)
+        return TransitionStructure(
+            nodes,
+            {node: index for index, node in enumerate(nodes)},
+            transition_matrix,
+            np.flatnonzero(is_dangling),
+        )
+
+    def _set_stats(self, stats: SymbolRankStats) -> None:
+        self.last_stats = stats
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    @staticmethod
+    def _get_top_indices(rank_vec: np.ndarray, k: int) -> Tuple:
+        """Gets the indices of the `k` largest ranks, ordered by decreasing rank."""
+        if k < len(rank_vec):
+            top_indices = np.argpartition(-rank_vec, k - 1)[:k]
+        else:
+            top_indices = np.arange(len(rank_vec))
+        return tuple(top_indices[np.lexsort((top_indices, -rank_vec[top_indices]))].tolist())
+
+    def _get_warm_start(
+        self, warm_start_key: Optional[Hashable], nodes: List[Hashable]
+    ) -> Optional[np.ndarray]:
+        """
+        Gets the last converged ranks of the key in the order of `nodes`. When the nodes
+        changed since, new nodes start with uniform ranks and the ranks are renormalized.
+        """
+        if warm_start_key is None or warm_start_key not in self._warm_starts:
+            return None
+        warm_nodes, warm_vec = self._warm_starts[warm_start_key]
+        if warm_nodes is nodes:
+            return warm_vec
+        warm_ranks = dict(zip(warm_nodes, warm_vec.tolist()))
+        uniform_rank = 1.0 / len(nodes)
+        rank_vec = np.array([warm_ranks.get(node, uniform_rank) for node in nodes])
+        return rank_vec / rank_vec.sum()
+
+    def _set_warm_start(
+        self, warm_start_key: Hashable, nodes: List[Hashable], rank_vec: np.ndarray
+    ) -> None:
+        if (
+            warm_start_key not in self._warm_starts
+            and len(self._warm_starts) >= SymbolRank.WARM_START_CACHE_SIZE
+        ):
+            # Evicts the oldest warm start, dictionaries keep insertion order
+            self._warm_starts.pop(next(iter(self._warm_starts)))
+        self._warm_starts[warm_start_key] = (nodes, rank_vec)
+
+    def _get_transition_weights(self, source: Hashable) -> Dict[Hashable, float]:
+        """Gets the weights of the edges out of `source` normalized by its out-degree."""
+        out_weights = {
+            target: data.get(self.config.weight_key, 1)
+            for target, data in self.graph[source].items()
+        }
+        out_degree = sum(out_weights.values())
+        if out_degree == 0:
+            return {}
+        inverse_out_degree = 1.0 / out_degree
+        return {target: weight * inverse_out_degree for target, weight in out_weights.items()}
+
+    @staticmethod
+    def _update_transition_structure(
+        structure: TransitionStructure, transition_weights: Dict[Hashable, Dict[Hashable, float]]
+    ) -> TransitionStructure:
+        """Replaces the columns of the transposed transition matrix of the given sources."""
+        nodes, node_indices, matrix, dangling_indices = structure
+        kept_columns = np.ones(len(nodes))
+        is_dangling = np.zeros(len(nodes), dtype=bool)
+        is_dangling[dangling_indices] = True
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        for source, weights in transition_weights.items():
+            source_index = node_indices[source]
+            kept_columns[source_index] = 0.0
+            is_dangling[source_index] = not weights
+            for target, weight in weights.items():
+                rows.append(node_indices[target])
+                columns.append(source_index)
+                values.append(weight)
+
+        updated_matrix = sparse.csr_matrix(
+            matrix @ sparse.diags(kept_columns)
+        ) + sparse.csr_matrix((values, (rows, columns)), shape=matrix.shape)
+        updated_matrix.eliminate_zeros()
+        return TransitionStructure(
+            nodes, node_indices, updated_matrix, np.flatnonzero(is_dangling)
+        )
+
+    @staticmethod
+    def _to_vector(nodes: List[Hashable], weights: Dict[Symbol, float]) -> np.ndarray:
+        """Converts a dictionary of weights to a vector in node order, missing nodes are 0."""
+        return np.array([weights.get(node, 0.0) for node in nodes], dtype=np.float64)  # type: ignore
+
+    @staticmethod
+    def _get_sorted_ranks(
+        nodes: List[Hashable],
+        node_indices: Dict[Hashable, int],
+        rank_vec: np.ndarray,
+        initial_weights: Optional[Dict[Symbol, float]],
+    ) -> List[Tuple[Symbol, float]]:
+        """Sorts the ranks like `sorted(rank_vec.items(), ...)` does in the python engine."""
+        if initial_weights is None:
+            ordered_nodes, ordered_ranks = nodes, rank_vec
+        else:
+            ordered_nodes = list(initial_weights)
+            ordered_ranks = rank_vec[[node_indices[node] for node in ordered_nodes]]
+        order = np.argsort(-ordered_ranks, kind="stable")
+        return [(ordered_nodes[i], float(ordered_ranks[i])) for i in order]  # type: ignore
+
+    @staticmethod
+    def _get_top_ranks(
+        nodes: List[Hashable], rank_vec: np.ndarray, top_k: Optional[int]
+    ) -> List[Tuple[Symbol, float]]:
+        """Gets the `top_k` ranks in the order `_get_sorted_ranks` gives them."""
+        order = np.argsort(-rank_vec, kind="stable")[:top_k]
+        return [(nodes[i], float(rank_vec[i])) for i in order]  # type: ignore
+
     def get_top_symbols(self, n: int) -> List[Tuple[str, float]]:
         """
         Get the top N symbols according to their ranks.
@@ -114,9 +758,82 @@ class SymbolRank:
         Returns:
             A list of tuples each containing the dotpath of a symbol and its rank.
         """
-        ranks = self.get_ranks()
+        ranks = self.get_global_ranks()
         return [(".".join(symbol.dotpath.split(".")[1:]), rank) for symbol, rank in ranks[:n]]
 
+    def get_global_ranks(self) -> List[Tuple[Symbol, float]]:
+        """
+        Gets the ranks without personalization, ordered by rank, from memory when they were
+        already computed for the graph, else from `global_rank_dir` when they were persisted.
+        Otherwise they are computed, and persisted when a `global_rank_dir` is set.
+        """
+        global_ranks = self.get_cached_global_ranks()
+        if global_ranks is None:
+            global_ranks = self._global_ranks = self.get_ranks()
+            if self.global_rank_dir is not None:
+                self._save_global_ranks(self._get_global_rank_path(), global_ranks)
+        return global_ranks
+
+    def get_cached_global_ranks(self) -> Optional[List[Tuple[Symbol, float]]]:
+        """
+        Gets the global ranks like `get_global_ranks`, but without computing them, or None
+        when they are neither in memory nor persisted for the graph.
+        """
+        if (
+            self._global_ranks is None
+            and not self._global_ranks_loaded
+            and self.global_rank_dir is not None
+        ):
+            self._global_ranks = self._load_global_ranks(self._get_global_rank_path())
+        self._global_ranks_loaded = True
+        return self._global_ranks
+
+    def get_global_rank(self, symbol: Symbol) -> float:
+        """Gets the global rank of a symbol, or 0 when it is not in the graph."""
+        if self._global_rank_lookup is None:
+            self._global_rank_lookup = dict(self.get_global_ranks())
+        return self._global_rank_lookup.get(symbol, 0.0)
+
+    def _get_global_rank_path(self) -> str:
+        cache_key = get_graph_cache_key(self.graph, self.config, *SymbolRank.GLOBAL_RANK_OPTIONS)
+        return os.path.join(cast(str, self.global_rank_dir), f"{cache_key}.ranks")
+
+    @staticmethod
+    def _load_global_ranks(global_rank_path: str) -> Optional[List[Tuple[Symbol, float]]]:
+        if not os.path.exists(global_rank_path):
+            return None
+        try:
+            with open(global_rank_path, "rb") as f:
+                if f.read(len(SymbolRank.GLOBAL_RANK_MAGIC)) != SymbolRank.GLOBAL_RANK_MAGIC:
+                    logger.warning(
+                        f"Ignoring malformed global rank cache entry {global_rank_path}"
+                    )
+                    return None
+                if int.from_bytes(f.read(4), "little") != SymbolRank.GLOBAL_RANK_CACHE_VERSION:
+                    return None
+                return [
+                    (cast(Symbol, from_persisted_node(node)), rank)
+                    for node, rank in pickle.load(f)
+                ]
+        except Exception as e:
+            logger.error(f"Failed to load global rank cache entry {global_rank_path}: {e}")
+            return None
+
+    @staticmethod
+    def _save_global_ranks(global_rank_path: str, ranks: List[Tuple[Symbol, float]]) -> None:
+        """Atomically stores the global ranks."""
+        os.makedirs(os.path.dirname(global_rank_path), exist_ok=True)
+        tmp_path = f"{global_rank_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SymbolRank.GLOBAL_RANK_MAGIC)
+            f.write(SymbolRank.GLOBAL_RANK_CACHE_VERSION.to_bytes(4, "little"))
+            pickle.dump(
+                [(to_persisted_node(symbol), rank) for symbol, rank in ranks],
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, global_rank_path)
+
     def _prepare_graph(self) -> nx.DiGraph:
         """
         Prepare the graph for the SymbolRank algorithm. If the graph is not directed,
@@ -173,6 +890,8 @@ class SymbolRank:
                 f"query_to_symbol_similarity dictionary must have a value for every node. Missing {len(missing)} nodes."
             )
         s = sum(query_to_symbol_similarity.values())
+        if s == 0:
+            return {k: 1.0 / node_count for k in stochastic_graph}
         return {k: v / s for k, v in query_to_symbol_similarity.items()}
 
     def _prepare_dangling_weights(
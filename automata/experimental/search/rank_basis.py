@@ -0,0 +1,250 @@
+import heapq
+import logging
+import os
+import pickle
+import shutil
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from automata.experimental.search.rank import (
+    SymbolRank,
+    SymbolRankConfig,
+    from_persisted_node,
+    get_graph_cache_key,
+    to_persisted_node,
+)
+from automata.symbol.base import Symbol
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolRankBasis:
+    """
+    The personalized SymbolRank of each node of a graph, truncated to its largest ranks,
+    from which the ranks of a query are computed without iterating.
+
+    With the dangling weights equal to the personalization, as in `SymbolSearch`, the
+    ranks of a personalization p are proportional to the solution b of
+    b = alpha * P^T b + (1 - alpha) * p, which is linear in p. The basis stores b for each
+    node personalized alone, so the ranks of a query are the normalized sum of the basis
+    vectors of its most similar symbols, weighted by their similarity.
+
+    The basis vectors are the rows of a CSR matrix, which is persisted as `.npy` files
+    and memory-mapped when loaded, so that only the rows which queries use are read.
+    """
+
+    FORMAT_VERSION = 2
+    MAGIC = b"AUTOMATA-SYMBOL-RANK-BASIS"
+    BUILD_CHUNK_SIZE = 256
+    ARRAY_NAMES = ("indptr", "indices", "data", "masses")
+
+    def __init__(
+        self,
+        nodes: List[Hashable],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        masses: np.ndarray,
+    ) -> None:
+        """
+        Args:
+            nodes: The nodes of the graph, in the order of the rows and of the indices.
+            indptr, indices, data: The truncated basis vectors, as the rows of a CSR matrix.
+            masses: The sum of each basis vector before its truncation.
+        """
+        self.nodes = nodes
+        self.node_indices = {node: index for index, node in enumerate(nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.masses = masses
+
+    @classmethod
+    def build(cls, symbol_rank: SymbolRank) -> "SymbolRankBasis":
+        """
+        Builds the basis of the graph of `symbol_rank`, truncated to its `rank_basis_size`
+        config. The basis vectors of a chunk of nodes are computed together, by summing the
+        power series of alpha * P^T applied to their indicators until its terms vanish.
+        """
+        config = symbol_rank.config
+        nodes, _, transition_matrix, _ = symbol_rank.transition_structure
+        node_count = len(nodes)
+
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        row_indices: List[np.ndarray] = []
+        row_data: List[np.ndarray] = []
+        masses = np.zeros(node_count)
+        for start in range(0, node_count, SymbolRankBasis.BUILD_CHUNK_SIZE):
+            end = min(start + SymbolRankBasis.BUILD_CHUNK_SIZE, node_count)
+            basis = SymbolRankBasis._get_basis_chunk(transition_matrix, start, end, config)
+            masses[start:end] = np.asarray(basis.sum(axis=0)).ravel()
+            for column in range(end - start):
+                indices, data = SymbolRankBasis._truncate(
+                    basis.indices[basis.indptr[column] : basis.indptr[column + 1]],
+                    basis.data[basis.indptr[column] : basis.indptr[column + 1]],
+                    config.rank_basis_size,
+                )
+                row_indices.append(indices)
+                row_data.append(data)
+                indptr[start + column + 1] = indptr[start + column] + len(indices)
+
+        return cls(
+            nodes,
+            indptr,
+            np.concatenate(row_indices) if row_indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(row_data) if row_data else np.zeros(0),
+            masses,
+        )
+
+    @staticmethod
+    def _get_basis_chunk(
+        transition_matrix: sparse.csr_matrix, start: int, end: int, config: SymbolRankConfig
+    ) -> sparse.csc_matrix:
+        """
+        Gets the basis vectors of the nodes in [start, end) as the columns of a sparse matrix.
+        The terms of the series stay sparse for the neighborhood of the nodes, and their
+        entries below the tolerance are dropped.
+        """
+        chunk_size = end - start
+        term = sparse.csc_matrix(
+            (
+                np.full(chunk_size, 1.0 - config.alpha),
+                (np.arange(start, end), np.arange(chunk_size)),
+            ),
+            shape=(transition_matrix.shape[0], chunk_size),
+        )
+        basis = term
+        for _ in range(config.max_iterations):
+            term = sparse.csc_matrix(config.alpha * (transition_matrix @ term))
+            term.data[term.data < config.tolerance] = 0.0
+            term.eliminate_zeros()
+            if term.nnz == 0:
+                break
+            basis = basis + term
+        basis = sparse.csc_matrix(basis)
+        basis.sort_indices()
+        return basis
+
+    @staticmethod
+    def _truncate(
+        indices: np.ndarray, data: np.ndarray, basis_size: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Keeps the `basis_size` largest entries of a sparse vector, ordered by index."""
+        if len(data) > basis_size:
+            kept = np.sort(np.argpartition(-data, basis_size - 1)[:basis_size])
+            indices, data = indices[kept], data[kept]
+        return indices.astype(np.int32), data.astype(np.float64)
+
+    @classmethod
+    def load_or_build(cls, symbol_rank: SymbolRank, basis_dir: str) -> "SymbolRankBasis":
+        """Loads the basis of the graph of `symbol_rank` from `basis_dir`, or builds and saves it."""
+        basis_path = os.path.join(
+            basis_dir,
+            get_graph_cache_key(
+                symbol_rank.graph,
+                symbol_rank.config,
+                "alpha",
+                "max_iterations",
+                "tolerance",
+                "weight_key",
+                "rank_basis_size",
+            ),
+        )
+        basis = cls.load(basis_path)
+        if basis is not None:
+            logger.info(f"Loaded the SymbolRank basis from {basis_path}")
+            return basis
+
+        logger.info(f"Building the SymbolRank basis of {len(symbol_rank.graph)} symbols")
+        basis = cls.build(symbol_rank)
+        basis.save(basis_path)
+        return basis
+
+    def get_ranks(
+        self,
+        query_to_symbol_similarity: Dict[Symbol, float],
+        seed_count: int,
+        top_k: Optional[int] = None,
+    ) -> List[Tuple[Symbol, float]]:
+        """
+        Gets the ranks of a query from the basis vectors of its `seed_count` most similar
+        symbols in the graph, ordered by decreasing rank. Symbols which none of the
+        truncated basis vectors reach are omitted.
+
+        Raises:
+            ValueError: If no symbol of the query is in the graph.
+        """
+        seeds = heapq.nsmallest(
+            seed_count,
+            (
+                (similarity, self.node_indices[symbol])
+                for symbol, similarity in query_to_symbol_similarity.items()
+                if symbol in self.node_indices and similarity > 0
+            ),
+            key=lambda seed: (-seed[0], seed[1]),
+        )
+        if not seeds:
+            raise ValueError("No symbol of the query is in the graph")
+
+        seed_indices = np.array([index for _, index in seeds])
+        seed_weights = np.array([similarity for similarity, _ in seeds])
+        starts, ends = self.indptr[seed_indices], self.indptr[seed_indices + 1]
+        lengths = ends - starts
+        # Concatenates the rows of the seeds without a python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+            lengths.sum()
+        )
+        reached_indices, positions = np.unique(self.indices[offsets], return_inverse=True)
+        ranks = np.bincount(
+            positions, weights=self.data[offsets] * np.repeat(seed_weights, lengths)
+        ) / np.dot(seed_weights, self.masses[seed_indices])
+
+        order = np.argsort(-ranks, kind="stable")[:top_k]
+        return [(self.nodes[reached_indices[i]], float(ranks[i])) for i in order]  # type: ignore
+
+    def save(self, basis_path: str) -> None:
+        """Atomically stores the basis in the directory `basis_path`."""
+        os.makedirs(os.path.dirname(basis_path) or ".", exist_ok=True)
+        tmp_path = f"{basis_path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for array_name in SymbolRankBasis.ARRAY_NAMES:
+            np.save(os.path.join(tmp_path, f"{array_name}.npy"), getattr(self, array_name))
+        with open(os.path.join(tmp_path, "nodes.pkl"), "wb") as f:
+            f.write(SymbolRankBasis.MAGIC)
+            f.write(SymbolRankBasis.FORMAT_VERSION.to_bytes(4, "little"))
+            pickle.dump(
+                [to_persisted_node(node) for node in self.nodes],
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        try:
+            os.replace(tmp_path, basis_path)
+        except OSError:
+            # Another process saved the same basis first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, basis_path: str) -> Optional["SymbolRankBasis"]:
+        """Loads the basis stored in the directory `basis_path`, or returns None on a miss."""
+        nodes_path = os.path.join(basis_path, "nodes.pkl")
+        if not os.path.exists(nodes_path):
+            return None
+
+        try:
+            with open(nodes_path, "rb") as f:
+                if f.read(len(SymbolRankBasis.MAGIC)) != SymbolRankBasis.MAGIC:
+                    logger.warning(f"Ignoring malformed SymbolRank basis {basis_path}")
+                    return None
+                if int.from_bytes(f.read(4), "little") != SymbolRankBasis.FORMAT_VERSION:
+                    return None
+                nodes = [from_persisted_node(node) for node in pickle.load(f)]
+            arrays = [
+                np.load(os.path.join(basis_path, f"{array_name}.npy"), mmap_mode="r")
+                for array_name in SymbolRankBasis.ARRAY_NAMES
+            ]
+        except Exception as e:
+            logger.error(f"Failed to load the SymbolRank basis {basis_path}: {e}")
+            return None
+        return cls(nodes, *arrays)
@@ -4,9 +4,14 @@ import numpy as np
 from redbaron import RedBaron
 
 from automata.embedding.base import EmbeddingSimilarityCalculator
-from automata.experimental.search.rank import SymbolRank, SymbolRankConfig
+from automata.experimental.search.rank import (
+    ApproximateRank,
+    SymbolRank,
+    SymbolRankConfig,
+)
+from automata.experimental.search.rank_basis import SymbolRankBasis
 from automata.singletons.py_module_loader import py_module_loader
-from automata.symbol.base import Symbol, SymbolReference
+from automata.symbol.base import Symbol, SymbolDescriptor, SymbolReference
 from automata.symbol.graph import SymbolGraph
 from automata.symbol.parser import parse_symbol
 from automata.symbol.symbol_utils import convert_to_fst_object
@@ -14,8 +19,10 @@ from automata.symbol_embedding.handler import SymbolEmbeddingHandler
 
 SymbolReferencesResult = Dict[str, List[SymbolReference]]
 SymbolRankResult = List[Tuple[Symbol, float]]
+ApproximateSymbolRankResult = List[ApproximateRank]
 SourceCodeResult = Optional[str]
 ExactSearchResult = Dict[str, List[int]]
+SymbolDependenciesResult = Dict[Symbol, int]
 
 
 class SymbolSearch:
@@ -28,8 +35,17 @@ class SymbolSearch:
         search_embedding_handler: SymbolEmbeddingHandler,
         embedding_similarity_calculator: EmbeddingSimilarityCalculator,
         z_score_power: float = 2.0,
+        rank_basis_dir: Optional[str] = None,
+        global_rank_dir: Optional[str] = None,
     ) -> None:
         """
+        Args:
+            rank_basis_dir: If provided, `symbol_rank_search` ranks queries from a
+                `SymbolRankBasis` of the rankable subgraph once `build_rank_basis` was called,
+                which is persisted here.
+            global_rank_dir: If provided, the global SymbolRanks, which break ties between
+                equally ranked symbols once `build_global_ranks` was called, are persisted here.
+
         Raises:
             ValueError: If the code_subgraph is not a subgraph of the symbol_graph
         TODO - We should modify SymbolSearch to receive a completed instance of SymbolRank.
@@ -41,17 +57,56 @@ class SymbolSearch:
         self.symbol_rank_config = symbol_rank_config
         self.z_score_power = z_score_power
         self._symbol_rank = None  # Create a placeholder for the lazy loaded SymbolRank
+        self.rank_basis_dir = rank_basis_dir
+        self.global_rank_dir = global_rank_dir
+        self._symbol_rank_basis: Optional[Tuple[Any, SymbolRankBasis]] = None
 
     @property
     def symbol_rank(self):
+        # The symbol graph rebuilds its rankable subgraph when the index changes, and the
+        # transition structure SymbolRank prepared for the previous subgraph is then stale
+        rankable_subgraph = self.symbol_graph.default_rankable_subgraph
         if self._symbol_rank is None:
             self._symbol_rank = SymbolRank(
-                self.symbol_graph.default_rankable_subgraph, config=self.symbol_rank_config
+                rankable_subgraph,
+                config=self.symbol_rank_config,
+                global_rank_dir=self.global_rank_dir,
             )
+        elif self._symbol_rank.graph is not rankable_subgraph:
+            # Keeps the warm starts of the previous queries, which are mostly still close
+            self._symbol_rank.update_graph(rankable_subgraph)
         return self._symbol_rank
 
+    @property
+    def symbol_rank_basis(self) -> Optional[SymbolRankBasis]:
+        """
+        The basis of the current rankable subgraph, when `build_rank_basis` was called for it.
+        The basis is not built here, as building it is too slow to do while searching.
+        """
+        symbol_rank = self.symbol_rank
+        if self._symbol_rank_basis is None or self._symbol_rank_basis[0] is not symbol_rank.graph:
+            return None
+        return self._symbol_rank_basis[1]
+
+    def build_rank_basis(self) -> None:
+        """
+        Loads the basis of the current rankable subgraph from `rank_basis_dir`, or builds and
+        persists it there, so that the following searches rank from it. Nothing is done
+        when no `rank_basis_dir` is set.
+        """
+        if self.rank_basis_dir is None:
+            return
+        symbol_rank = self.symbol_rank
+        self._symbol_rank_basis = (
+            symbol_rank.graph,
+            SymbolRankBasis.load_or_build(symbol_rank, self.rank_basis_dir),
+        )
+
     def symbol_rank_search(self, query: str) -> SymbolRankResult:
-        """Fetches the list of the SymbolRank similar symbols ordered by rank."""
+        """
+        Fetches the list of the SymbolRank similar symbols ordered by rank. When ranking
+        from a basis, only the symbols which the basis vectors of the query reach are listed.
+        """
         ordered_embeddings = self.search_embedding_handler.get_ordered_embeddings()
 
         query_vec = self.embedding_similarity_calculator.calculate_query_similarity_dict(
@@ -60,7 +115,92 @@ class SymbolSearch:
         transformed_query_vec = SymbolSearch.transform_dict_values(
             query_vec, self.shifted_z_score_powered
         )
-        return self.symbol_rank.get_ranks(query_to_symbol_similarity=transformed_query_vec)
+        symbol_rank_basis = self.symbol_rank_basis
+        if symbol_rank_basis is not None:
+            return self._break_ties_by_global_rank(
+                symbol_rank_basis.get_ranks(
+                    transformed_query_vec, self.symbol_rank_config.rank_basis_seed_count
+                )
+            )
+        return self._break_ties_by_global_rank(
+            self.symbol_rank.get_ranks(
+                query_to_symbol_similarity=transformed_query_vec, warm_start_key=query
+            )
+        )
+
+    def symbol_rank_search_batch(
+        self, queries: List[str], top_k: Optional[int] = None
+    ) -> List[SymbolRankResult]:
+        """
+        Fetches the SymbolRank similar symbols of several queries, each ordered by rank.
+        The queries are embedded in a single batch and ranked together.
+        """
+        if not queries:
+            return []
+        ordered_embeddings = self.search_embedding_handler.get_ordered_embeddings()
+
+        query_vecs = self.embedding_similarity_calculator.calculate_query_similarity_matrix(
+            ordered_embeddings, queries
+        )
+        transformed_query_vecs = np.array(
+            [self.shifted_z_score_powered(query_vec) for query_vec in query_vecs]
+        )
+        return [
+            self._break_ties_by_global_rank(ranks)
+            for ranks in self.symbol_rank.get_ranks_batch(
+                transformed_query_vecs,
+                symbols=[ele.key for ele in ordered_embeddings],
+                top_k=top_k,
+            )
+        ]
+
+    def approximate_symbol_rank_search(
+        self, query: str, top_k: int = 10
+    ) -> ApproximateSymbolRankResult:
+        """
+        Fetches the `top_k` SymbolRank similar symbols ordered by approximate rank, which
+        only visits the neighborhood of the symbols most similar to the query.
+        """
+        ordered_embeddings = self.search_embedding_handler.get_ordered_embeddings()
+
+        (query_vec,) = self.embedding_similarity_calculator.calculate_query_similarity_matrix(
+            ordered_embeddings, [query]
+        )
+        transformed_query_vec = self.shifted_z_score_powered(query_vec)
+        return self.symbol_rank.get_approximate_ranks(
+            {ele.key: transformed_query_vec[i] for i, ele in enumerate(ordered_embeddings)},
+            top_k=top_k,
+        )
+
+    def build_global_ranks(self) -> None:
+        """
+        Computes the global SymbolRanks of the current rankable subgraph, or loads them from
+        `global_rank_dir`, so that the following searches break ties with them.
+        """
+        self.symbol_rank.get_global_ranks()
+
+    def _break_ties_by_global_rank(self, ranks: SymbolRankResult) -> SymbolRankResult:
+        """
+        Orders each run of equally ranked symbols by their global SymbolRank. The ranks are
+        left as they are when the global ranks were not built for the current graph, as
+        computing them is too slow to do while searching.
+        """
+        if self.symbol_rank.get_cached_global_ranks() is None:
+            return ranks
+        ranks = list(ranks)
+        start = 0
+        while start < len(ranks):
+            end = start + 1
+            while end < len(ranks) and ranks[end][1] == ranks[start][1]:
+                end += 1
+            if end - start > 1:
+                ranks[start:end] = sorted(
+                    ranks[start:end],
+                    key=lambda rank: self.symbol_rank.get_global_rank(rank[0]),
+                    reverse=True,
+                )
+            start = end
+        return ranks
 
     def symbol_references(self, symbol_uri: str) -> SymbolReferencesResult:
         """
@@ -70,6 +210,36 @@ class SymbolSearch:
         """
         return self.symbol_graph.get_references_to_symbol(parse_symbol(symbol_uri))
 
+    def symbol_dependencies(
+        self,
+        symbol_uri: str,
+        max_depth: Optional[int] = None,
+        kinds: Optional[List[SymbolDescriptor.PyKind]] = None,
+    ) -> SymbolDependenciesResult:
+        """
+        Finds the symbols which a symbol depends on, transitively or within `max_depth`
+        hops, mapped to their distance from it. Only symbols of the given `kinds` are
+        returned, when provided.
+        """
+        return self.symbol_graph.get_transitive_dependencies(
+            parse_symbol(symbol_uri), max_depth, kinds
+        )
+
+    def symbol_impact(
+        self,
+        symbol_uri: str,
+        max_depth: Optional[int] = None,
+        kinds: Optional[List[SymbolDescriptor.PyKind]] = None,
+    ) -> SymbolDependenciesResult:
+        """
+        Finds the symbols impacted by a change to a symbol, i.e. those which depend on it
+        transitively or within `max_depth` hops, mapped to their distance from it. Only
+        symbols of the given `kinds` are returned, when provided.
+        """
+        return self.symbol_graph.get_transitive_dependents(
+            parse_symbol(symbol_uri), max_depth, kinds
+        )
+
     def retrieve_source_code_by_symbol(self, symbol_uri: str) -> SourceCodeResult:
         """Finds the raw text of a module, class, method, or standalone function."""
         node = convert_to_fst_object(parse_symbol(symbol_uri))
@@ -81,9 +251,17 @@ class SymbolSearch:
 
     def process_query(
         self, query: str
-    ) -> Union[SymbolReferencesResult, SymbolRankResult, SourceCodeResult, ExactSearchResult,]:
+    ) -> Union[
+        SymbolReferencesResult,
+        SymbolRankResult,
+        SourceCodeResult,
+        ExactSearchResult,
+        SymbolDependenciesResult,
+    ]:
         """
         Processes an NLP-formatted query and returns the results of the appropriate downstream search.
+        Dependency queries accept an optional depth and comma separated symbol kinds before the
+        symbol, e.g. 'type:symbol_impact depth:2 kind:class,method uri...'.
 
         Raises:
             ValueError: If the query is not formatted correctly
@@ -105,9 +283,45 @@ class SymbolSearch:
             return self.exact_search(query_remainder)
         elif search_type == "source":
             return self.retrieve_source_code_by_symbol(query_remainder)
+        elif search_type in ("symbol_dependencies", "symbol_impact"):
+            max_depth, kinds, symbol_parts = SymbolSearch._parse_dependency_options(parts[1:])
+            if not symbol_parts:
+                raise ValueError(f"Invalid NLP query. A symbol is required: {query}")
+            if search_type == "symbol_dependencies":
+                return self.symbol_dependencies(" ".join(symbol_parts), max_depth, kinds)
+            return self.symbol_impact(" ".join(symbol_parts), max_depth, kinds)
         else:
             raise ValueError(f"Unknown search type: {search_type}")
 
+    @staticmethod
+    def _parse_dependency_options(
+        parts: List[str],
+    ) -> Tuple[Optional[int], Optional[List[SymbolDescriptor.PyKind]], List[str]]:
+        """
+        Parses the leading 'depth:N' and 'kind:a,b' options of a dependency query.
+
+        Raises:
+            ValueError: If the depth is not a non-negative integer, or a kind is unknown.
+        """
+        max_depth: Optional[int] = None
+        kinds: Optional[List[SymbolDescriptor.PyKind]] = None
+        while parts and parts[0].startswith(("depth:", "kind:")):
+            option, value = parts[0].split(":", 1)
+            if option == "depth":
+                try:
+                    max_depth = int(value)
+                except ValueError as e:
+                    raise ValueError(f"Invalid depth in NLP query: {parts[0]}") from e
+                if max_depth < 0:
+                    raise ValueError(f"Invalid depth in NLP query: {parts[0]}")
+            else:
+                try:
+                    kinds = [SymbolDescriptor.PyKind(kind.lower()) for kind in value.split(",")]
+                except ValueError as e:
+                    raise ValueError(f"Invalid kind in NLP query: {parts[0]}") from e
+            parts = parts[1:]
+        return max_depth, kinds, parts
+
     def _find_pattern_in_modules(self, pattern: str) -> Dict[str, List[int]]:
         """Finds exact line matches for a given pattern string in all modules."""
         matches = {}
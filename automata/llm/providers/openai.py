@@ -371,6 +371,9 @@ class OpenAIChatCompletionProvider(LLMChatCompletionProvider):
 class OpenAIEmbeddingProvider(EmbeddingVectorProvider):
     """A class to provide embeddings from the OpenAI API."""
 
+    # The largest number of inputs the API accepts in a single embedding request
+    MAX_BATCH_SIZE = 2048
+
     def __init__(self, engine: str = "text-embedding-ada-002") -> None:
         self.engine = engine
         set_openai_api_key()
@@ -382,6 +385,18 @@ class OpenAIEmbeddingProvider(EmbeddingVectorProvider):
 
         return np.array(get_embedding(source, engine=self.engine))
 
+    def batch_build_embedding_vector(self, symbol_sources: List[str]) -> List[np.ndarray]:
+        """Gets the embeddings for the given source texts, in requests of up to `MAX_BATCH_SIZE`."""
+        from openai.embeddings_utils import get_embeddings
+
+        embeddings: List[np.ndarray] = []
+        for start in range(0, len(symbol_sources), self.MAX_BATCH_SIZE):
+            batch = symbol_sources[start : start + self.MAX_BATCH_SIZE]
+            embeddings.extend(
+                np.array(embedding) for embedding in get_embeddings(batch, engine=self.engine)
+            )
+        return embeddings
+
 
 class OpenAITool(Tool):
     """A class representing a tool that can be used by the OpenAI agent."""
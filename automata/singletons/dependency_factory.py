@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import networkx as nx
 
@@ -8,6 +8,7 @@ from automata.agent.agent import AgentToolkitNames
 from automata.agent.error import AgentGeneralError, UnknownToolError
 from automata.code_handling.py.reader import PyReader
 from automata.code_handling.py.writer import PyWriter
+from automata.config import SYMBOL_GRAPH_CACHE_DIR
 from automata.config.base import ConfigCategory
 from automata.context_providers.symbol_synchronization import (
     SymbolProviderSynchronizationContext,
@@ -57,6 +58,8 @@ class DependencyFactory(metaclass=Singleton):
         Keyword Args (Defaults):
             disable_synchronization (False): Disable synchronization of ISymbolProvider dependencies and created classes?
             symbol_graph_scip_fpath (DependencyFactory.DEFAULT_SCIP_FPATH): Filepath to the SCIP index file.
+            symbol_graph_cache_dir (SYMBOL_GRAPH_CACHE_DIR): Directory used to cache the built symbol graph.
+            symbol_rank_basis_dir (next to the symbol graph cache): Directory used to persist the SymbolRank basis, None to rank without one.
             code_embedding_fpath (DependencyFactory.DEFAULT_CODE_EMBEDDING_FPATH): Filepath to the code embedding database.
             doc_embedding_fpath (DependencyFactory.DEFAULT_DOC_EMBEDDING_FPATH): Filepath to the doc embedding database.
             coding_project_path (get_root_py_fpath()): Filepath to the root of the coding project.
@@ -137,6 +140,18 @@ class DependencyFactory(metaclass=Singleton):
 
         return tool_dependencies
 
+    def _get_rank_basis_dir(self) -> Optional[str]:
+        """The SymbolRank basis is persisted next to the symbol graph cache, if any."""
+        if "symbol_rank_basis_dir" in self.overrides:
+            return self.overrides["symbol_rank_basis_dir"]
+        cache_dir = self.overrides.get("symbol_graph_cache_dir", SYMBOL_GRAPH_CACHE_DIR)
+        return os.path.join(cache_dir, "rank_basis") if cache_dir else None
+
+    def _get_global_rank_dir(self) -> Optional[str]:
+        """The global SymbolRanks are persisted next to the symbol graph cache, if any."""
+        cache_dir = self.overrides.get("symbol_graph_cache_dir", SYMBOL_GRAPH_CACHE_DIR)
+        return os.path.join(cache_dir, "global_ranks") if cache_dir else None
+
     def _synchronize_provider(self, provider: ISymbolProvider) -> None:
         """Synchronize an ISymbolProvider instance."""
         if not self.overrides.get("disable_synchronization", False):
@@ -149,9 +164,11 @@ class DependencyFactory(metaclass=Singleton):
         """
         Associated Keyword Args:
             symbol_graph_scip_fpath (DependencyFactory.DEFAULT_SCIP_FPATH)
+            symbol_graph_cache_dir (SYMBOL_GRAPH_CACHE_DIR)
         """
         return SymbolGraph(
-            self.overrides.get("symbol_graph_scip_fpath", DependencyFactory.DEFAULT_SCIP_FPATH)
+            self.overrides.get("symbol_graph_scip_fpath", DependencyFactory.DEFAULT_SCIP_FPATH),
+            cache_dir=self.overrides.get("symbol_graph_cache_dir", SYMBOL_GRAPH_CACHE_DIR),
         )
 
     @lru_cache()
@@ -164,9 +181,14 @@ class DependencyFactory(metaclass=Singleton):
         """
         Associated Keyword Args:
             symbol_rank_config (SymbolRankConfig())
+            symbol_graph_cache_dir (SYMBOL_GRAPH_CACHE_DIR)
         """
         subgraph: nx.DiGraph = self.get("subgraph")
-        return SymbolRank(subgraph, self.overrides.get("symbol_rank_config", SymbolRankConfig()))
+        return SymbolRank(
+            subgraph,
+            self.overrides.get("symbol_rank_config", SymbolRankConfig()),
+            global_rank_dir=self._get_global_rank_dir(),
+        )
 
     @lru_cache()
     def create_symbol_code_embedding_handler(self) -> SymbolCodeEmbeddingHandler:
@@ -222,6 +244,8 @@ class DependencyFactory(metaclass=Singleton):
         """
         Associated Keyword Args:
             symbol_rank_config (SymbolRankConfig())
+            symbol_rank_basis_dir (a directory next to the symbol graph cache, if any)
+            symbol_graph_cache_dir (SYMBOL_GRAPH_CACHE_DIR)
         """
         symbol_graph: SymbolGraph = self.get("symbol_graph")
         symbol_rank_config: SymbolRankConfig = self.overrides.get(
@@ -233,13 +257,20 @@ class DependencyFactory(metaclass=Singleton):
         embedding_similarity_calculator: EmbeddingSimilarityCalculator = self.get(
             "embedding_similarity_calculator"
         )
-        return SymbolSearch(
+        symbol_search = SymbolSearch(
             symbol_graph,
             symbol_rank_config,
             # FIXME - Fix this type ignore
             symbol_code_embedding_handler,  # type: ignore
             embedding_similarity_calculator,
+            rank_basis_dir=self._get_rank_basis_dir(),
+            global_rank_dir=self._get_global_rank_dir(),
         )
+        # The basis and the global ranks are built with the search rather than while
+        # serving a query
+        symbol_search.build_rank_basis()
+        symbol_search.build_global_ranks()
+        return symbol_search
 
     @lru_cache()
     def create_py_context_retriever(self) -> PyContextRetriever:
@@ -2,9 +2,10 @@ import abc
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from automata.symbol.scip_pb2 import Descriptor as DescriptorProto  # type: ignore
+from automata.symbol.scip_pb2 import SymbolRole  # type: ignore
 
 
 class SymbolDescriptor:
@@ -156,8 +157,14 @@ class Symbol:
     symbol_method = parse_symbol(
         "scip-python python automata 75482692a6fe30c72db516201a6f47d9fb4af065 `automata.tools.base`/ToolNotFoundError#__init__()."
     )
+
+    Note - Symbols are sorted and filtered constantly, so the dotpath and kind are
+        computed on first use and stored in slots. The hash is not stored, as it varies
+        between processes and symbols are pickled into caches; the uri caches its own.
     """
 
+    __slots__ = ("uri", "scheme", "package", "descriptors", "_dotpath", "_kind")
+
     uri: str
     scheme: str
     package: SymbolPackage
@@ -178,7 +185,12 @@ class Symbol:
 
     def symbol_kind_by_suffix(self) -> SymbolDescriptor.PyKind:
         """Converts the suffix of the URI into a PyKind."""
-        return SymbolDescriptor.convert_scip_to_python_suffix(self.symbol_raw_kind_by_suffix())
+        kind = getattr(self, "_kind", None)
+        if kind is None:
+            kind = self._kind = SymbolDescriptor.convert_scip_to_python_suffix(
+                self.symbol_raw_kind_by_suffix()
+            )
+        return kind
 
     def symbol_raw_kind_by_suffix(self) -> DescriptorProto:
         """Converts the suffix of the URI into a DescriptorProto."""
@@ -209,7 +221,10 @@ class Symbol:
     @property
     def dotpath(self) -> str:
         """Returns the dotpath of the symbol."""
-        return ".".join([ele.name for ele in self.descriptors])
+        dotpath = getattr(self, "_dotpath", None)
+        if dotpath is None:
+            dotpath = self._dotpath = ".".join([ele.name for ele in self.descriptors])
+        return dotpath
 
     @property
     def module_name(self) -> str:
@@ -251,24 +266,69 @@ class Symbol:
         return parse_symbol(uri)
 
 
-@dataclass
+def encode_symbol_roles(roles: Dict[str, Any]) -> int:
+    """Converts a dictionary of `SymbolRole` names into the equivalent bitmask."""
+    return sum(SymbolRole.Value(role_name) for role_name, is_set in roles.items() if is_set)
+
+
+def decode_symbol_roles(role: int) -> Dict[str, bool]:
+    """Converts a `SymbolRole` bitmask into a dictionary of role names."""
+    return {
+        role_name: True for role_name, role_value in SymbolRole.items() if (role & role_value) > 0
+    }
+
+
 class SymbolReference:
-    """Represents a reference to a symbol in a file"""
+    """
+    Represents a reference to a symbol in a file
+
+    Note - The roles are stored as a `SymbolRole` bitmask in `role_mask`. Unlike the
+        dictionary which was stored before, `roles` decodes a new dictionary of role
+        names on each access, so changes to it are not kept. The graph code reads
+        `role_mask` instead, and graph edges store the mask rather than the dictionary.
+    """
 
-    symbol: Symbol
-    line_number: int
-    column_number: int
-    roles: Dict[str, Any]
+    __slots__ = ("symbol", "line_number", "column_number", "role_mask")
+
+    def __init__(
+        self,
+        symbol: Symbol,
+        line_number: int,
+        column_number: int,
+        roles: Union[Dict[str, Any], int],
+    ) -> None:
+        self.symbol = symbol
+        self.line_number = line_number
+        self.column_number = column_number
+        self.roles = roles  # type: ignore
+
+    @property
+    def roles(self) -> Dict[str, Any]:
+        return decode_symbol_roles(self.role_mask)
+
+    @roles.setter
+    def roles(self, roles: Union[Dict[str, Any], int, None]) -> None:
+        if isinstance(roles, int):
+            self.role_mask = roles
+        else:
+            self.role_mask = encode_symbol_roles(roles or {})
+
+    def __repr__(self) -> str:
+        return (
+            f"SymbolReference(symbol={self.symbol!r}, line_number={self.line_number!r}, "
+            f"column_number={self.column_number!r}, roles={self.roles!r})"
+        )
 
     def __hash__(self) -> int:
         # This could cause collisions if the same symbol is referenced in different files at the same location
-        return hash(f"{self.symbol.uri}-{self.line_number}-{self.column_number}")
+        return hash((self.symbol.uri, self.line_number, self.column_number))
 
     def __eq__(self, other) -> bool:
         if isinstance(other, SymbolReference):
-            return (
-                f"{self.symbol.uri}-{self.line_number}-{self.column_number}"
-                == f"{other.symbol.uri}-{other.line_number}-{other.column_number}"
+            return (self.symbol.uri, self.line_number, self.column_number) == (
+                other.symbol.uri,
+                other.line_number,
+                other.column_number,
             )
         return False
 
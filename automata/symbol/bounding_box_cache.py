@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import os
+import pickle
+from typing import Dict, Optional
+
+from automata.singletons.py_module_loader import ParsingStrategy
+from automata.symbol.symbol_utils import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+# Maps a symbol URI to its bounding box, or to None when it could not be computed
+ModuleBoundingBoxes = Dict[str, Optional[BoundingBox]]
+
+
+class BoundingBoxCache:
+    """
+    A persistent on-disk cache for the bounding boxes of the symbols in a module.
+
+    There is one entry per module file and parsing strategy, which records the
+    content hash of the module when its bounding boxes were computed. An entry is
+    only used while the module is unchanged, so edits result in a recomputation for
+    that file alone.
+    """
+
+    CACHE_VERSION = 2
+    MAGIC = b"AUTOMATA-BOUNDING-BOXES"
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def get_content_hash(module_fpath: str) -> str:
+        """Computes the content hash of a module file."""
+        with open(module_fpath, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def load(
+        self, module_fpath: str, content_hash: str, parsing_strategy: ParsingStrategy
+    ) -> Optional[ModuleBoundingBoxes]:
+        """
+        Loads the bounding boxes of a module, or returns None if they are not cached
+        or were computed for different content.
+        """
+        entry_path = self._get_entry_path(module_fpath, parsing_strategy)
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            with open(entry_path, "rb") as f:
+                if f.read(len(BoundingBoxCache.MAGIC)) != BoundingBoxCache.MAGIC:
+                    logger.warning(f"Ignoring malformed bounding box cache entry {entry_path}")
+                    return None
+                if int.from_bytes(f.read(4), "little") != BoundingBoxCache.CACHE_VERSION:
+                    return None
+                cached_content_hash, bounding_boxes = pickle.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load bounding box cache entry {entry_path}: {e}")
+            return None
+
+        if cached_content_hash != content_hash:
+            return None
+        return bounding_boxes
+
+    def save(
+        self,
+        module_fpath: str,
+        content_hash: str,
+        parsing_strategy: ParsingStrategy,
+        bounding_boxes: ModuleBoundingBoxes,
+    ) -> None:
+        """Atomically stores the bounding boxes computed for a module with the given content."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._get_entry_path(module_fpath, parsing_strategy)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BoundingBoxCache.MAGIC)
+            f.write(BoundingBoxCache.CACHE_VERSION.to_bytes(4, "little"))
+            pickle.dump((content_hash, bounding_boxes), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+    def _get_entry_path(self, module_fpath: str, parsing_strategy: ParsingStrategy) -> str:
+        path_hash = hashlib.sha256(os.path.abspath(module_fpath).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{path_hash}.{parsing_strategy.value}.boxes")
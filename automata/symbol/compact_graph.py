@@ -0,0 +1,291 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from automata.symbol.base import Symbol, SymbolReference
+
+REFERENCE_DTYPE = np.dtype(
+    [("line_number", np.int32), ("column_number", np.int32), ("roles", np.int32)]
+)
+
+# Flags used to store the attributes of "relationship" edges
+RELATIONSHIP_FLAGS = {
+    "isReference": 1,
+    "isImplementation": 2,
+    "isTypeDefinition": 4,
+    "isDefinition": 8,
+}
+
+
+def _build_indptr(sorted_ids: np.ndarray, id_count: int) -> np.ndarray:
+    counts = np.bincount(sorted_ids, minlength=id_count)
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+class EdgeTable:
+    """
+    The edges of a single label, stored as parallel COO arrays.
+
+    Edges are sorted by source, so `source_indptr` gives the CSR index of the
+    out-edges of each source id. In-edges are reached through `target_order`,
+    a permutation of the edges sorted by target, together with `target_indptr`.
+    """
+
+    def __init__(
+        self,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        source_count: int,
+        target_count: int,
+        data: Optional[np.ndarray] = None,
+    ) -> None:
+        order = np.argsort(sources, kind="stable")
+        self.sources = sources[order].astype(np.int32)
+        self.targets = targets[order].astype(np.int32)
+        self.data = data[order] if data is not None else None
+        self.source_indptr = _build_indptr(self.sources, source_count)
+        self.target_order = np.argsort(self.targets, kind="stable").astype(np.int32)
+        self.target_indptr = _build_indptr(self.targets[self.target_order], target_count)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def get_out_edges(self, source_id: int) -> np.ndarray:
+        """Returns the indices of the edges leaving `source_id`."""
+        return np.arange(self.source_indptr[source_id], self.source_indptr[source_id + 1])
+
+    def get_in_edges(self, target_id: int) -> np.ndarray:
+        """Returns the indices of the edges entering `target_id`."""
+        return self.target_order[self.target_indptr[target_id] : self.target_indptr[target_id + 1]]
+
+    def filter(
+        self,
+        keep_edge: np.ndarray,
+        source_remap: np.ndarray,
+        target_remap: np.ndarray,
+        source_count: int,
+        target_count: int,
+    ) -> "EdgeTable":
+        """Returns a new table with only the kept edges, with their endpoints remapped."""
+        return EdgeTable(
+            source_remap[self.sources[keep_edge]],
+            target_remap[self.targets[keep_edge]],
+            source_count,
+            target_count,
+            self.data[keep_edge] if self.data is not None else None,
+        )
+
+
+class CompactSymbolGraph:
+    """
+    An array-backed representation of the `MultiDiGraph` built by the `GraphBuilder`.
+
+    Symbols and file paths are interned to integer ids and the edges of each label
+    ("contains", "reference", "relationship", "caller" and "callee") are stored in
+    an `EdgeTable`. Reference line, column and role data live in a structured
+    array alongside the edges, in place of per-edge attribute dictionaries and
+    `SymbolReference` objects.
+    """
+
+    def __init__(
+        self,
+        symbols: List[Symbol],
+        files: List[str],
+        is_supported: np.ndarray,
+        contains: EdgeTable,
+        references: EdgeTable,
+        relationships: EdgeTable,
+        callers: EdgeTable,
+        callees: EdgeTable,
+    ) -> None:
+        self.symbols = symbols
+        self.files = files
+        self.is_supported = is_supported
+        self.contains = contains
+        self.references = references
+        self.relationships = relationships
+        self.callers = callers
+        self.callees = callees
+        self.symbol_ids = {symbol: symbol_id for symbol_id, symbol in enumerate(symbols)}
+        self.file_ids = {file: file_id for file_id, file in enumerate(files)}
+        # Maps a file id to its reference edges sorted by (line, column), and their lines
+        self._file_reference_index: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_multi_digraph(cls, graph: nx.MultiDiGraph) -> "CompactSymbolGraph":
+        """Interns the nodes of a symbol `MultiDiGraph` and packs its edges by label."""
+        symbols: List[Symbol] = []
+        files: List[str] = []
+        supported: List[bool] = []
+        node_ids: Dict[Any, int] = {}
+        for node, data in graph.nodes(data=True):
+            if isinstance(node, Symbol):
+                node_ids[node] = len(symbols)
+                symbols.append(node)
+                supported.append(data.get("label") == "symbol")
+            else:
+                node_ids[node] = len(files)
+                files.append(node)
+
+        edges: Dict[str, Tuple[List[int], List[int], List[Any]]] = {
+            label: ([], [], [])
+            for label in ("contains", "reference", "relationship", "caller", "callee")
+        }
+        for source, target, data in graph.edges(data=True):
+            label = data.get("label")
+            if label not in edges:
+                continue
+            sources, targets, edge_data = edges[label]
+            sources.append(node_ids[source])
+            targets.append(node_ids[target])
+            if label == "reference":
+                symbol_reference = data["symbol_reference"]
+                edge_data.append(
+                    (
+                        symbol_reference.line_number,
+                        symbol_reference.column_number,
+                        symbol_reference.role_mask,
+                    )
+                )
+            elif label in ("caller", "callee"):
+                edge_data.append(
+                    (
+                        data["line_number"],
+                        data["column_number"],
+                        data["roles"],
+                    )
+                )
+            elif label == "relationship":
+                edge_data.append(
+                    sum(flag for name, flag in RELATIONSHIP_FLAGS.items() if data.get(name))
+                )
+
+        def build_table(
+            label: str, source_count: int, target_count: int, dtype: Optional[Any] = None
+        ) -> EdgeTable:
+            sources, targets, edge_data = edges[label]
+            return EdgeTable(
+                np.array(sources, dtype=np.int32),
+                np.array(targets, dtype=np.int32),
+                source_count,
+                target_count,
+                np.array(edge_data, dtype=dtype) if dtype is not None else None,
+            )
+
+        return cls(
+            symbols=symbols,
+            files=files,
+            is_supported=np.array(supported, dtype=bool),
+            contains=build_table("contains", len(files), len(symbols)),
+            references=build_table("reference", len(symbols), len(files), REFERENCE_DTYPE),
+            relationships=build_table("relationship", len(symbols), len(symbols), np.uint8),
+            callers=build_table("caller", len(symbols), len(symbols), REFERENCE_DTYPE),
+            callees=build_table("callee", len(symbols), len(symbols), REFERENCE_DTYPE),
+        )
+
+    def get_symbol_id(self, symbol: Symbol) -> int:
+        """
+        Raises:
+            NetworkXError: If the symbol is not in the graph, like the `MultiDiGraph` would.
+        """
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            raise nx.NetworkXError(f"nbunch is not a node or a sequence of nodes: {symbol}")
+        return symbol_id
+
+    def get_file_id(self, file: str) -> int:
+        """
+        Raises:
+            NetworkXError: If the file is not in the graph, like the `MultiDiGraph` would.
+        """
+        file_id = self.file_ids.get(file)
+        if file_id is None:
+            raise nx.NetworkXError(f"nbunch is not a node or a sequence of nodes: {file}")
+        return file_id
+
+    def get_supported_symbols(self) -> List[Symbol]:
+        return [self.symbols[symbol_id] for symbol_id in np.flatnonzero(self.is_supported)]
+
+    def build_symbol_reference(self, symbol_id: int, reference_data: np.void) -> SymbolReference:
+        """Builds a `SymbolReference` from a row of reference data."""
+        return SymbolReference(
+            symbol=self.symbols[symbol_id],
+            line_number=int(reference_data["line_number"]),
+            column_number=int(reference_data["column_number"]),
+            roles=int(reference_data["roles"]),
+        )
+
+    def get_file_references_in_range(
+        self, file_id: int, start_line: int, end_line: int, start_col: int
+    ) -> np.ndarray:
+        """
+        Returns the reference edges into `file_id` with `start_line <= line < end_line`
+        and `column >= start_col`, ordered by (line, column).
+        """
+        sorted_edges, sorted_lines = self._get_file_reference_index(file_id)
+        lower, upper = np.searchsorted(sorted_lines, [start_line, end_line], side="left")
+        edges = sorted_edges[lower:upper]
+        return edges[self.references.data["column_number"][edges] >= start_col]  # type: ignore
+
+    def get_sorted_file_references(self, file_id: int) -> np.ndarray:
+        """Returns the reference edges into `file_id`, ordered by (line, column)."""
+        return self._get_file_reference_index(file_id)[0]
+
+    def _get_file_reference_index(self, file_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        if file_id not in self._file_reference_index:
+            edges = self.references.get_in_edges(file_id)
+            reference_data = self.references.data[edges]  # type: ignore
+            order = np.lexsort((reference_data["column_number"], reference_data["line_number"]))
+            self._file_reference_index[file_id] = (
+                edges[order],
+                reference_data["line_number"][order],
+            )
+        return self._file_reference_index[file_id]
+
+    def filter_symbols(self, sorted_supported_symbols: Iterable[Symbol]) -> None:
+        """
+        Removes supported symbols which are not in `sorted_supported_symbols`, along
+        with all of their edges. This mirrors `filter_multi_digraph_by_symbols`.
+        """
+        allowed_symbols: Set[Symbol] = set(sorted_supported_symbols)
+        keep_symbol = np.array(
+            [
+                not is_supported or symbol in allowed_symbols
+                for symbol, is_supported in zip(self.symbols, self.is_supported)
+            ],
+            dtype=bool,
+        )
+        if keep_symbol.all():
+            return
+
+        symbol_remap = np.cumsum(keep_symbol, dtype=np.int64) - 1
+        file_remap = np.arange(len(self.files), dtype=np.int64)
+        symbol_count = int(keep_symbol.sum())
+        file_count = len(self.files)
+
+        self.contains = self.contains.filter(
+            keep_symbol[self.contains.targets], file_remap, symbol_remap, file_count, symbol_count
+        )
+        self.references = self.references.filter(
+            keep_symbol[self.references.sources],
+            symbol_remap,
+            file_remap,
+            symbol_count,
+            file_count,
+        )
+        self.relationships, self.callers, self.callees = (
+            table.filter(
+                keep_symbol[table.sources] & keep_symbol[table.targets],
+                symbol_remap,
+                symbol_remap,
+                symbol_count,
+                symbol_count,
+            )
+            for table in (self.relationships, self.callers, self.callees)
+        )
+
+        self.symbols = [symbol for symbol, keep in zip(self.symbols, keep_symbol) if keep]
+        self.is_supported = self.is_supported[keep_symbol]
+        self.symbol_ids = {symbol: symbol_id for symbol_id, symbol in enumerate(self.symbols)}
+        self._file_reference_index.clear()
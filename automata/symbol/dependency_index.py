@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from automata.symbol.base import Symbol, SymbolDescriptor
+from automata.symbol.compact_graph import EdgeTable
+
+
+class SymbolDependencyIndex:
+    """
+    The dependencies between symbols, interned to integer ids and stored as a CSR
+    adjacency in both directions, for transitive dependency and impact queries.
+
+    A query walks the adjacency breadth-first from a symbol, so the depth of each
+    reached symbol is its shortest hop distance. The full closure of each queried
+    symbol is memoized, and depth-limited and kind-filtered queries are answered
+    from it without walking the graph again.
+    """
+
+    CLOSURE_CACHE_SIZE = 4096
+
+    def __init__(self, dependencies: Mapping[Symbol, Iterable[Symbol]]) -> None:
+        """
+        Args:
+            dependencies: Maps each symbol to the symbols it depends on.
+        """
+        dependency_lists = {symbol: list(targets) for symbol, targets in dependencies.items()}
+        symbol_set = set(dependency_lists)
+        for symbol_targets in dependency_lists.values():
+            symbol_set.update(symbol_targets)
+        self.symbols: List[Symbol] = sorted(symbol_set, key=lambda symbol: symbol.dotpath)
+        self.symbol_ids = {symbol: symbol_id for symbol_id, symbol in enumerate(self.symbols)}
+
+        sources: List[int] = []
+        targets: List[int] = []
+        for symbol, symbol_targets in dependency_lists.items():
+            source_id = self.symbol_ids[symbol]
+            for target_id in {self.symbol_ids[target] for target in symbol_targets}:
+                if target_id != source_id:
+                    sources.append(source_id)
+                    targets.append(target_id)
+
+        symbol_count = len(self.symbols)
+        edges = EdgeTable(
+            np.array(sources, dtype=np.int32),
+            np.array(targets, dtype=np.int32),
+            symbol_count,
+            symbol_count,
+        )
+        # The (indptr, indices) of the dependencies and of the dependents of each symbol
+        self._adjacency = (edges.source_indptr, edges.targets)
+        self._reverse_adjacency = (edges.target_indptr, edges.sources[edges.target_order])
+        self._closures: Dict[Tuple[int, bool], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def get_dependencies(
+        self,
+        symbol: Symbol,
+        max_depth: Optional[int] = None,
+        kinds: Optional[Iterable[SymbolDescriptor.PyKind]] = None,
+    ) -> Dict[Symbol, int]:
+        """
+        Gets the symbols which `symbol` depends on, directly or transitively, mapped
+        to their hop distance and ordered by it. See `_query` for the arguments.
+        """
+        return self._query(symbol, False, max_depth, kinds)
+
+    def get_dependents(
+        self,
+        symbol: Symbol,
+        max_depth: Optional[int] = None,
+        kinds: Optional[Iterable[SymbolDescriptor.PyKind]] = None,
+    ) -> Dict[Symbol, int]:
+        """
+        Gets the symbols which depend on `symbol`, directly or transitively, i.e. those
+        affected by a change to it, mapped to their hop distance and ordered by it.
+        """
+        return self._query(symbol, True, max_depth, kinds)
+
+    def _query(
+        self,
+        symbol: Symbol,
+        reverse: bool,
+        max_depth: Optional[int],
+        kinds: Optional[Iterable[SymbolDescriptor.PyKind]],
+    ) -> Dict[Symbol, int]:
+        """
+        Args:
+            symbol: The symbol to start from, symbols without dependencies give no results.
+            reverse: Whether to follow dependents rather than dependencies.
+            max_depth: The maximum number of hops, or None for the full closure.
+            kinds: If given, only symbols of these kinds are returned. The walk
+                still passes through symbols of other kinds.
+        """
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            return {}
+
+        reached_ids, depths = self._get_closure(symbol_id, reverse)
+        if max_depth is not None:
+            within_depth = depths <= max_depth
+            reached_ids, depths = reached_ids[within_depth], depths[within_depth]
+
+        accepted_kinds = set(kinds) if kinds is not None else None
+        result: Dict[Symbol, int] = {}
+        for reached_id, depth in zip(reached_ids.tolist(), depths.tolist()):
+            reached_symbol = self.symbols[reached_id]
+            if accepted_kinds is None or reached_symbol.symbol_kind_by_suffix() in accepted_kinds:
+                result[reached_symbol] = depth
+        return result
+
+    def _get_closure(self, symbol_id: int, reverse: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the ids of the symbols reachable from `symbol_id` and their depths, ordered by
+        depth and then by dotpath. Each frontier of the walk is expanded at once with numpy.
+        """
+        key = (symbol_id, reverse)
+        if key in self._closures:
+            return self._closures[key]
+
+        indptr, indices = self._reverse_adjacency if reverse else self._adjacency
+        depths = np.full(len(self.symbols), -1, dtype=np.int32)
+        depths[symbol_id] = 0
+        frontier = np.array([symbol_id], dtype=np.int64)
+        depth = 0
+        while len(frontier) > 0:
+            depth += 1
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            lengths = ends - starts
+            if lengths.sum() == 0:
+                break
+            # Concatenates the adjacency slices of the frontier without a python loop
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            neighbors = indices[offsets + np.arange(lengths.sum())]
+            frontier = np.unique(neighbors[depths[neighbors] < 0])
+            depths[frontier] = depth
+
+        reached_ids = np.flatnonzero(depths > 0)
+        order = np.lexsort((reached_ids, depths[reached_ids]))
+        closure = (reached_ids[order], depths[reached_ids][order])
+
+        if len(self._closures) >= SymbolDependencyIndex.CLOSURE_CACHE_SIZE:
+            # Evicts the oldest closure, dictionaries keep insertion order
+            self._closures.pop(next(iter(self._closures)))
+        self._closures[key] = closure
+        return closure
@@ -0,0 +1,126 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from automata.symbol.index_reader import ScipIndexReader
+from automata.symbol.parser import is_local_symbol
+from automata.symbol.scip_pb2 import Document  # type: ignore
+
+# Maps a package name to the version its symbols are rewritten to
+PackageVersions = Dict[str, str]
+
+
+class IndexSource(NamedTuple):
+    """
+    A SCIP index which is federated with others into a single `SymbolGraph`.
+
+    The relative paths of the documents of the index are prefixed with its namespace,
+    so that indices of different repositories can not collide. When a package version
+    is given, the symbols of the package of the index are rewritten to it in every
+    index of the graph, so that references from other indices, which may have been
+    indexed against a different version of the package, resolve to the same symbols.
+    """
+
+    index_path: str
+    namespace: str
+    package_version: Optional[str] = None
+
+
+def validate_index_sources(sources: Sequence[IndexSource]) -> None:
+    """
+    Raises:
+        ValueError: If there are no sources, or if a namespace is empty, contains a
+            path separator or is used by more than one source.
+    """
+    if not sources:
+        raise ValueError("At least one index source is required")
+    namespaces = [source.namespace for source in sources]
+    for namespace in namespaces:
+        if not namespace or "/" in namespace:
+            raise ValueError(f"Invalid index namespace {namespace!r}")
+    if len(set(namespaces)) != len(namespaces):
+        raise ValueError(f"Index namespaces must be unique, got {namespaces}")
+
+
+def get_index_package_name(reader: ScipIndexReader) -> Optional[str]:
+    """Gets the name of the package of an index, from the first global symbol it lists."""
+    for document in reader.documents:
+        for symbol_information in document.symbols:
+            package_name = _get_package_name(symbol_information.symbol)
+            if package_name is not None:
+                return package_name
+    return None
+
+
+def get_package_versions(sources: Sequence[IndexSource]) -> PackageVersions:
+    """Gets the versions which the packages of the given sources are pinned to."""
+    package_versions: PackageVersions = {}
+    for source in sources:
+        if source.package_version is None:
+            continue
+        with ScipIndexReader(source.index_path) as reader:
+            package_name = get_index_package_name(reader)
+        if package_name is not None:
+            package_versions[package_name] = source.package_version
+    return package_versions
+
+
+def rewrite_symbol_version(symbol_uri: str, package_versions: PackageVersions) -> str:
+    """Rewrites the version of a symbol URI when its package is pinned in `package_versions`."""
+    if is_local_symbol(symbol_uri):
+        return symbol_uri
+    parts = symbol_uri.split(" ", 4)
+    if len(parts) < 5 or parts[2] not in package_versions:
+        return symbol_uri
+    parts[3] = package_versions[parts[2]]
+    return " ".join(parts)
+
+
+def _get_package_name(symbol_uri: str) -> Optional[str]:
+    if is_local_symbol(symbol_uri):
+        return None
+    parts = symbol_uri.split(" ", 4)
+    return parts[2] if len(parts) == 5 else None
+
+
+class IndexSourceReader(ScipIndexReader):
+    """
+    A lazy reader for an `IndexSource`, whose `Documents` have their relative paths
+    namespaced and their symbols rewritten to the pinned package versions.
+    """
+
+    def __init__(self, source: IndexSource, package_versions: Optional[PackageVersions] = None):
+        super().__init__(source.index_path)
+        self.source = source
+        self.package_versions = package_versions or {}
+
+    def __enter__(self) -> "IndexSourceReader":
+        return self
+
+    @property
+    def path_prefix(self) -> str:
+        """The prefix of the relative paths of the documents of the source."""
+        return f"{self.source.namespace}/"
+
+    def get_document(self, index: int) -> Document:
+        document = Document()
+        document.ParseFromString(ScipIndexReader.get_serialized_document(self, index))
+        document.relative_path = f"{self.path_prefix}{document.relative_path}"
+        if self.package_versions:
+            self._rewrite_symbols(document)
+        return document
+
+    def get_serialized_document(self, index: int) -> bytes:
+        return self.get_document(index).SerializeToString()
+
+    def get_document_paths(self) -> List[str]:
+        return [f"{self.path_prefix}{path}" for path in super().get_document_paths()]
+
+    def _rewrite_symbols(self, document: Any) -> None:
+        package_versions = self.package_versions
+        for occurrence in document.occurrences:
+            occurrence.symbol = rewrite_symbol_version(occurrence.symbol, package_versions)
+        for symbol_information in document.symbols:
+            symbol_information.symbol = rewrite_symbol_version(
+                symbol_information.symbol, package_versions
+            )
+            for relationship in symbol_information.relationships:
+                relationship.symbol = rewrite_symbol_version(relationship.symbol, package_versions)
@@ -1,9 +1,28 @@
+import hashlib
 import logging
+import os
 from abc import ABC, abstractmethod
+from bisect import bisect_left
 from concurrent.futures import ProcessPoolExecutor
-from functools import lru_cache, partial
+from enum import Enum
+from functools import partial
+from heapq import heappop, heappush
 from time import time
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import networkx as nx
 from google.protobuf.json_format import MessageToDict  # type: ignore
@@ -11,16 +30,32 @@ from tqdm import tqdm
 
 from automata.config import MAX_WORKERS
 from automata.core.utils import filter_multi_digraph_by_symbols
-from automata.singletons.py_module_loader import py_module_loader
+from automata.singletons.py_module_loader import ParsingStrategy, py_module_loader
 from automata.symbol.base import (
     ISymbolProvider,
     Symbol,
     SymbolDescriptor,
     SymbolReference,
 )
+from automata.symbol.bounding_box_cache import BoundingBoxCache, ModuleBoundingBoxes
+from automata.symbol.compact_graph import CompactSymbolGraph
+from automata.symbol.dependency_index import SymbolDependencyIndex
+from automata.symbol.federation import (
+    IndexSource,
+    IndexSourceReader,
+    get_package_versions,
+    validate_index_sources,
+)
+from automata.symbol.graph_cache import SymbolGraphCache
+from automata.symbol.index_reader import ScipIndexReader
+from automata.symbol.labeled_graph import LabeledMultiDiGraph
 from automata.symbol.parser import parse_symbol
-from automata.symbol.scip_pb2 import Index, SymbolRole  # type: ignore
-from automata.symbol.symbol_utils import convert_to_fst_object, get_rankable_symbols
+from automata.symbol.scip_pb2 import Document, Index, SymbolRole  # type: ignore
+from automata.symbol.symbol_utils import (
+    BoundingBox,
+    get_rankable_symbols,
+    get_symbol_bounding_box,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +72,7 @@ class GraphProcessor(ABC):
 class _RelationshipProcessor(GraphProcessor):
     """Adds edges to the `MultiDiGraph` for relationships between `Symbol` nodes."""
 
-    def __init__(self, graph: nx.MultiDiGraph, symbol_information: Any) -> None:
+    def __init__(self, graph: LabeledMultiDiGraph, symbol_information: Any) -> None:
         self._graph = graph
         self.symbol_information = symbol_information
 
@@ -76,8 +111,7 @@ class _RelationshipProcessor(GraphProcessor):
         `Animal#sound()` method as well.
         """
         for relationship in self.symbol_information.relationships:
-            relationship_labels = MessageToDict(relationship)
-            relationship_labels.pop("symbol")
+            relationship_labels = _RelationshipProcessor.get_relationship_labels(relationship)
             related_symbol = parse_symbol(relationship.symbol)
             self._graph.add_edge(
                 self.symbol_information.symbol,
@@ -86,11 +120,18 @@ class _RelationshipProcessor(GraphProcessor):
                 **relationship_labels,
             )
 
+    @staticmethod
+    def get_relationship_labels(relationship: Any) -> Dict[str, Any]:
+        """Gets the edge attributes of a relationship, e.g. `{"isImplementation": True}`."""
+        relationship_labels = MessageToDict(relationship)
+        relationship_labels.pop("symbol")
+        return relationship_labels
+
 
 class _ReferenceProcessor(GraphProcessor):
     """Adds edges to the `MultiDiGraph` for references between `Symbol` nodes."""
 
-    def __init__(self, graph: nx.MultiDiGraph, document: Any) -> None:
+    def __init__(self, graph: LabeledMultiDiGraph, document: Any) -> None:
         self._graph = graph
         self.document = document
 
@@ -111,12 +152,11 @@ class _ReferenceProcessor(GraphProcessor):
                 continue
 
             occurrence_range = tuple(occurrence.range)
-            occurrence_roles = _ReferenceProcessor._process_symbol_roles(occurrence.symbol_roles)
             occurrence_reference = SymbolReference(
                 symbol=occurrence_symbol,
                 line_number=occurrence_range[0],
                 column_number=occurrence_range[1],
-                roles=occurrence_roles,
+                roles=occurrence.symbol_roles,
             )
             self._graph.add_edge(
                 occurrence_symbol,
@@ -124,16 +164,8 @@ class _ReferenceProcessor(GraphProcessor):
                 symbol_reference=occurrence_reference,
                 label="reference",
             )
-            if occurrence_roles.get(SymbolRole.Name(SymbolRole.Definition)):
-                # TODO this is gross
-                incorrect_contains_edges = [
-                    (source, target)
-                    for source, target, data in self._graph.in_edges(occurrence_symbol, data=True)
-                    if data.get("label") == "contains"
-                ]
-                for source, target in incorrect_contains_edges:
-                    self._graph.remove_edge(source, target)
-
+            if occurrence.symbol_roles & SymbolRole.Definition:
+                _ReferenceProcessor._remove_contains_edges(self._graph, occurrence_symbol)
                 self._graph.add_edge(
                     self.document.relative_path,
                     occurrence_symbol,
@@ -141,20 +173,29 @@ class _ReferenceProcessor(GraphProcessor):
                 )
 
     @staticmethod
-    def _process_symbol_roles(role: int) -> Dict[str, bool]:
-        return {
-            role_name: (role & role_value) > 0
-            for role_name, role_value in SymbolRole.items()
-            if (role & role_value) > 0
-        }
+    def _remove_contains_edges(graph: LabeledMultiDiGraph, symbol: Symbol) -> None:
+        """Removes every "contains" edge which points at the given symbol."""
+        # TODO this is gross
+        incorrect_contains_edges = [
+            (source, target)
+            for source, target, _ in graph.get_labeled_in_edges(symbol, "contains")
+        ]
+        for source, target in incorrect_contains_edges:
+            graph.remove_edge(source, target)
 
 
 class _CallerCalleeProcessor(GraphProcessor):
     """Adds edges to the `MultiDiGraph` for caller-callee relationships between `Symbol` nodes."""
 
-    def __init__(self, graph: nx.MultiDiGraph, document: Any) -> None:
+    def __init__(
+        self,
+        graph: LabeledMultiDiGraph,
+        document: Any,
+        bounding_box_cache: Optional[BoundingBoxCache] = None,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+    ) -> None:
         self._graph = graph
-        self.navigator = _SymbolGraphNavigator(graph)
+        self.navigator = _SymbolGraphNavigator(graph, bounding_box_cache, bounding_box_strategy)
         self.document = document
 
     def process(self) -> None:
@@ -166,6 +207,7 @@ class _CallerCalleeProcessor(GraphProcessor):
 
         Note - Construction is an expensive operation and should be used sparingly.
         """
+        method_symbols = []
         for symbol in self.document.symbols:
             try:
                 symbol_object = parse_symbol(symbol.symbol)
@@ -173,77 +215,189 @@ class _CallerCalleeProcessor(GraphProcessor):
                 logger.error(f"Parsing symbol {symbol.symbol} failed with error {e}")
                 continue
 
-            if symbol_object.symbol_kind_by_suffix() != SymbolDescriptor.PyKind.Method:
-                continue
-
-            try:
-                references_in_scope = self.navigator._get_symbol_references_in_scope(symbol_object)
-            except Exception as e:
-                logger.error(
-                    f"Failed to get references in scope for symbol {symbol} with error {e}"
-                )
-                continue
+            if symbol_object.symbol_kind_by_suffix() == SymbolDescriptor.PyKind.Method:
+                method_symbols.append(symbol_object)
 
+        if self.navigator.bounding_box_cache is not None and py_module_loader.initialized:
+            self.navigator.bounding_box = self.navigator._load_bounding_boxes(method_symbols)
+        references_in_scope_by_symbol = self.navigator._get_symbol_references_in_scope_bulk(
+            method_symbols
+        )
+        for symbol_object, references_in_scope in references_in_scope_by_symbol.items():
             for ref in references_in_scope:
                 try:
-                    if ref.symbol.symbol_kind_by_suffix() in [
-                        SymbolDescriptor.PyKind.Method,
-                        SymbolDescriptor.PyKind.Class,
-                    ]:
-                        if ref.symbol == symbol_object:
-                            continue
-                        # TODO - This approach will include non-call statements, like return statements
-                        # unfortunately, this seems necessary to get the full set of callers
-                        # e.g. omitting classes appears to remove constructor calls for X, like X()
-                        # For, we filtering is done downstream with the ASTNavigator
-                        # with current understanding, it seems handling will require AST awareness
-                        self._graph.add_edge(
-                            symbol_object,
-                            ref.symbol,
-                            line_number=ref.line_number,
-                            column_number=ref.column_number,
-                            roles=ref.roles,
-                            label="caller",
-                        )
-                        self._graph.add_edge(
-                            ref.symbol,
-                            symbol_object,
-                            line_number=ref.line_number,
-                            column_number=ref.column_number,
-                            roles=ref.roles,
-                            label="callee",
-                        )
+                    if not _CallerCalleeProcessor.is_potential_call(symbol_object, ref):
+                        continue
+                    self._graph.add_edge(
+                        symbol_object,
+                        ref.symbol,
+                        line_number=ref.line_number,
+                        column_number=ref.column_number,
+                        roles=ref.role_mask,
+                        label="caller",
+                    )
+                    self._graph.add_edge(
+                        ref.symbol,
+                        symbol_object,
+                        line_number=ref.line_number,
+                        column_number=ref.column_number,
+                        roles=ref.role_mask,
+                        label="callee",
+                    )
                 except Exception as e:
-                    logger.error(f"Failed to add caller-callee edge for {symbol} with error {e} ")
+                    logger.error(
+                        f"Failed to add caller-callee edge for {symbol_object.uri} with error {e} "
+                    )
                     continue
 
+    @staticmethod
+    def is_potential_call(caller: Symbol, ref: SymbolReference) -> bool:
+        """Checks whether a reference in the scope of `caller` can be a call."""
+        # TODO - This approach will include non-call statements, like return statements
+        # unfortunately, this seems necessary to get the full set of callers
+        # e.g. omitting classes appears to remove constructor calls for X, like X()
+        # For, we filtering is done downstream with the ASTNavigator
+        # with current understanding, it seems handling will require AST awareness
+        return ref.symbol != caller and ref.symbol.symbol_kind_by_suffix() in [
+            SymbolDescriptor.PyKind.Method,
+            SymbolDescriptor.PyKind.Class,
+        ]
+
+
+class _PartialGraph(NamedTuple):
+    """The nodes and edges produced by a worker for a contiguous shard of `Documents`."""
+
+    nodes: List[Tuple[Any, Dict[str, Any]]]
+    edges: List[Tuple[Any, Any, Dict[str, Any]]]
+    defined_symbol_uris: Set[str]
+
+
+def _build_partial_graph(serialized_documents: List[bytes]) -> _PartialGraph:
+    """Builds the graph for a shard of serialized `Documents` inside of a worker process."""
+    builder = GraphBuilder(Index())
+    defined_symbol_uris: Set[str] = set()
+    for serialized_document in serialized_documents:
+        document = Document()
+        document.ParseFromString(serialized_document)
+        builder._process_document(document)
+        defined_symbol_uris.update(
+            occurrence.symbol
+            for occurrence in document.occurrences
+            if occurrence.symbol_roles & SymbolRole.Definition
+        )
+
+    return _PartialGraph(
+        nodes=list(builder._graph.nodes(data=True)),
+        edges=list(builder._graph.edges(data=True)),
+        defined_symbol_uris=defined_symbol_uris,
+    )
+
 
 class GraphBuilder:
     """Builds a `SymbolGraph` from a corresponding Index."""
 
-    def __init__(self, index: Index, build_caller_relationships: bool = False) -> None:
+    # The number of shards handed to each worker when building in parallel,
+    # more shards give a better balance at the cost of more merge overhead
+    SHARDS_PER_WORKER = 4
+
+    def __init__(
+        self,
+        index: Union[Index, ScipIndexReader],
+        build_caller_relationships: bool = False,
+        parallel: bool = False,
+        max_workers: int = MAX_WORKERS,
+        bounding_box_cache: Optional[BoundingBoxCache] = None,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+        graph: Optional[LabeledMultiDiGraph] = None,
+    ) -> None:
         self.index = index
         self.build_caller_relationships = build_caller_relationships
-        self._graph = nx.MultiDiGraph()
-
-    def build_graph(self) -> nx.MultiDiGraph:
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.bounding_box_cache = bounding_box_cache
+        self.bounding_box_strategy = bounding_box_strategy
+        # Documents are added to an existing graph when one is given
+        self._graph = graph if graph is not None else LabeledMultiDiGraph()
+
+    def build_graph(self) -> LabeledMultiDiGraph:
         """
         Loop over all the `Documents` in the index of the graph
         and add corresponding `Symbol` nodes to the graph.
+        With a `ScipIndexReader`, the documents are decoded one at a time.
 
         The `Document` type, along with others, is defined in the scip_pb2.py file.
 
         Edges are added for relationships, references, and calls between `Symbol` nodes.
         """
+        if self.parallel and self.max_workers > 1:
+            self._build_graph_in_parallel()
+            if self.build_caller_relationships:
+                for document in self.index.documents:
+                    self._process_caller_callee_relationships(document)
+            return self._graph
+
         for document in self.index.documents:
-            self._add_symbol_vertices(document)
-            self._process_relationships(document)
-            self._process_references(document)
+            self._process_document(document)
             if self.build_caller_relationships:
                 self._process_caller_callee_relationships(document)
 
         return self._graph
 
+    def _process_document(self, document: Any) -> None:
+        self._add_symbol_vertices(document)
+        self._process_relationships(document)
+        self._process_references(document)
+
+    def _build_graph_in_parallel(self) -> None:
+        """
+        Shards the `Documents` into contiguous chunks, builds a partial graph for
+        each chunk in a worker process and merges the results in index order.
+
+        Caller-callee edges need the complete graph and are added afterwards.
+        """
+        if isinstance(self.index, ScipIndexReader):
+            serialized_documents = [
+                self.index.get_serialized_document(i) for i in range(len(self.index))
+            ]
+        else:
+            serialized_documents = [
+                document.SerializeToString() for document in self.index.documents
+            ]
+        shard_count = max(1, self.max_workers * GraphBuilder.SHARDS_PER_WORKER)
+        shard_size = max(1, -(-len(serialized_documents) // shard_count))
+        shards = [
+            serialized_documents[i : i + shard_size]
+            for i in range(0, len(serialized_documents), shard_size)
+        ]
+
+        now = time()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for partial_graph in executor.map(_build_partial_graph, shards):
+                self._merge_partial_graph(partial_graph)
+        logger.info(f"Built the symbol graph from {len(shards)} shards in {time() - now} seconds")
+
+    def _merge_partial_graph(self, partial_graph: _PartialGraph) -> None:
+        """
+        Merges a partial graph into the local graph.
+
+        Partial graphs must be merged in index order. A symbol with a definition
+        inside of the shard has its earlier "contains" edges discarded, which
+        mirrors the cleanup done by `_ReferenceProcessor` in a serial build.
+        """
+        self._graph.add_nodes_from(partial_graph.nodes)
+        self._graph.add_edges_from(
+            edge for edge in partial_graph.edges if edge[2].get("label") != "contains"
+        )
+
+        redefined_symbols: Set[Symbol] = set()
+        for source, target, data in partial_graph.edges:
+            if data.get("label") != "contains":
+                continue
+            if target.uri in partial_graph.defined_symbol_uris and target not in redefined_symbols:
+                _ReferenceProcessor._remove_contains_edges(self._graph, target)
+                redefined_symbols.add(target)
+            self._graph.add_edge(source, target, **data)
+
     def _add_symbol_vertices(self, document: Any) -> None:
         for symbol_information in document.symbols:
             try:
@@ -265,20 +419,313 @@ class GraphBuilder:
         occurrence_manager.process()
 
     def _process_caller_callee_relationships(self, document: Any) -> None:
-        caller_callee_manager = _CallerCalleeProcessor(self._graph, document)
+        caller_callee_manager = _CallerCalleeProcessor(
+            self._graph, document, self.bounding_box_cache, self.bounding_box_strategy
+        )
         caller_callee_manager.process()
 
 
+class IndexDelta(NamedTuple):
+    """The documents of a regenerated index which differ from those a graph was built from."""
+
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+class _DocumentRecord(NamedTuple):
+    """
+    What a `Document` contributed to the graph, kept so that the document can be
+    removed from the graph once the index it came from has been regenerated.
+    """
+
+    symbols: Tuple[str, ...]
+    defined_symbols: FrozenSet[str]
+    relationships: Tuple[Tuple[str, str, Tuple[Tuple[str, Any], ...]], ...]
+
+    @classmethod
+    def from_document(cls, document: Any) -> "_DocumentRecord":
+        definition_role = SymbolRole.Definition
+        return cls(
+            symbols=tuple(symbol_information.symbol for symbol_information in document.symbols),
+            defined_symbols=frozenset(
+                occurrence.symbol
+                for occurrence in document.occurrences
+                if occurrence.symbol_roles & definition_role
+            ),
+            relationships=tuple(
+                (
+                    symbol_information.symbol,
+                    relationship.symbol,
+                    tuple(
+                        sorted(
+                            _RelationshipProcessor.get_relationship_labels(relationship).items()
+                        )
+                    ),
+                )
+                for symbol_information in document.symbols
+                for relationship in symbol_information.relationships
+            ),
+        )
+
+
+def _get_defined_symbol_uris(graph: LabeledMultiDiGraph) -> Set[str]:
+    """Gets the URIs of the symbols with a definition among the references of the graph."""
+    return {
+        symbol.uri
+        for symbol, _, data in graph.edges(data=True)
+        if data.get("label") == "reference"
+        and data["symbol_reference"].role_mask & SymbolRole.Definition
+    }
+
+
+def _get_document_fingerprints(index: Union[Index, ScipIndexReader]) -> Dict[str, str]:
+    """
+    Gets the fingerprint of each `Document` in the index, keyed by path and in index order.
+    The documents of a reader are hashed as they are encoded, without decoding them, which
+    gives the same fingerprints as hashing the encoding of the decoded documents.
+    """
+    if isinstance(index, ScipIndexReader):
+        return {
+            path: index.get_document_fingerprint(position)
+            for position, path in enumerate(index.get_document_paths())
+        }
+    return {
+        document.relative_path: hashlib.sha256(document.SerializeToString()).hexdigest()
+        for document in index.documents
+    }
+
+
+def _iter_documents(
+    index: Union[Index, ScipIndexReader], paths: Optional[Set[str]] = None
+) -> Iterator[Any]:
+    """
+    Yields the `Documents` of the index with the given paths, or all of them, in index
+    order. Only those documents are decoded from a reader.
+    """
+    if isinstance(index, ScipIndexReader):
+        for position, path in enumerate(index.get_document_paths()):
+            if paths is None or path in paths:
+                yield index.get_document(position)
+    else:
+        for document in index.documents:
+            if paths is None or document.relative_path in paths:
+                yield document
+
+
+def _get_document_records(
+    index: Union[Index, ScipIndexReader], paths: Optional[Set[str]] = None
+) -> Dict[str, _DocumentRecord]:
+    """Gets the record of each `Document` in the index, or of those with the given paths."""
+    return {
+        document.relative_path: _DocumentRecord.from_document(document)
+        for document in _iter_documents(index, paths)
+    }
+
+
+def _diff_document_fingerprints(
+    old_fingerprints: Dict[str, str], new_fingerprints: Dict[str, str]
+) -> IndexDelta:
+    return IndexDelta(
+        added=[path for path in new_fingerprints if path not in old_fingerprints],
+        changed=[
+            path
+            for path, fingerprint in new_fingerprints.items()
+            if path in old_fingerprints and old_fingerprints[path] != fingerprint
+        ],
+        removed=[path for path in old_fingerprints if path not in new_fingerprints],
+    )
+
+
+def _get_delta_symbols(
+    delta: IndexDelta,
+    old_records: Dict[str, _DocumentRecord],
+    new_records: Dict[str, _DocumentRecord],
+) -> Dict[str, Symbol]:
+    """Gets the symbols listed or defined by the documents of a delta, before or after it."""
+    symbol_uris: Set[str] = set()
+    for path in delta.changed + delta.removed:
+        symbol_uris.update(old_records[path].symbols, old_records[path].defined_symbols)
+    for path in delta.changed + delta.added:
+        symbol_uris.update(new_records[path].symbols, new_records[path].defined_symbols)
+
+    symbols: Dict[str, Symbol] = {}
+    for symbol_uri in symbol_uris:
+        try:
+            symbols[symbol_uri] = parse_symbol(symbol_uri)
+        except Exception:
+            # The failure is logged when the document is processed
+            continue
+    return symbols
+
+
+class _IndexDeltaProcessor(GraphProcessor):
+    """
+    Updates a `MultiDiGraph` in place from a regenerated index, by removing what the changed
+    and removed `Documents` contributed to it and processing the changed and added ones again.
+
+    A document owns the "reference" edges into its file, the "contains" edges out of it,
+    and the "relationship" edges and "caller"/"callee" edges of the symbols it lists.
+    """
+
+    def __init__(
+        self,
+        graph: LabeledMultiDiGraph,
+        old_records: Dict[str, _DocumentRecord],
+        new_index: Union[Index, ScipIndexReader],
+        new_records: Dict[str, _DocumentRecord],
+        delta: IndexDelta,
+        build_caller_relationships: bool = False,
+        bounding_box_cache: Optional[BoundingBoxCache] = None,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+    ) -> None:
+        self._graph = graph
+        self.old_records = old_records
+        self.new_index = new_index
+        self.new_records = new_records
+        self.delta = delta
+        self.build_caller_relationships = build_caller_relationships
+        self.bounding_box_cache = bounding_box_cache
+        self.bounding_box_strategy = bounding_box_strategy
+        # The symbols listed or defined by the documents of the delta
+        self.changed_symbols: Set[Symbol] = set()
+        # The changed symbols which were not supported before the delta
+        self.added_symbols: Set[Symbol] = set()
+
+    def process(self) -> None:
+        fresh_paths = set(self.delta.changed + self.delta.added)
+        symbols_by_uri = _get_delta_symbols(self.delta, self.old_records, self.new_records)
+        self.changed_symbols = set(symbols_by_uri.values())
+        previously_supported = {
+            symbol for symbol in self.changed_symbols if self._is_supported_symbol(symbol)
+        }
+
+        removal_candidates: Set[Any] = set(self.changed_symbols)
+        for path in self.delta.changed + self.delta.removed:
+            removal_candidates.update(self._remove_document(path, self.old_records[path]))
+
+        builder = GraphBuilder(
+            self.new_index,
+            bounding_box_cache=self.bounding_box_cache,
+            bounding_box_strategy=self.bounding_box_strategy,
+            graph=self._graph,
+        )
+        fresh_documents = list(_iter_documents(self.new_index, fresh_paths))
+        for document in fresh_documents:
+            builder._process_document(document)
+
+        self._restore_symbol_ownership(symbols_by_uri)
+        if self.build_caller_relationships:
+            for document in fresh_documents:
+                builder._process_caller_callee_relationships(document)
+
+        for node in removal_candidates:
+            if node in self._graph and self._graph.degree(node) == 0:
+                if self._graph.nodes[node].get("label") != "symbol":
+                    self._graph.remove_node(node)
+
+        self.added_symbols = {
+            symbol
+            for symbol in self.changed_symbols
+            if symbol not in previously_supported and self._is_supported_symbol(symbol)
+        }
+
+    def _is_supported_symbol(self, symbol: Symbol) -> bool:
+        return symbol in self._graph and self._graph.nodes[symbol].get("label") == "symbol"
+
+    def _remove_document(self, path: str, record: _DocumentRecord) -> Set[Any]:
+        """Removes the edges owned by a document, and returns the nodes they were attached to."""
+        touched_nodes: Set[Any] = {path}
+        if path in self._graph:
+            touched_nodes.update(self._graph.remove_labeled_in_edges(path, "reference"))
+            touched_nodes.update(self._graph.remove_labeled_out_edges(path, "contains"))
+
+        for source_uri, target_uri, relationship_labels in record.relationships:
+            try:
+                target = parse_symbol(target_uri)
+            except Exception:
+                continue
+            relationship_data = {"label": "relationship", **dict(relationship_labels)}
+            keydict = self._graph.get_edge_data(source_uri, target) or {}
+            key = next((key for key, data in keydict.items() if data == relationship_data), None)
+            if key is not None:
+                self._graph.remove_edge(source_uri, target, key)
+                touched_nodes.update((source_uri, target))
+
+        for symbol_uri in record.symbols:
+            try:
+                symbol = parse_symbol(symbol_uri)
+            except Exception:
+                continue
+            if (
+                symbol in self._graph
+                and symbol.symbol_kind_by_suffix() == SymbolDescriptor.PyKind.Method
+            ):
+                touched_nodes.update(self._graph.remove_labeled_out_edges(symbol, "caller"))
+                touched_nodes.update(self._graph.remove_labeled_in_edges(symbol, "callee"))
+        return touched_nodes
+
+    def _restore_symbol_ownership(self, symbols_by_uri: Dict[str, Symbol]) -> None:
+        """
+        Sets the "contains" edges and the labels of the changed symbols to those of a
+        full build, where the documents which list a symbol are its parent files until
+        a document defines it, which then takes it over from the documents before it.
+        """
+        owners: Dict[str, List[Tuple[str, int, bool]]] = {uri: [] for uri in symbols_by_uri}
+        for path, record in self.new_records.items():
+            listing_counts: Dict[str, int] = {}
+            for symbol_uri in record.symbols:
+                if symbol_uri in owners:
+                    listing_counts[symbol_uri] = listing_counts.get(symbol_uri, 0) + 1
+            for symbol_uri in listing_counts.keys() | (record.defined_symbols & owners.keys()):
+                owners[symbol_uri].append(
+                    (path, listing_counts.get(symbol_uri, 0), symbol_uri in record.defined_symbols)
+                )
+
+        for symbol_uri, symbol_owners in owners.items():
+            symbol = symbols_by_uri[symbol_uri]
+            parent_files: List[str] = []
+            for path, listing_count, is_defined in symbol_owners:
+                parent_files.extend([path] * listing_count)
+                if is_defined:
+                    parent_files = [path]
+
+            if symbol in self._graph:
+                current_parent_files = [
+                    source
+                    for source, _, __ in self._graph.get_labeled_in_edges(symbol, "contains")
+                ]
+                if sorted(current_parent_files) != sorted(parent_files):
+                    self._graph.remove_labeled_in_edges(symbol, "contains")
+                    current_parent_files = []
+            else:
+                current_parent_files = []
+            if not current_parent_files:
+                for path in parent_files:
+                    self._graph.add_edge(path, symbol, label="contains")
+
+            if symbol not in self._graph:
+                continue
+            if any(listing_count > 0 for _, listing_count, __ in symbol_owners):
+                self._graph.nodes[symbol]["label"] = "symbol"
+            else:
+                self._graph.nodes[symbol].pop("label", None)
+
+
 def process_symbol_bounds(
-    loader_args: Tuple[str, str], symbol: Symbol
-) -> Optional[Tuple[Symbol, Any]]:
-    """Uses RedBaron FST to compute the bounding box of a `Symbol`."""
+    loader_args: Tuple[str, str], parsing_strategy: ParsingStrategy, symbol: Symbol
+) -> Optional[Tuple[Symbol, BoundingBox]]:
+    """
+    Computes the bounding box of a `Symbol`, from the stdlib ast with
+    `ParsingStrategy.PYAST` or from the RedBaron FST otherwise.
+    """
     if not py_module_loader._dotpath_map:
         py_module_loader.initialize(*loader_args)
     try:
-        fst_object = convert_to_fst_object(symbol)
-        bounding_box = fst_object.absolute_bounding_box
-        return symbol, bounding_box
+        return symbol, get_symbol_bounding_box(symbol, parsing_strategy)
     except Exception as e:
         logger.error(f"Error computing bounding box for {symbol.uri}: {e}")
         return None
@@ -287,10 +734,32 @@ def process_symbol_bounds(
 class _SymbolGraphNavigator:
     """Handles navigation within a symbol graph."""
 
-    def __init__(self, graph: nx.MultiDiGraph) -> None:
+    def __init__(
+        self,
+        graph: LabeledMultiDiGraph,
+        bounding_box_cache: Optional[BoundingBoxCache] = None,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+        lazy_caller_relationships: bool = False,
+    ) -> None:
+        """
+        Args:
+            graph: The graph to navigate.
+            bounding_box_cache: If provided, symbol bounding boxes are persisted per module.
+            bounding_box_strategy: How symbol bounding boxes are computed, defaults to the
+                parsing strategy of the module loader.
+            lazy_caller_relationships: Whether callers and callees are computed on first
+                access for the modules involved, rather than read from graph edges.
+        """
         self._graph = graph
         # TODO - Find the correct way to define a bounding box
-        self.bounding_box: Dict[Symbol, Any] = {}  # Default to empty bounding boxes
+        self.bounding_box: Dict[Symbol, BoundingBox] = {}  # Default to empty bounding boxes
+        self.bounding_box_cache = bounding_box_cache
+        self.bounding_box_strategy = bounding_box_strategy
+        self.lazy_caller_relationships = lazy_caller_relationships
+        # Maps a module to the line numbers and (line, column) sorted references within it
+        self._module_reference_index: Dict[str, Tuple[List[int], List[SymbolReference]]] = {}
+        # Maps a module to the (caller, reference) pairs of the potential calls within it
+        self._module_calls: Dict[str, List[Tuple[Symbol, SymbolReference]]] = {}
 
     def get_sorted_supported_symbols(self) -> List[Symbol]:
         unsorted_symbols = [
@@ -304,9 +773,7 @@ class _SymbolGraphNavigator:
 
     def get_symbol_relationships(self, symbol: Symbol) -> Set[Symbol]:
         return {
-            target
-            for _, target, data in self._graph.out_edges(symbol, data=True)
-            if data.get("label") == "relationship"
+            target for _, target, __ in self._graph.get_labeled_out_edges(symbol, "relationship")
         }
 
     def get_references_to_symbol(self, symbol: Symbol) -> Dict[str, List[SymbolReference]]:
@@ -316,8 +783,7 @@ class _SymbolGraphNavigator:
         """
         search_results = [
             (file_path, data.get("symbol_reference"))
-            for _, file_path, data in self._graph.out_edges(symbol, data=True)
-            if data.get("label") == "reference"
+            for _, file_path, data in self._graph.get_labeled_out_edges(symbol, "reference")
         ]
         result_dict: Dict[str, List[SymbolReference]] = {}
 
@@ -334,6 +800,8 @@ class _SymbolGraphNavigator:
         Gets all references to a `Symbol`, calculated by finding out edges
         with the label "callee" and the target node being the symbol caller.
         """
+        if self.lazy_caller_relationships:
+            return self._get_lazy_symbol_callers(symbol)
         return {
             SymbolReference(
                 symbol=caller,
@@ -341,8 +809,7 @@ class _SymbolGraphNavigator:
                 column_number=data.get("column_number"),
                 roles=data.get("roles"),
             ): callee
-            for callee, caller, data in self._graph.out_edges(symbol, data=True)
-            if data.get("label") == "callee"
+            for callee, caller, data in self._graph.get_labeled_out_edges(symbol, "callee")
         }
 
     def get_potential_symbol_callees(self, symbol: Symbol) -> Dict[Symbol, SymbolReference]:
@@ -350,6 +817,8 @@ class _SymbolGraphNavigator:
         Gets all references to a `Symbol`, calculated by finding out edges
         with the label "caller" and the target node being the symbol callee.
         """
+        if self.lazy_caller_relationships:
+            return self._get_lazy_symbol_callees(symbol)
         return {
             callee: SymbolReference(
                 symbol=caller,
@@ -357,15 +826,87 @@ class _SymbolGraphNavigator:
                 column_number=data.get("column_number"),
                 roles=data.get("roles"),
             )
-            for caller, callee, data in self._graph.out_edges(symbol, data=True)
-            if data.get("label") == "caller"
+            for caller, callee, data in self._graph.get_labeled_out_edges(symbol, "caller")
         }
 
+    def _get_lazy_symbol_callers(self, symbol: Symbol) -> Dict[SymbolReference, Symbol]:
+        """Gets the callers of a symbol from the potential calls in the modules referencing it."""
+        return {
+            SymbolReference(
+                symbol=caller,
+                line_number=ref.line_number,
+                column_number=ref.column_number,
+                roles=ref.role_mask,
+            ): symbol
+            for module_name in self.get_references_to_symbol(symbol)
+            for caller, ref in self._get_module_calls(module_name)
+            if ref.symbol == symbol
+        }
+
+    def _get_lazy_symbol_callees(self, symbol: Symbol) -> Dict[Symbol, SymbolReference]:
+        """Gets the callees of a symbol from the potential calls in its containing module."""
+        try:
+            module_name = self._get_symbol_containing_file(symbol)
+        except AssertionError as e:
+            logger.error(f"Failed to get the callees of {symbol.uri}: {e}")
+            return {}
+        return {
+            ref.symbol: SymbolReference(
+                symbol=caller,
+                line_number=ref.line_number,
+                column_number=ref.column_number,
+                roles=ref.role_mask,
+            )
+            for caller, ref in self._get_module_calls(module_name)
+            if caller == symbol
+        }
+
+    def _get_module_calls(self, module_name: str) -> List[Tuple[Symbol, SymbolReference]]:
+        """
+        Gets the (caller, reference) pairs of the potential calls made by the methods contained
+        in a module, which match the "caller" edges of a graph built with caller relationships.
+        They are computed on first use, and dropped when the module is invalidated.
+        """
+        if module_name not in self._module_calls:
+            now = time()
+            method_symbols = [
+                symbol
+                for symbol in self._get_symbols_in_module(module_name)
+                if symbol.symbol_kind_by_suffix() == SymbolDescriptor.PyKind.Method
+            ]
+            bounding_boxes = {
+                symbol: self.bounding_box[symbol]
+                for symbol in method_symbols
+                if symbol in self.bounding_box
+            }
+            if self.bounding_box_cache is not None and py_module_loader.initialized:
+                bounding_boxes.update(
+                    self._load_bounding_boxes(
+                        [symbol for symbol in method_symbols if symbol not in bounding_boxes]
+                    )
+                )
+
+            self._module_calls[module_name] = [
+                (caller, ref)
+                for caller, references_in_scope in self._get_symbol_references_in_scope_bulk(
+                    method_symbols, bounding_boxes
+                ).items()
+                for ref in references_in_scope
+                if _CallerCalleeProcessor.is_potential_call(caller, ref)
+            ]
+            logger.debug(f"Computed the calls in {module_name} in {time() - now} seconds")
+        return self._module_calls[module_name]
+
+    def _get_symbols_in_module(self, module_name: str) -> List[Symbol]:
+        if module_name not in self._graph:
+            return []
+        return [
+            target for _, target, __ in self._graph.get_labeled_out_edges(module_name, "contains")
+        ]
+
     def _get_symbol_containing_file(self, symbol: Symbol) -> str:
         parent_file_list = [
-            source
-            for source, _, data in self._graph.in_edges(symbol, data=True)
-            if data.get("label") == "contains"
+            source for source, _, __ in self._graph.get_labeled_in_edges(symbol, "contains")
         ]
         assert (
             len(parent_file_list) == 1
@@ -376,7 +917,7 @@ class _SymbolGraphNavigator:
         """
         Gets all symbol references in the scope of a symbol.
         This is done by finding the bounding box of the symbol,
-        and then finding all references in the parent module.
+        and then querying the reference index of the parent module.
 
         Notes:
             To cache the bounding boxes before calling this function, call
@@ -384,37 +925,187 @@ class _SymbolGraphNavigator:
             This is recommended for scenarios where this function is called
             across the entire
         """
+        (
+            parent_symbol_start_line,
+            parent_symbol_start_col,
+            parent_symbol_end_line,
+        ) = self._get_symbol_scope(symbol)
+        file_name = self._get_symbol_containing_file(symbol)
+        return self._get_module_references_in_range(
+            file_name, parent_symbol_start_line, parent_symbol_end_line, parent_symbol_start_col
+        )
+
+    def get_symbol_dependencies_bulk(self, symbols: Iterable[Symbol]) -> Dict[Symbol, Set[Symbol]]:
+        """
+        Gets the dependencies of many symbols at once, see `_get_symbol_references_in_scope_bulk`.
+        Symbols whose scope cannot be resolved are logged and left out of the result.
+        """
+        return {
+            symbol: {ref.symbol for ref in references_in_scope}
+            for symbol, references_in_scope in self._get_symbol_references_in_scope_bulk(
+                symbols
+            ).items()
+        }
+
+    def _get_symbol_references_in_scope_bulk(
+        self,
+        symbols: Iterable[Symbol],
+        bounding_boxes: Optional[Dict[Symbol, BoundingBox]] = None,
+    ) -> Dict[Symbol, List[SymbolReference]]:
+        """
+        Gets the references in the scope of each of the given symbols.
+
+        The symbols are grouped by their containing module, and each module is
+        processed with a single sweep over its (line, column) sorted references,
+        instead of one range query per symbol.
+
+        If `bounding_boxes` is given, it is used in place of the pre-computed
+        bounding boxes, and the boxes missing from it are computed.
+        """
+        references_in_scope: Dict[Symbol, List[SymbolReference]] = {}
+        scopes_by_module: Dict[str, List[Tuple[int, int, int, Symbol]]] = {}
+        for symbol in symbols:
+            if symbol in references_in_scope:
+                continue
+            try:
+                start_line, start_col, end_line = self._get_symbol_scope(symbol, bounding_boxes)
+                file_name = self._get_symbol_containing_file(symbol)
+            except Exception as e:
+                logger.error(f"Failed to get references in scope for {symbol.uri}: {e}")
+                continue
+            references_in_scope[symbol] = []
+            scopes_by_module.setdefault(file_name, []).append(
+                (start_line, end_line, start_col, symbol)
+            )
+
+        for module_name, scopes in scopes_by_module.items():
+            self._sweep_module_references(module_name, scopes, references_in_scope)
+        return references_in_scope
+
+    def _sweep_module_references(
+        self,
+        module_name: str,
+        scopes: List[Tuple[int, int, int, Symbol]],
+        references_in_scope: Dict[Symbol, List[SymbolReference]],
+    ) -> None:
+        """
+        Assigns the references of a module to the (start_line, end_line, start_col, symbol)
+        scopes which enclose them, in one pass over the references.
+
+        Scopes are opened as the sweep reaches their start line and closed through a
+        heap keyed by end line, so each reference is only compared against the scopes
+        which currently span its line.
+        """
+        scopes = sorted(scopes, key=lambda scope: scope[0])
+        open_scopes: Dict[int, Tuple[int, List[SymbolReference]]] = {}
+        scope_ends: List[Tuple[int, int]] = []
+        next_scope = 0
+
+        for ref in self._get_sorted_module_references(module_name):
+            while next_scope < len(scopes) and scopes[next_scope][0] <= ref.line_number:
+                _, end_line, start_col, symbol = scopes[next_scope]
+                open_scopes[next_scope] = (start_col, references_in_scope[symbol])
+                heappush(scope_ends, (end_line, next_scope))
+                next_scope += 1
+            while scope_ends and scope_ends[0][0] <= ref.line_number:
+                open_scopes.pop(heappop(scope_ends)[1])
+            for start_col, scope_references in open_scopes.values():
+                if ref.column_number >= start_col:
+                    scope_references.append(ref)
+
+    def _get_symbol_scope(
+        self, symbol: Symbol, bounding_boxes: Optional[Dict[Symbol, BoundingBox]] = None
+    ) -> Tuple[int, int, int]:
+        """Gets the 0-indexed (start line, start column, end line) of the bounding box of a symbol."""
+        if bounding_boxes is not None:
+            bounding_box = bounding_boxes.get(symbol) or get_symbol_bounding_box(
+                symbol, self._get_bounding_box_strategy()
+            )
         # bounding boxes are cached
-        if len(self.bounding_box) > 0:
+        elif len(self.bounding_box) > 0:
             bounding_box = self.bounding_box[symbol]
         else:
-            fst_object = convert_to_fst_object(symbol)
-            bounding_box = fst_object.absolute_bounding_box
+            bounding_box = get_symbol_bounding_box(symbol, self._get_bounding_box_strategy())
 
         # RedBaron POSITIONS ARE 1 INDEXED AND SCIP ARE 0!!!!
-        parent_symbol_start_line, parent_symbol_start_col, parent_symbol_end_line = (
+        return (
             bounding_box.top_left.line - 1,
             bounding_box.top_left.column - 1,
             bounding_box.bottom_right.line - 1,
         )
 
-        file_name = self._get_symbol_containing_file(symbol)
-        references_in_parent_module = self._get_references_to_module(file_name)
-        return [
-            ref
-            for ref in references_in_parent_module
-            if parent_symbol_start_line <= ref.line_number < parent_symbol_end_line
-            and ref.column_number >= parent_symbol_start_col
-        ]
+    def _get_module_references_in_range(
+        self, module_name: str, start_line: int, end_line: int, start_col: int
+    ) -> List[SymbolReference]:
+        """
+        Gets the references in a module with `start_line <= line_number < end_line`
+        and `column_number >= start_col`, ordered by (line, column).
+
+        The lines are located by bisecting the reference index of the module,
+        so only the references inside of the line range are visited.
+        """
+        reference_lines, sorted_references = self._get_module_reference_index(module_name)
+        lower = bisect_left(reference_lines, start_line)
+        upper = bisect_left(reference_lines, end_line, lower)
+        return [ref for ref in sorted_references[lower:upper] if ref.column_number >= start_col]
+
+    def _get_sorted_module_references(self, module_name: str) -> List[SymbolReference]:
+        """Gets the references to a module sorted by (line, column)."""
+        return self._get_module_reference_index(module_name)[1]
+
+    def _get_module_reference_index(
+        self, module_name: str
+    ) -> Tuple[List[int], List[SymbolReference]]:
+        """
+        Gets the references to a module sorted by (line, column), together with
+        their line numbers for bisection. The index is built on first use.
+        """
+        if module_name not in self._module_reference_index:
+            sorted_references = sorted(
+                self._get_references_to_module(module_name),
+                key=lambda ref: (ref.line_number, ref.column_number),
+            )
+            self._module_reference_index[module_name] = (
+                [ref.line_number for ref in sorted_references],
+                sorted_references,
+            )
+        return self._module_reference_index[module_name]
 
     def _get_references_to_module(self, module_name: str) -> List[SymbolReference]:
         """Gets all references to a module in the graph."""
-        reference_edges_in_module = self._graph.in_edges(module_name, data=True)
-        return [
-            data.get("symbol_reference")
-            for _, __, data in reference_edges_in_module
-            if data["label"] == "reference"
-        ]
+        reference_edges_in_module = self._graph.get_labeled_in_edges(module_name, "reference")
+        return [data.get("symbol_reference") for _, __, data in reference_edges_in_module]
+
+    def filter_symbols(self, sorted_supported_symbols: List[Symbol]) -> None:
+        filter_multi_digraph_by_symbols(self._graph, sorted_supported_symbols)
+        self._module_reference_index.clear()
+        self._module_calls.clear()
+
+    def invalidate(self, module_names: Iterable[str], symbols: Iterable[Symbol]) -> None:
+        """
+        Drops the reference indices of changed modules and the bounding boxes of changed
+        symbols. If the bounding boxes were pre-computed, those of the changed symbols
+        which are still rankable are loaded again.
+        """
+        self._invalidate_module_references(module_names)
+        had_bounding_boxes = len(self.bounding_box) > 0
+        changed_symbols = list(symbols)
+        for symbol in changed_symbols:
+            self.bounding_box.pop(symbol, None)
+
+        if had_bounding_boxes and py_module_loader.initialized:
+            rankable_symbols = get_rankable_symbols(
+                [symbol for symbol in changed_symbols if self._is_supported_symbol(symbol)]
+            )
+            self.bounding_box.update(self._load_bounding_boxes(rankable_symbols))
+
+    def _invalidate_module_references(self, module_names: Iterable[str]) -> None:
+        for module_name in module_names:
+            self._module_reference_index.pop(module_name, None)
+            self._module_calls.pop(module_name, None)
+
+    def _is_supported_symbol(self, symbol: Symbol) -> bool:
+        return symbol in self._graph and self._graph.nodes[symbol].get("label") == "symbol"
 
     def _pre_compute_rankable_bounding_boxes(self) -> None:
         """Pre-computes and caches the bounding boxes for all symbols in the graph."""
@@ -426,28 +1117,269 @@ class _SymbolGraphNavigator:
         logger.info("Pre-computing bounding boxes for all rankable symbols")
         filtered_symbols = get_rankable_symbols(self.get_sorted_supported_symbols())
 
-        # prepare loader_args here (replace this comment with actual code)
         if not py_module_loader.initialized:
             raise ValueError(
                 "Module loader must be initialized before pre-computing bounding boxes"
             )
+        self.bounding_box = self._load_bounding_boxes(filtered_symbols, parallel=True)
+
+        logger.info(
+            f"Finished pre-computing bounding boxes for all rankable symbols in {time() - now} seconds"
+        )
+
+    def _load_bounding_boxes(
+        self, symbols: List[Symbol], parallel: bool = False
+    ) -> Dict[Symbol, BoundingBox]:
+        """
+        Gets the bounding boxes of the given symbols. Modules which are unchanged since
+        their bounding boxes were cached are read from the bounding box cache, and only
+        the remaining symbols are computed. Symbols without a bounding box are left out.
+
+        Note - The module loader must be initialized before calling this function.
+        """
+        cached_modules: Dict[str, Tuple[str, ModuleBoundingBoxes]] = {}
+        symbol_fpaths: Dict[Symbol, str] = {}
+        bounding_boxes: Dict[Symbol, BoundingBox] = {}
+        pending_symbols: List[Symbol] = []
+
+        for symbol in symbols:
+            if self.bounding_box_cache is None:
+                pending_symbols.append(symbol)
+                continue
+
+            module_fpath = py_module_loader.get_module_fpath_by_dotpath(symbol.module_name)
+            if module_fpath is None:
+                # The module is unknown to the loader, so no bounding box can be computed
+                continue
+            if not os.path.exists(module_fpath):
+                pending_symbols.append(symbol)
+                continue
+
+            if module_fpath not in cached_modules:
+                content_hash = BoundingBoxCache.get_content_hash(module_fpath)
+                cached_modules[module_fpath] = (
+                    content_hash,
+                    self.bounding_box_cache.load(
+                        module_fpath, content_hash, self._get_bounding_box_strategy()
+                    )
+                    or {},
+                )
+            symbol_fpaths[symbol] = module_fpath
+            module_bounding_boxes = cached_modules[module_fpath][1]
+            if symbol.uri not in module_bounding_boxes:
+                pending_symbols.append(symbol)
+            elif module_bounding_boxes[symbol.uri] is not None:
+                bounding_boxes[symbol] = module_bounding_boxes[symbol.uri]  # type: ignore
+
+        if len(pending_symbols) > 0:
+            logger.info(f"Computing {len(pending_symbols)} bounding boxes missing from the cache")
+        computed_bounding_boxes = self._compute_bounding_boxes(
+            pending_symbols, self._get_bounding_box_strategy(), parallel
+        )
+
+        updated_modules: Set[str] = set()
+        for symbol in pending_symbols:
+            bounding_box = computed_bounding_boxes.get(symbol)
+            if bounding_box is not None:
+                bounding_boxes[symbol] = bounding_box
+            if symbol in symbol_fpaths:
+                cached_modules[symbol_fpaths[symbol]][1][symbol.uri] = bounding_box
+                updated_modules.add(symbol_fpaths[symbol])
+
+        for module_fpath in updated_modules:
+            content_hash, module_bounding_boxes = cached_modules[module_fpath]
+            self.bounding_box_cache.save(  # type: ignore
+                module_fpath,
+                content_hash,
+                self._get_bounding_box_strategy(),
+                module_bounding_boxes,
+            )
+
+        return bounding_boxes
+
+    def _get_bounding_box_strategy(self) -> ParsingStrategy:
+        return self.bounding_box_strategy or py_module_loader.parsing_strategy
+
+    @staticmethod
+    def _compute_bounding_boxes(
+        symbols: List[Symbol], parsing_strategy: ParsingStrategy, parallel: bool
+    ) -> Dict[Symbol, BoundingBox]:
+        """Computes bounding boxes, across `MAX_WORKERS` processes if `parallel`."""
+        if len(symbols) == 0:
+            return {}
+
         loader_args: Tuple[str, str] = (
             py_module_loader.root_fpath or "",
             py_module_loader.py_fpath or "",
         )
-        bounding_boxes = {}
-        with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            func = partial(process_symbol_bounds, loader_args)
-            results = executor.map(func, filtered_symbols)
-            for result in results:
-                if result is not None:
-                    symbol, bounding_box = result
-                    bounding_boxes[symbol] = bounding_box
+        func = partial(process_symbol_bounds, loader_args, parsing_strategy)
+        if parallel:
+            with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                results = list(executor.map(func, symbols))
+        else:
+            results = [func(symbol) for symbol in symbols]
+        return {result[0]: result[1] for result in results if result is not None}
+
+
+class _CompactSymbolGraphNavigator(_SymbolGraphNavigator):
+    """Handles navigation within a `CompactSymbolGraph`."""
+
+    def __init__(
+        self,
+        graph: CompactSymbolGraph,
+        bounding_box_cache: Optional[BoundingBoxCache] = None,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+        lazy_caller_relationships: bool = False,
+    ) -> None:
+        self._compact_graph = graph
+        self.bounding_box: Dict[Symbol, BoundingBox] = {}
+        self.bounding_box_cache = bounding_box_cache
+        self.bounding_box_strategy = bounding_box_strategy
+        self.lazy_caller_relationships = lazy_caller_relationships
+        self._module_calls: Dict[str, List[Tuple[Symbol, SymbolReference]]] = {}
 
-        logger.info(
-            f"Finished pre-computing bounding boxes for all rankable symbols in {time() - now} seconds"
+    def get_sorted_supported_symbols(self) -> List[Symbol]:
+        return sorted(self._compact_graph.get_supported_symbols(), key=lambda x: x.dotpath)
+
+    def get_symbol_relationships(self, symbol: Symbol) -> Set[Symbol]:
+        graph = self._compact_graph
+        relationships = graph.relationships
+        edges = relationships.get_out_edges(graph.get_symbol_id(symbol))
+        return {graph.symbols[target_id] for target_id in relationships.targets[edges]}
+
+    def get_references_to_symbol(self, symbol: Symbol) -> Dict[str, List[SymbolReference]]:
+        graph = self._compact_graph
+        references = graph.references
+        symbol_id = graph.get_symbol_id(symbol)
+        result_dict: Dict[str, List[SymbolReference]] = {}
+        for edge in references.get_out_edges(symbol_id):
+            file_path = graph.files[references.targets[edge]]
+            result_dict.setdefault(file_path, []).append(
+                graph.build_symbol_reference(symbol_id, references.data[edge])  # type: ignore
+            )
+        return result_dict
+
+    def get_potential_symbol_callers(self, symbol: Symbol) -> Dict[SymbolReference, Symbol]:
+        if self.lazy_caller_relationships:
+            return self._get_lazy_symbol_callers(symbol)
+        graph = self._compact_graph
+        callees = graph.callees
+        return {
+            graph.build_symbol_reference(callees.targets[edge], callees.data[edge]): symbol  # type: ignore
+            for edge in callees.get_out_edges(graph.get_symbol_id(symbol))
+        }
+
+    def get_potential_symbol_callees(self, symbol: Symbol) -> Dict[Symbol, SymbolReference]:
+        if self.lazy_caller_relationships:
+            return self._get_lazy_symbol_callees(symbol)
+        graph = self._compact_graph
+        callers = graph.callers
+        return {
+            graph.symbols[callers.targets[edge]]: graph.build_symbol_reference(
+                callers.sources[edge], callers.data[edge]  # type: ignore
+            )
+            for edge in callers.get_out_edges(graph.get_symbol_id(symbol))
+        }
+
+    def filter_symbols(self, sorted_supported_symbols: List[Symbol]) -> None:
+        self._compact_graph.filter_symbols(sorted_supported_symbols)
+        self._module_calls.clear()
+
+    def _invalidate_module_references(self, module_names: Iterable[str]) -> None:
+        self._compact_graph._file_reference_index.clear()
+        self._module_calls.clear()
+
+    def _get_symbols_in_module(self, module_name: str) -> List[Symbol]:
+        graph = self._compact_graph
+        file_id = graph.file_ids.get(module_name)
+        if file_id is None:
+            return []
+        contains = graph.contains
+        return [
+            graph.symbols[symbol_id]
+            for symbol_id in contains.targets[contains.get_out_edges(file_id)]
+        ]
+
+    def _is_supported_symbol(self, symbol: Symbol) -> bool:
+        symbol_id = self._compact_graph.symbol_ids.get(symbol)
+        return symbol_id is not None and bool(self._compact_graph.is_supported[symbol_id])
+
+    def _get_symbol_containing_file(self, symbol: Symbol) -> str:
+        graph = self._compact_graph
+        contains = graph.contains
+        parent_file_list = [
+            graph.files[source_id]
+            for source_id in contains.sources[contains.get_in_edges(graph.get_symbol_id(symbol))]
+        ]
+        assert (
+            len(parent_file_list) == 1
+        ), f"{symbol.uri} should have exactly one parent file, but has {len(parent_file_list)}"
+        return parent_file_list.pop()
+
+    def _get_module_references_in_range(
+        self, module_name: str, start_line: int, end_line: int, start_col: int
+    ) -> List[SymbolReference]:
+        graph = self._compact_graph
+        references = graph.references
+        edges = graph.get_file_references_in_range(
+            graph.get_file_id(module_name), start_line, end_line, start_col
         )
-        self.bounding_box = bounding_boxes
+        return [
+            graph.build_symbol_reference(references.sources[edge], references.data[edge])  # type: ignore
+            for edge in edges
+        ]
+
+    def _get_sorted_module_references(self, module_name: str) -> List[SymbolReference]:
+        graph = self._compact_graph
+        references = graph.references
+        return [
+            graph.build_symbol_reference(references.sources[edge], references.data[edge])  # type: ignore
+            for edge in graph.get_sorted_file_references(graph.get_file_id(module_name))
+        ]
+
+    def _get_references_to_module(self, module_name: str) -> List[SymbolReference]:
+        graph = self._compact_graph
+        references = graph.references
+        edges = references.get_in_edges(graph.get_file_id(module_name))
+        return [
+            graph.build_symbol_reference(references.sources[edge], references.data[edge])  # type: ignore
+            for edge in edges
+        ]
+
+
+def build_rankable_subgraph(
+    symbol_dependencies: Dict[Symbol, Set[Symbol]], supported_symbol_set: Set[Symbol]
+) -> nx.DiGraph:
+    """
+    Builds the rankable subgraph from the dependencies of the rankable symbols, with an
+    edge in both directions between a symbol and each of its supported dependencies.
+    """
+    G = nx.DiGraph()
+
+    now = time()
+    for symbol, symbol_dependencies_in_scope in tqdm(symbol_dependencies.items()):
+        try:
+            dependencies = [
+                ele for ele in symbol_dependencies_in_scope if ele in supported_symbol_set
+            ]
+            for dependency in dependencies:
+                G.add_edge(symbol, dependency)
+                G.add_edge(dependency, symbol)
+        except Exception as e:
+            logger.error(f"Error processing {symbol.uri}: {e}")
+
+    logger.info(
+        f"Built the rankable symbol subgraph with {G.number_of_nodes()} nodes and "
+        f"{G.number_of_edges()} edges in {time() - now} seconds"
+    )
+    return G
+
+
+class SymbolGraphBackend(Enum):
+    """The storage used by a `SymbolGraph`."""
+
+    NETWORKX = "networkx"
+    COMPACT = "compact"
 
 
 class SymbolGraph(ISymbolProvider):
@@ -457,16 +1389,153 @@ class SymbolGraph(ISymbolProvider):
     "contains", "reference", "relationship", "caller", or "callee".
     """
 
-    def __init__(self, index_path: str, build_caller_relationships: bool = False) -> None:
+    def __init__(
+        self,
+        index_path: Union[str, Sequence[IndexSource]],
+        build_caller_relationships: bool = False,
+        cache_dir: Optional[str] = None,
+        parallel_build: bool = False,
+        backend: SymbolGraphBackend = SymbolGraphBackend.NETWORKX,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+        lazy_caller_relationships: bool = False,
+    ) -> None:
+        """
+        Args:
+            index_path: The path to the SCIP index the graph is built from, or several
+                `IndexSource`s which are federated into a single graph. References across
+                the indices resolve by symbol URI, and each index is cached separately.
+            build_caller_relationships: Whether to add caller/callee edges to the graph.
+            cache_dir: If provided, the built graph is persisted here and reused by later
+                instances which load the same index with the same builder options.
+                Symbol bounding boxes are cached alongside it, per module file.
+            parallel_build: Whether to shard the graph construction across `MAX_WORKERS`
+                processes.
+            backend: The storage used for the graph. The compact backend trades the
+                flexibility of networkx for a much smaller memory footprint.
+            bounding_box_strategy: How symbol bounding boxes are computed, where
+                `ParsingStrategy.PYAST` avoids parsing modules with RedBaron. Defaults
+                to the parsing strategy of the module loader.
+            lazy_caller_relationships: Whether callers and callees are computed on first
+                access for the modules involved and then memoized, instead of for every
+                method at build time. Ignored when `build_caller_relationships` is set.
+        """
         super().__init__()
-        index = self._load_index_protobuf(index_path)
-        builder = GraphBuilder(index, build_caller_relationships)
-        self._graph = builder.build_graph()
-        self.navigator = _SymbolGraphNavigator(self._graph)
+        self._cache = SymbolGraphCache(cache_dir) if cache_dir else None
+        self._bounding_box_cache = (
+            BoundingBoxCache(os.path.join(cache_dir, "bounding_boxes")) if cache_dir else None
+        )
+        self.parallel_build = parallel_build
+        self.backend = backend
+        self.bounding_box_strategy = bounding_box_strategy
+        self.build_caller_relationships = build_caller_relationships
+        self.lazy_caller_relationships = (
+            lazy_caller_relationships and not build_caller_relationships
+        )
+        self.index_sources: List[IndexSource] = []
+        if not isinstance(index_path, str):
+            validate_index_sources(index_path)
+            self.index_sources = list(index_path)
+        self._rankable_subgraphs: Dict[Optional[str], nx.DiGraph] = {}
+        self._symbol_dependencies: Optional[Dict[Symbol, Set[Symbol]]] = None
+        self._dependency_index: Optional[SymbolDependencyIndex] = None
+        # The symbols of the last `filter_symbols`, applied again when the graph is rebuilt
+        self._filtered_symbols: Optional[Set[Symbol]] = None
+        # The index the graph was built from, from which the records of its documents are
+        # read on the first delta, see `_get_built_document_records`
+        self._built_index: Union[str, List[IndexSource]] = (
+            list(self.index_sources) if self.index_sources else cast(str, index_path)
+        )
+        self._document_records: Optional[Dict[str, _DocumentRecord]] = None
+        graph, self._document_fingerprints = (
+            self._load_federated_graph(build_caller_relationships)
+            if self.index_sources
+            else self._load_graph(cast(str, index_path), build_caller_relationships)
+        )
+        self._graph: Optional[LabeledMultiDiGraph] = None
+        self.navigator: _SymbolGraphNavigator
+        self._set_graph(graph)
+
+    def _set_graph(self, graph: Union[LabeledMultiDiGraph, CompactSymbolGraph]) -> None:
+        if isinstance(graph, CompactSymbolGraph):
+            self.navigator = _CompactSymbolGraphNavigator(
+                graph,
+                self._bounding_box_cache,
+                self.bounding_box_strategy,
+                self.lazy_caller_relationships,
+            )
+        else:
+            self._graph = graph
+            self.navigator = _SymbolGraphNavigator(
+                graph,
+                self._bounding_box_cache,
+                self.bounding_box_strategy,
+                self.lazy_caller_relationships,
+            )
 
     def get_symbol_dependencies(self, symbol: Symbol) -> Set[Symbol]:
         return self.navigator.get_symbol_dependencies(symbol)
 
+    def get_symbol_dependencies_bulk(self, symbols: Iterable[Symbol]) -> Dict[Symbol, Set[Symbol]]:
+        """
+        Gets the dependencies of many symbols in a single pass over each of their modules.
+        Symbols whose scope cannot be resolved are left out of the result.
+        """
+        return self.navigator.get_symbol_dependencies_bulk(symbols)
+
+    def get_transitive_dependencies(
+        self,
+        symbol: Symbol,
+        max_depth: Optional[int] = None,
+        kinds: Optional[Iterable[SymbolDescriptor.PyKind]] = None,
+    ) -> Dict[Symbol, int]:
+        """
+        Gets the supported symbols which `symbol` depends on within `max_depth` hops, or
+        transitively when no depth is given, mapped to their hop distance and ordered by it.
+        Only symbols of the given `kinds` are returned, when provided.
+        """
+        return self.dependency_index.get_dependencies(symbol, max_depth, kinds)
+
+    def get_transitive_dependents(
+        self,
+        symbol: Symbol,
+        max_depth: Optional[int] = None,
+        kinds: Optional[Iterable[SymbolDescriptor.PyKind]] = None,
+    ) -> Dict[Symbol, int]:
+        """
+        Gets the symbols which depend on `symbol` within `max_depth` hops, or transitively
+        when no depth is given, i.e. the symbols impacted by a change to it.
+        """
+        return self.dependency_index.get_dependents(symbol, max_depth, kinds)
+
+    @property
+    def dependency_index(self) -> SymbolDependencyIndex:
+        """
+        The dependencies between the rankable symbols, restricted to supported symbols.
+        The index is built on first access and kept until the symbols change.
+        """
+        if self._dependency_index is None:
+            self._dependency_index = SymbolDependencyIndex(self._get_symbol_dependencies())
+        return self._dependency_index
+
+    def _get_symbol_dependencies(self) -> Dict[Symbol, Set[Symbol]]:
+        if self._symbol_dependencies is None:
+            self.navigator._pre_compute_rankable_bounding_boxes()
+            self._symbol_dependencies = self._get_supported_symbol_dependencies(
+                get_rankable_symbols(self.get_sorted_supported_symbols())
+            )
+        return self._symbol_dependencies
+
+    def _get_supported_symbol_dependencies(
+        self, symbols: Iterable[Symbol]
+    ) -> Dict[Symbol, Set[Symbol]]:
+        supported_symbol_set = set(self.get_sorted_supported_symbols())
+        return {
+            symbol: {
+                dependency for dependency in dependencies if dependency in supported_symbol_set
+            }
+            for symbol, dependencies in self.get_symbol_dependencies_bulk(symbols).items()
+        }
+
     def get_symbol_relationships(self, symbol: Symbol) -> Set[Symbol]:
         """
         Gets the set of symbols with relationships to the given symbol.
@@ -493,11 +1562,16 @@ class SymbolGraph(ISymbolProvider):
 
     @property
     def default_rankable_subgraph(self) -> nx.DiGraph:
-        return self._build_default_rankable_subgraph()
+        return self.get_rankable_subgraph()
 
-    @lru_cache(maxsize=1)
-    def _build_default_rankable_subgraph(self) -> nx.DiGraph:
-        return self._build_rankable_subgraph()
+    def get_rankable_subgraph(self, path_filter: Optional[str] = None) -> nx.DiGraph:
+        """
+        Gets the rankable subgraph restricted to symbols whose dotpath starts with
+        `path_filter`. Subgraphs are cached per filter until the symbols are filtered.
+        """
+        if path_filter not in self._rankable_subgraphs:
+            self._rankable_subgraphs[path_filter] = self._build_rankable_subgraph(path_filter)
+        return self._rankable_subgraphs[path_filter]
 
     def _build_rankable_subgraph(self, path_filter: Optional[str] = None) -> nx.DiGraph:
         """
@@ -508,41 +1582,384 @@ class SymbolGraph(ISymbolProvider):
 
         TODO - Think of how to handle relationships here.
         """
-        G = nx.DiGraph()
-
-        filtered_symbols = get_rankable_symbols(self.get_sorted_supported_symbols())
+        now = time()
+        supported_symbols = self.get_sorted_supported_symbols()
+        supported_symbol_set = set(supported_symbols)
+        filtered_symbols = get_rankable_symbols(supported_symbols)
 
         if path_filter is not None:
             filtered_symbols = [
                 sym for sym in filtered_symbols if sym.dotpath.startswith(path_filter)  # type: ignore
             ]
+        logger.info(f"Selected {len(filtered_symbols)} rankable symbols in {time() - now} seconds")
 
         self.navigator._pre_compute_rankable_bounding_boxes()
 
         logger.info("Building the rankable symbol subgraph...")
-        for symbol in tqdm(filtered_symbols):
-            try:
-                dependencies = [
-                    ele
-                    for ele in self.get_symbol_dependencies(symbol)
-                    if ele in self.get_sorted_supported_symbols()
-                ]
-                for dependency in dependencies:
-                    G.add_edge(symbol, dependency)
-                    G.add_edge(dependency, symbol)
-            except Exception as e:
-                logger.error(f"Error processing {symbol.uri}: {e}")
+        now = time()
+        symbol_dependencies = self.get_symbol_dependencies_bulk(filtered_symbols)
+        logger.info(f"Extracted the symbol dependencies in {time() - now} seconds")
 
-        logger.info("Built the rankable symbol subgraph")
-        return G
+        return build_rankable_subgraph(symbol_dependencies, supported_symbol_set)
 
     # ISymbolProvider methods
     def _get_sorted_supported_symbols(self) -> List[Symbol]:
         return self.navigator.get_sorted_supported_symbols()
 
     def filter_symbols(self, sorted_supported_symbols: List[Symbol]):
-        if self._graph:
-            filter_multi_digraph_by_symbols(self._graph, sorted_supported_symbols)
+        self._filtered_symbols = set(sorted_supported_symbols)
+        self.navigator.filter_symbols(sorted_supported_symbols)
+        self._rankable_subgraphs.clear()
+        self._symbol_dependencies = None
+        self._dependency_index = None
+
+    def apply_index_delta(self, new_index: Union[Index, ScipIndexReader, str]) -> IndexDelta:
+        """
+        Updates the graph to a regenerated index, given as an index or a path, by processing
+        only the documents which were added, removed or changed. Documents are matched by
+        their `relative_path` and compared by their contents.
+
+        Derived state is only dropped where the delta can alter it, i.e. the reference
+        indices of the changed modules, the bounding boxes of the changed symbols and
+        the rankable subgraphs which can contain them. The compact backend is rebuilt
+        from the new index, as its arrays can not be updated in place.
+
+        Note - Symbols added by the delta have not been through `filter_symbols`, so
+            the providers should be synchronized again when new symbols are expected.
+
+        Raises:
+            ValueError: If the graph is federated, see `update_index_source` instead.
+        """
+        if self.index_sources and not isinstance(new_index, IndexSourceReader):
+            raise ValueError("Federated graphs are updated with update_index_source")
+        if isinstance(new_index, str):
+            with ScipIndexReader(new_index) as reader:
+                return self.apply_index_delta(reader)
+
+        now = time()
+        if isinstance(new_index, IndexSourceReader):
+            new_fingerprints = self._get_federated_document_fingerprints(new_index)
+        else:
+            new_fingerprints = _get_document_fingerprints(new_index)
+        delta = _diff_document_fingerprints(self._document_fingerprints, new_fingerprints)
+        if delta.is_empty():
+            self._document_fingerprints = new_fingerprints
+            return delta
+
+        old_records = self._get_built_document_records()
+        fresh_records = _get_document_records(new_index, set(delta.added + delta.changed))
+        new_records: Optional[Dict[str, _DocumentRecord]] = None
+        if old_records is None:
+            # Only the new documents of the delta are known, the graph is rebuilt below
+            logger.info("The index of the symbol graph has changed since it was built")
+            changed_symbols = set(
+                _get_delta_symbols(
+                    IndexDelta(added=delta.added + delta.changed, changed=[], removed=[]),
+                    {},
+                    fresh_records,
+                ).values()
+            )
+        else:
+            new_records = {
+                path: fresh_records[path] if path in fresh_records else old_records[path]
+                for path in new_fingerprints
+            }
+            changed_symbols = set(_get_delta_symbols(delta, old_records, new_records).values())
+
+        if self._graph is None or new_records is None:
+            previously_supported = {
+                symbol for symbol in changed_symbols if self.navigator._is_supported_symbol(symbol)
+            }
+            # The bounding boxes of the symbols outside of the delta are still valid, unless
+            # the symbols which the old documents of the delta had are unknown
+            bounding_box = self.navigator.bounding_box if new_records is not None else {}
+            if self.index_sources:
+                graph = self._load_federated_graph(self.build_caller_relationships)[0]
+            else:
+                graph = self._build_graph(new_index, self.build_caller_relationships)[0]
+            self._set_graph(graph)
+            self.navigator.bounding_box = bounding_box
+            if self._filtered_symbols is not None:
+                # The rebuild restores the filtered out symbols, while those added by the
+                # delta are kept as the in-place update of the other backend does
+                self._filtered_symbols |= changed_symbols - previously_supported
+                self.navigator.filter_symbols(list(self._filtered_symbols))
+            self._rankable_subgraphs.clear()
+            if new_records is None:
+                self._symbol_dependencies = None
+                if isinstance(new_index, IndexSourceReader):
+                    # The records of every source are read again, as those of the other
+                    # sources are not known either
+                    self._built_index = list(self.index_sources)
+                    self._document_fingerprints = new_fingerprints
+                    new_records = self._get_built_document_records()
+                else:
+                    new_records = _get_document_records(new_index)
+        else:
+            processor = _IndexDeltaProcessor(
+                self._graph,
+                cast(Dict[str, _DocumentRecord], old_records),
+                new_index,
+                new_records,
+                delta,
+                self.build_caller_relationships,
+                self._bounding_box_cache,
+                self.bounding_box_strategy,
+            )
+            processor.process()
+            changed_symbols = processor.changed_symbols
+            self._invalidate_rankable_subgraphs(changed_symbols, processor.added_symbols)
+
+        self._document_fingerprints = new_fingerprints
+        self._document_records = new_records
+        self.navigator.invalidate(delta.added + delta.changed + delta.removed, changed_symbols)
+        self._invalidate_symbol_dependencies(changed_symbols)
+        logger.info(
+            f"Applied an index delta with {len(delta.added)} added, {len(delta.changed)} changed "
+            f"and {len(delta.removed)} removed documents in {time() - now} seconds"
+        )
+        return delta
+
+    def update_index_source(self, source: IndexSource) -> IndexDelta:
+        """
+        Updates a federated graph to a regenerated index of one of its sources, given
+        with the namespace of the source it replaces. Only the documents of that index
+        are compared and processed, the other indices are left as they are.
+
+        Raises:
+            ValueError: If the graph has no source with the namespace of `source`, or
+                if the source pins a different package version.
+        """
+        positions = [
+            position
+            for position, index_source in enumerate(self.index_sources)
+            if index_source.namespace == source.namespace
+        ]
+        if not positions:
+            raise ValueError(f"The graph has no index source with namespace {source.namespace}")
+        if source.package_version != self.index_sources[positions[0]].package_version:
+            # The pinned versions change the symbols of every index
+            raise ValueError("Changing a pinned package version requires building a new graph")
+        self.index_sources[positions[0]] = source
+
+        with IndexSourceReader(source, get_package_versions(self.index_sources)) as reader:
+            return self.apply_index_delta(reader)
+
+    def _get_federated_document_fingerprints(self, reader: IndexSourceReader) -> Dict[str, str]:
+        """
+        Gets the document fingerprints of a federated graph after one of its sources is
+        replaced by `reader`, keeping those of the other sources and the order of the sources.
+        """
+        document_fingerprints: Dict[str, str] = {}
+        for source in self.index_sources:
+            if source.namespace == reader.source.namespace:
+                document_fingerprints.update(_get_document_fingerprints(reader))
+            else:
+                path_prefix = f"{source.namespace}/"
+                document_fingerprints.update(
+                    (path, fingerprint)
+                    for path, fingerprint in self._document_fingerprints.items()
+                    if path.startswith(path_prefix)
+                )
+        return document_fingerprints
+
+    def _get_built_document_records(self) -> Optional[Dict[str, _DocumentRecord]]:
+        """
+        Gets the records of the documents the graph was built from. They are only read from
+        its index on the first delta, as most graphs are never updated. None is returned
+        when that index has changed since, e.g. when it was regenerated in place.
+        """
+        if self._document_records is None:
+            expected_fingerprints = list(self._document_fingerprints.items())
+            document_fingerprints: List[Tuple[str, str]] = []
+            document_records: Dict[str, _DocumentRecord] = {}
+            for reader in self._open_built_indices():
+                with reader:
+                    document_fingerprints.extend(_get_document_fingerprints(reader).items())
+                    if (
+                        document_fingerprints
+                        != expected_fingerprints[: len(document_fingerprints)]
+                    ):
+                        return None
+                    document_records.update(_get_document_records(reader))
+            if len(document_fingerprints) != len(expected_fingerprints):
+                return None
+            self._document_records = document_records
+        return self._document_records
+
+    def _open_built_indices(self) -> Iterator[ScipIndexReader]:
+        if isinstance(self._built_index, str):
+            yield ScipIndexReader(self._built_index)
+        else:
+            package_versions = get_package_versions(self._built_index)
+            for source in self._built_index:
+                yield IndexSourceReader(source, package_versions)
+
+    def _invalidate_rankable_subgraphs(
+        self, changed_symbols: Set[Symbol], added_symbols: Set[Symbol]
+    ) -> None:
+        """
+        Drops the cached rankable subgraphs which the changed symbols can alter. Any subgraph
+        can gain an edge to a newly supported symbol, otherwise only those which contain a
+        changed symbol or whose path filter matches one are dropped.
+        """
+        if added_symbols:
+            self._rankable_subgraphs.clear()
+            return
+
+        for path_filter, subgraph in list(self._rankable_subgraphs.items()):
+            if any(
+                path_filter is None or symbol in subgraph or symbol.dotpath.startswith(path_filter)
+                for symbol in changed_symbols
+            ):
+                del self._rankable_subgraphs[path_filter]
+
+    def _invalidate_symbol_dependencies(self, changed_symbols: Set[Symbol]) -> None:
+        """
+        Recomputes the dependencies of the changed symbols which are still rankable, and
+        drops the dependency index along with its memoized closures.
+        """
+        self._dependency_index = None
+        if self._symbol_dependencies is None:
+            return
+
+        for symbol in changed_symbols:
+            self._symbol_dependencies.pop(symbol, None)
+        supported_symbol_set = set(self.get_sorted_supported_symbols())
+        for symbol_dependencies in self._symbol_dependencies.values():
+            symbol_dependencies.intersection_update(supported_symbol_set)
+        self._symbol_dependencies.update(
+            self._get_supported_symbol_dependencies(
+                get_rankable_symbols(
+                    [symbol for symbol in changed_symbols if symbol in supported_symbol_set]
+                )
+            )
+        )
+
+    def _load_graph(
+        self, index_path: str, build_caller_relationships: bool
+    ) -> Tuple[Union[LabeledMultiDiGraph, CompactSymbolGraph], Dict[str, str]]:
+        """
+        Loads the graph and the fingerprints of the documents it was built from from the cache
+        when possible, otherwise builds them from the index.
+
+        Note - Caller/callee edges depend on the source code of the indexed project as well,
+            so the cache assumes that the index is regenerated whenever that code changes.
+        """
+        if self._cache is None:
+            with ScipIndexReader(index_path) as reader:
+                return self._build_graph(reader, build_caller_relationships)
+
+        builder_options: Dict[str, Any] = {
+            "build_caller_relationships": build_caller_relationships,
+            "backend": self.backend.value,
+        }
+        if build_caller_relationships:
+            # The caller/callee edges are found within the bounding boxes of the symbols
+            builder_options["bounding_box_strategy"] = (
+                self.bounding_box_strategy or py_module_loader.parsing_strategy
+            ).value
+        cache_key = self._cache.get_cache_key(index_path, **builder_options)
+        payload = self._cache.load(cache_key)
+        if payload is not None:
+            logger.info(f"Loaded the symbol graph for {index_path} from the cache")
+            return payload
+
+        with ScipIndexReader(index_path) as reader:
+            payload = self._build_graph(reader, build_caller_relationships)
+        self._cache.save(cache_key, payload)
+        return payload
+
+    def _load_federated_graph(
+        self, build_caller_relationships: bool
+    ) -> Tuple[Union[LabeledMultiDiGraph, CompactSymbolGraph], Dict[str, str]]:
+        """
+        Loads the graph of each index source, from the cache when possible, and merges them
+        in order as if their documents were in a single index. Caller/callee edges can span
+        the indices, so they are added to the merged graph rather than cached per source.
+        """
+        package_versions = get_package_versions(self.index_sources)
+        graph = LabeledMultiDiGraph()
+        builder = GraphBuilder(
+            Index(),
+            bounding_box_cache=self._bounding_box_cache,
+            bounding_box_strategy=self.bounding_box_strategy,
+            graph=graph,
+        )
+        document_fingerprints: Dict[str, str] = {}
+        for source in self.index_sources:
+            with IndexSourceReader(source, package_versions) as reader:
+                source_graph, source_fingerprints = self._load_index_source_graph(reader)
+            builder._merge_partial_graph(
+                _PartialGraph(
+                    nodes=list(source_graph.nodes(data=True)),
+                    edges=list(source_graph.edges(data=True)),
+                    defined_symbol_uris=_get_defined_symbol_uris(source_graph),
+                )
+            )
+            document_fingerprints.update(source_fingerprints)
+
+        if build_caller_relationships:
+            for source in self.index_sources:
+                with IndexSourceReader(source, package_versions) as reader:
+                    for document in reader.documents:
+                        builder._process_caller_callee_relationships(document)
+
+        logger.info(
+            f"Federated {len(self.index_sources)} indices into a symbol graph with "
+            f"{graph.number_of_nodes()} nodes"
+        )
+        if self.backend == SymbolGraphBackend.COMPACT:
+            return CompactSymbolGraph.from_multi_digraph(graph), document_fingerprints
+        return graph, document_fingerprints
+
+    def _load_index_source_graph(
+        self, reader: IndexSourceReader
+    ) -> Tuple[LabeledMultiDiGraph, Dict[str, str]]:
+        """Loads the graph of a single index source, without caller/callee edges."""
+        if self._cache is None:
+            return self._build_index_source_graph(reader)
+
+        cache_key = self._cache.get_cache_key(
+            reader.source.index_path,
+            namespace=reader.source.namespace,
+            package_versions=sorted(reader.package_versions.items()),
+        )
+        payload = self._cache.load(cache_key)
+        if payload is not None:
+            logger.info(f"Loaded the symbol graph for {reader.source.index_path} from the cache")
+            return payload
+
+        payload = self._build_index_source_graph(reader)
+        self._cache.save(cache_key, payload)
+        return payload
+
+    def _build_index_source_graph(
+        self, reader: IndexSourceReader
+    ) -> Tuple[LabeledMultiDiGraph, Dict[str, str]]:
+        builder = GraphBuilder(
+            reader,
+            parallel=self.parallel_build,
+            bounding_box_cache=self._bounding_box_cache,
+            bounding_box_strategy=self.bounding_box_strategy,
+        )
+        return builder.build_graph(), _get_document_fingerprints(reader)
+
+    def _build_graph(
+        self, index: Union[Index, ScipIndexReader], build_caller_relationships: bool
+    ) -> Tuple[Union[LabeledMultiDiGraph, CompactSymbolGraph], Dict[str, str]]:
+        builder = GraphBuilder(
+            index,
+            build_caller_relationships,
+            parallel=self.parallel_build,
+            bounding_box_cache=self._bounding_box_cache,
+            bounding_box_strategy=self.bounding_box_strategy,
+        )
+        graph = builder.build_graph()
+        document_fingerprints = _get_document_fingerprints(index)
+        if self.backend == SymbolGraphBackend.COMPACT:
+            return CompactSymbolGraph.from_multi_digraph(graph), document_fingerprints
+        return graph, document_fingerprints
 
     @staticmethod
     def _load_index_protobuf(path: str) -> Index:
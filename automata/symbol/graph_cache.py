@@ -0,0 +1,73 @@
+import hashlib
+import logging
+import os
+import pickle
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolGraphCache:
+    """
+    A persistent on-disk cache for built `SymbolGraph` objects.
+
+    Entries are keyed by the content hash of the SCIP index together with the
+    options that were used to build the graph, so a change to either results
+    in a cache miss rather than a stale graph.
+
+    Each entry is a single binary file which starts with a magic header and a
+    format version, followed by the pickled payload.
+    """
+
+    CACHE_VERSION = 7
+    MAGIC = b"AUTOMATA-SYMBOL-GRAPH"
+    HASH_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+
+    def get_cache_key(self, index_path: str, **builder_options: Any) -> str:
+        """Computes the cache key for an index file and a set of builder options."""
+        hasher = hashlib.sha256()
+        with open(index_path, "rb") as f:
+            for chunk in iter(lambda: f.read(SymbolGraphCache.HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        for option_name, option_value in sorted(builder_options.items()):
+            hasher.update(f"{option_name}={option_value}".encode())
+        return hasher.hexdigest()
+
+    def load(self, key: str) -> Optional[Any]:
+        """Loads the payload stored under `key`, or returns None on a miss."""
+        entry_path = self._get_entry_path(key)
+        if not os.path.exists(entry_path):
+            return None
+
+        try:
+            with open(entry_path, "rb") as f:
+                if f.read(len(SymbolGraphCache.MAGIC)) != SymbolGraphCache.MAGIC:
+                    logger.warning(f"Ignoring malformed symbol graph cache entry {entry_path}")
+                    return None
+                version = int.from_bytes(f.read(4), "little")
+                if version != SymbolGraphCache.CACHE_VERSION:
+                    logger.info(
+                        f"Ignoring symbol graph cache entry {entry_path} with version {version}"
+                    )
+                    return None
+                return pickle.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load symbol graph cache entry {entry_path}: {e}")
+            return None
+
+    def save(self, key: str, payload: Any) -> None:
+        """Atomically stores `payload` under `key`."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._get_entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SymbolGraphCache.MAGIC)
+            f.write(SymbolGraphCache.CACHE_VERSION.to_bytes(4, "little"))
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.graph")
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import mmap
+from typing import Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from automata.symbol.scip_pb2 import Document, Metadata  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# The field numbers of `Index` and `Document` in scip.proto
+INDEX_METADATA_FIELD = 1
+INDEX_DOCUMENTS_FIELD = 2
+DOCUMENT_RELATIVE_PATH_FIELD = 1
+
+# The protobuf wire types
+WIRE_TYPE_VARINT = 0
+WIRE_TYPE_FIXED64 = 1
+WIRE_TYPE_LENGTH_DELIMITED = 2
+WIRE_TYPE_FIXED32 = 5
+
+
+def _read_varint(buffer: Union[bytes, mmap.mmap], position: int) -> Tuple[int, int]:
+    """Reads a base 128 varint at `position`, and returns it with the position after it."""
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(buffer):
+            raise ValueError("Truncated varint in SCIP index")
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+        if shift >= 64:
+            raise ValueError("Malformed varint in SCIP index")
+
+
+def _skip_field(buffer: Union[bytes, mmap.mmap], position: int, wire_type: int) -> int:
+    """Skips the value of a field with the given wire type, and returns the position after it."""
+    if wire_type == WIRE_TYPE_VARINT:
+        return _read_varint(buffer, position)[1]
+    elif wire_type == WIRE_TYPE_FIXED64:
+        return position + 8
+    elif wire_type == WIRE_TYPE_LENGTH_DELIMITED:
+        length, position = _read_varint(buffer, position)
+        return position + length
+    elif wire_type == WIRE_TYPE_FIXED32:
+        return position + 4
+    raise ValueError(f"Unsupported wire type {wire_type} in SCIP index")
+
+
+class _LazyDocuments(Sequence):
+    """A read-only view of the `Documents` of an index, which decodes them on access."""
+
+    def __init__(self, reader: "ScipIndexReader") -> None:
+        self._reader = reader
+
+    def __len__(self) -> int:
+        return len(self._reader)
+
+    @overload
+    def __getitem__(self, index: int) -> Document:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Document]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._reader.get_document(i) for i in range(len(self))[index]]
+        return self._reader.get_document(index)
+
+    def __iter__(self) -> Iterator[Document]:
+        return self._reader.iter_documents()
+
+
+class ScipIndexReader:
+    """
+    A lazy reader for SCIP index files, which can be used in place of a parsed `Index`.
+
+    The file is memory-mapped and the length-delimited records of the index are
+    scanned once to build a table of document offsets. `Documents` are only decoded
+    when they are accessed, so iterating over `documents` holds a single decoded
+    `Document` at a time rather than the entire index.
+
+    Examples -
+    with ScipIndexReader("index.scip") as reader:
+        for document in reader.documents:
+            ...
+    """
+
+    def __init__(self, index_path: str) -> None:
+        self.index_path = index_path
+        self._file = open(index_path, "rb")
+        self._buffer: Union[bytes, mmap.mmap]
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be memory-mapped
+            self._buffer = b""
+        self._document_offsets: List[Tuple[int, int]] = []
+        self._metadata_offsets: List[Tuple[int, int]] = []
+        self._document_paths: Optional[List[str]] = None
+        self._scan()
+        self.documents = _LazyDocuments(self)
+
+    def __enter__(self) -> "ScipIndexReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._document_offsets)
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    @property
+    def metadata(self) -> Metadata:
+        """Decodes the `Metadata` of the index."""
+        metadata = Metadata()
+        for start, end in self._metadata_offsets:
+            metadata.MergeFromString(self._buffer[start:end])
+        return metadata
+
+    def get_document(self, index: int) -> Document:
+        """Decodes the `Document` at the given position of the index."""
+        document = Document()
+        document.ParseFromString(self.get_serialized_document(index))
+        return document
+
+    def get_serialized_document(self, index: int) -> bytes:
+        """Gets the encoded bytes of the `Document` at the given position of the index."""
+        start, end = self._document_offsets[index]
+        return self._buffer[start:end]
+
+    def get_document_fingerprint(self, index: int) -> str:
+        """
+        Hashes the `Document` at the given position of the index as it is encoded in the
+        file, without decoding it.
+        """
+        start, end = self._document_offsets[index]
+        return hashlib.sha256(self._buffer[start:end]).hexdigest()
+
+    def iter_documents(self) -> Iterator[Document]:
+        """Yields the `Documents` of the index in order, decoding one at a time."""
+        for index in range(len(self)):
+            yield self.get_document(index)
+
+    def get_document_paths(self) -> List[str]:
+        """Gets the relative path of each `Document`, without decoding the documents."""
+        if self._document_paths is None:
+            self._document_paths = [
+                self._read_relative_path(start, end) for start, end in self._document_offsets
+            ]
+        return self._document_paths
+
+    def get_document_by_path(self, relative_path: str) -> Optional[Document]:
+        """Decodes the `Document` with the given relative path, or returns None."""
+        try:
+            return self.get_document(self.get_document_paths().index(relative_path))
+        except ValueError:
+            return None
+
+    def _scan(self) -> None:
+        """Builds the offset tables from the top level records of the index."""
+        buffer = self._buffer
+        position = 0
+        while position < len(buffer):
+            tag, position = _read_varint(buffer, position)
+            field_number, wire_type = tag >> 3, tag & 0x7
+            if wire_type != WIRE_TYPE_LENGTH_DELIMITED:
+                position = _skip_field(buffer, position, wire_type)
+                continue
+
+            length, position = _read_varint(buffer, position)
+            end = position + length
+            if end > len(buffer):
+                raise ValueError(f"Truncated record in SCIP index {self.index_path}")
+            if field_number == INDEX_DOCUMENTS_FIELD:
+                self._document_offsets.append((position, end))
+            elif field_number == INDEX_METADATA_FIELD:
+                self._metadata_offsets.append((position, end))
+            position = end
+        logger.debug(f"Found {len(self)} documents in SCIP index {self.index_path}")
+
+    def _read_relative_path(self, start: int, end: int) -> str:
+        """
+        Reads the relative path of a `Document`, skipping over the fields before it.
+        Encoders write fields in order of their number, so the path is usually first.
+        """
+        buffer = self._buffer
+        position = start
+        while position < end:
+            tag, position = _read_varint(buffer, position)
+            field_number, wire_type = tag >> 3, tag & 0x7
+            if field_number == DOCUMENT_RELATIVE_PATH_FIELD and (
+                wire_type == WIRE_TYPE_LENGTH_DELIMITED
+            ):
+                length, position = _read_varint(buffer, position)
+                return bytes(buffer[position : position + length]).decode("utf-8")
+            position = _skip_field(buffer, position, wire_type)
+        return ""
@@ -0,0 +1,166 @@
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple
+
+import networkx as nx
+from networkx.exception import NetworkXError
+
+LabeledAdjacency = Dict[Hashable, Dict[Hashable, Dict[Hashable, Dict[str, Any]]]]
+
+
+class LabeledMultiDiGraph(nx.MultiDiGraph):
+    """
+    A `MultiDiGraph` which keeps a separate adjacency index for each edge label.
+
+    The symbol graph stores several kinds of edges between the same nodes, e.g.
+    a module node can have tens of thousands of "reference" in-edges next to a
+    handful of "contains" out-edges. Queries for a single label can use the
+    partitioned index to touch only the edges of that label, instead of
+    filtering every edge of a node.
+
+    The index shares the edge attribute dictionaries with the graph and is kept
+    in sync by every method which adds or removes edges or nodes.
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr) -> None:
+        self._label_succ: Dict[Any, LabeledAdjacency] = {}
+        self._label_pred: Dict[Any, LabeledAdjacency] = {}
+        super().__init__(incoming_graph_data, **attr)
+
+    def get_labeled_out_edges(self, node: Hashable, label: str) -> Iterator[Tuple[Any, Any, Any]]:
+        """
+        Yields the (node, target, data) out-edges of `node` with the given label.
+
+        Raises:
+            NetworkXError: If the node is not in the graph.
+        """
+        self._assert_has_node(node)
+        for target, keydict in self._label_succ.get(label, {}).get(node, {}).items():
+            for data in keydict.values():
+                yield node, target, data
+
+    def get_labeled_in_edges(self, node: Hashable, label: str) -> Iterator[Tuple[Any, Any, Any]]:
+        """
+        Yields the (source, node, data) in-edges of `node` with the given label.
+
+        Raises:
+            NetworkXError: If the node is not in the graph.
+        """
+        self._assert_has_node(node)
+        for source, keydict in self._label_pred.get(label, {}).get(node, {}).items():
+            for data in keydict.values():
+                yield source, node, data
+
+    def remove_labeled_out_edges(self, node: Hashable, label: str) -> List[Hashable]:
+        """Removes the out-edges of `node` with the given label and returns their targets."""
+        targets: List[Hashable] = []
+        for target, keydict in list(self._label_succ.get(label, {}).get(node, {}).items()):
+            for key in list(keydict):
+                self.remove_edge(node, target, key)
+                targets.append(target)
+        return targets
+
+    def remove_labeled_in_edges(self, node: Hashable, label: str) -> List[Hashable]:
+        """Removes the in-edges of `node` with the given label and returns their sources."""
+        sources: List[Hashable] = []
+        for source, keydict in list(self._label_pred.get(label, {}).get(node, {}).items()):
+            for key in list(keydict):
+                self.remove_edge(source, node, key)
+                sources.append(source)
+        return sources
+
+    def add_edge(self, u_for_edge, v_for_edge, key=None, **attr):
+        if key is not None:
+            existing_data = self._succ.get(u_for_edge, {}).get(v_for_edge, {}).get(key)
+            if existing_data is not None:
+                self._unindex_edge(u_for_edge, v_for_edge, key, existing_data.get("label"))
+        key = super().add_edge(u_for_edge, v_for_edge, key, **attr)
+        data = self._succ[u_for_edge][v_for_edge][key]
+        self._index_edge(u_for_edge, v_for_edge, key, data)
+        return key
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        # The networkx implementation sets the edge attributes after calling
+        # `add_edge`, so each edge is routed through `add_edge` with its attributes
+        keylist = []
+        for edge in ebunch_to_add:
+            edge_length = len(edge)
+            key = None
+            edge_data: Dict[str, Any] = {}
+            if edge_length == 4:
+                u, v, key, edge_data = edge
+            elif edge_length == 3:
+                u, v, third = edge
+                if isinstance(third, dict):
+                    edge_data = third
+                else:
+                    key = third
+            elif edge_length == 2:
+                u, v = edge
+            else:
+                raise NetworkXError(f"Edge tuple {edge} must be a 2-tuple, 3-tuple or 4-tuple.")
+            keylist.append(self.add_edge(u, v, key, **{**attr, **edge_data}))
+        return keylist
+
+    def remove_edge(self, u, v, key=None):
+        keydict = self._succ.get(u, {}).get(v)
+        if keydict:
+            # networkx removes the most recently added edge when no key is given
+            edge_key = next(reversed(keydict)) if key is None else key
+            if edge_key in keydict:
+                self._unindex_edge(u, v, edge_key, keydict[edge_key].get("label"))
+        super().remove_edge(u, v, key)
+
+    def remove_node(self, n):
+        if n in self._succ:
+            self._unindex_node(n)
+        super().remove_node(n)
+
+    def remove_nodes_from(self, nodes: Iterable[Hashable]) -> None:
+        for node in nodes:
+            if node in self._succ:
+                self.remove_node(node)
+
+    def clear(self) -> None:
+        super().clear()
+        self._label_succ.clear()
+        self._label_pred.clear()
+
+    def clear_edges(self) -> None:
+        super().clear_edges()
+        self._label_succ.clear()
+        self._label_pred.clear()
+
+    def _assert_has_node(self, node: Hashable) -> None:
+        if node not in self._succ:
+            raise NetworkXError(f"The node {node} is not in the graph.")
+
+    def _index_edge(self, u: Hashable, v: Hashable, key: Hashable, data: Dict[str, Any]) -> None:
+        label = data.get("label")
+        self._label_succ.setdefault(label, {}).setdefault(u, {}).setdefault(v, {})[key] = data
+        self._label_pred.setdefault(label, {}).setdefault(v, {}).setdefault(u, {})[key] = data
+
+    def _unindex_edge(self, u: Hashable, v: Hashable, key: Hashable, label: Any) -> None:
+        for adjacency, first, second in (
+            (self._label_succ, u, v),
+            (self._label_pred, v, u),
+        ):
+            neighbors = adjacency.get(label, {}).get(first, {})
+            keydict = neighbors.get(second, {})
+            keydict.pop(key, None)
+            if not keydict:
+                neighbors.pop(second, None)
+            if not neighbors:
+                adjacency.get(label, {}).pop(first, None)
+
+    def _unindex_node(self, n: Hashable) -> None:
+        for label, label_succ in self._label_succ.items():
+            label_pred = self._label_pred[label]
+            for target in label_succ.pop(n, {}):
+                sources = label_pred.get(target, {})
+                sources.pop(n, None)
+                if not sources:
+                    label_pred.pop(target, None)
+            for source in label_pred.pop(n, {}):
+                targets = label_succ.get(source, {})
+                targets.pop(n, None)
+                if not targets:
+                    label_succ.pop(source, None)
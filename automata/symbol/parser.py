@@ -1,7 +1,12 @@
 import re
+from functools import lru_cache
 from typing import List, Optional
 
 from automata.symbol.base import Symbol, SymbolDescriptor, SymbolPackage
+from automata.symbol.scip_pb2 import Descriptor as DescriptorProto  # type: ignore
+
+# The number of distinct URIs, descriptors and packages kept by the interning caches
+SYMBOL_CACHE_SIZE = 1 << 18
 
 
 class _SymbolParser:
@@ -43,13 +48,13 @@ class _SymbolParser:
         if next_char == "(":
             self.index += 1
             name = self.accept_identifier("parameter name")
-            descriptor = SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.Parameter)
+            descriptor = _intern_descriptor(name, SymbolDescriptor.ScipSuffix.Parameter)
             self.accept_character(")", "closing parameter name")
             return descriptor
         elif next_char == "[":
             self.index += 1
             name = self.accept_identifier("type parameter name")
-            descriptor = SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.TypeParameter)
+            descriptor = _intern_descriptor(name, SymbolDescriptor.ScipSuffix.TypeParameter)
             self.accept_character("]", "closing type parameter name")
             return descriptor
         else:
@@ -60,22 +65,22 @@ class _SymbolParser:
                 disambiguator = ""
                 if self.current() != ")":
                     disambiguator = self.accept_identifier("method disambiguator")
-                descriptor = SymbolDescriptor(
+                descriptor = _intern_descriptor(
                     name, SymbolDescriptor.ScipSuffix.Method, disambiguator
                 )
                 self.accept_character(")", "closing method")
                 self.accept_character(".", "closing method")
                 return descriptor
             elif suffix == "/":
-                return SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.Namespace)
+                return _intern_descriptor(name, SymbolDescriptor.ScipSuffix.Namespace)
             elif suffix == ".":
-                return SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.Term)
+                return _intern_descriptor(name, SymbolDescriptor.ScipSuffix.Term)
             elif suffix == "#":
-                return SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.Type)
+                return _intern_descriptor(name, SymbolDescriptor.ScipSuffix.Type)
             elif suffix == ":":
-                return SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.Meta)
+                return _intern_descriptor(name, SymbolDescriptor.ScipSuffix.Meta)
             elif suffix == "!":
-                return SymbolDescriptor(name, SymbolDescriptor.ScipSuffix.Macro)
+                return _intern_descriptor(name, SymbolDescriptor.ScipSuffix.Macro)
             else:
                 raise self.error("Expected a descriptor suffix")
 
@@ -138,10 +143,14 @@ class _SymbolParser:
         return c.isalpha() or c.isdigit() or c in ["-", "+", "$", "_"]
 
 
+@lru_cache(maxsize=SYMBOL_CACHE_SIZE)
 def parse_symbol(symbol_uri: str) -> Symbol:
     """
     Parses a `Symbol` given a `Symbol` URI.
     Visit `Symbol` for more information on URI specification.
+
+    Symbols are interned, repeated calls with the same URI return the same `Symbol`
+    instance. The cache is bounded, `parse_symbol.cache_info()` reports its hits and misses.
     """
     s = _SymbolParser(symbol_uri)
     scheme = s.accept_space_escaped_identifier("scheme")
@@ -161,18 +170,32 @@ def parse_symbol(symbol_uri: str) -> Symbol:
     return Symbol(
         symbol_uri,
         scheme,
-        SymbolPackage(manager, package_name, package_version),
+        _intern_package(manager, package_name, package_version),
         tuple(descriptors),
     )
 
 
+@lru_cache(maxsize=SYMBOL_CACHE_SIZE)
+def _intern_descriptor(
+    name: str, suffix: DescriptorProto, disambiguator: Optional[str] = None
+) -> SymbolDescriptor:
+    """Returns a shared `SymbolDescriptor`, as the same descriptors recur across many symbols."""
+    return SymbolDescriptor(name, suffix, disambiguator)
+
+
+@lru_cache(maxsize=SYMBOL_CACHE_SIZE)
+def _intern_package(manager: str, name: str, version: str) -> SymbolPackage:
+    """Returns a shared `SymbolPackage`."""
+    return SymbolPackage(manager, name, version)
+
+
 def new_local_symbol(symbol: str, id: str) -> Symbol:
     # TODO: Do we need this method?
     return Symbol(
         symbol,
         "local",
-        SymbolPackage("", "", ""),
-        (SymbolDescriptor(id, SymbolDescriptor.ScipSuffix.Local),),
+        _intern_package("", "", ""),
+        (_intern_descriptor(id, SymbolDescriptor.ScipSuffix.Local),),
     )
 
 
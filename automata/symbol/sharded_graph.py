@@ -0,0 +1,492 @@
+import logging
+import multiprocessing
+from collections import defaultdict
+from multiprocessing.connection import Connection
+from time import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import networkx as nx
+
+from automata.config import MAX_WORKERS
+from automata.singletons.py_module_loader import ParsingStrategy, py_module_loader
+from automata.symbol.base import ISymbolProvider, Symbol, SymbolReference
+from automata.symbol.bounding_box_cache import BoundingBoxCache
+from automata.symbol.graph import (
+    GraphBuilder,
+    _SymbolGraphNavigator,
+    build_rankable_subgraph,
+)
+from automata.symbol.index_reader import ScipIndexReader
+from automata.symbol.scip_pb2 import Index, SymbolRole  # type: ignore
+from automata.symbol.symbol_utils import get_rankable_symbols
+
+logger = logging.getLogger(__name__)
+
+# The root path, python path and parsing strategy of the module loader
+LoaderArgs = Tuple[str, str, ParsingStrategy]
+# Whether a shard defines a symbol, and the index position of the document which contains it
+SymbolOwnership = Tuple[bool, int]
+
+
+def get_loader_args() -> Optional[LoaderArgs]:
+    """Gets the arguments the module loader was initialized with, if it is initialized."""
+    if not py_module_loader.initialized:
+        return None
+    return (
+        py_module_loader.root_fpath or "",
+        py_module_loader.py_fpath or "",
+        py_module_loader.parsing_strategy,
+    )
+
+
+def get_document_shard_key(relative_path: str, package_depth: int = 1) -> str:
+    """Gets the package a document belongs to, from the leading directories of its path."""
+    return "/".join(relative_path.split("/")[:-1][:package_depth])
+
+
+def partition_documents(
+    relative_paths: Sequence[str], shard_count: int, package_depth: int = 1
+) -> List[List[int]]:
+    """
+    Partitions the positions of the documents of an index into `shard_count` shards, keeping
+    the documents of a package together. Packages are assigned from the largest to the least
+    loaded shard, and each shard lists its documents in index order.
+
+    When the documents outside of the root directory all share a package, e.g. in a repo
+    with a single top-level package, packages are taken from the first deeper directory
+    level which splits them. If no level does, the documents are split into shards of
+    balanced size instead.
+    """
+    max_package_depth = max((path.count("/") for path in relative_paths), default=0)
+    positions_by_package = _group_documents_by_package(relative_paths, package_depth)
+    while (
+        len(set(positions_by_package) - {""}) == 1
+        and package_depth < max_package_depth
+        and shard_count > 1
+    ):
+        package_depth += 1
+        positions_by_package = _group_documents_by_package(relative_paths, package_depth)
+
+    if len(set(positions_by_package) - {""}) <= 1 and shard_count > 1:
+        shard_size = max(1, -(-len(relative_paths) // shard_count))
+        return [
+            list(range(start, min(start + shard_size, len(relative_paths))))
+            for start in range(0, len(relative_paths), shard_size)
+        ]
+
+    shards: List[List[int]] = [[] for _ in range(shard_count)]
+    for package in sorted(
+        positions_by_package, key=lambda package: (-len(positions_by_package[package]), package)
+    ):
+        min(shards, key=len).extend(positions_by_package[package])
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _group_documents_by_package(
+    relative_paths: Sequence[str], package_depth: int
+) -> Dict[str, List[int]]:
+    positions_by_package: Dict[str, List[int]] = defaultdict(list)
+    for position, relative_path in enumerate(relative_paths):
+        positions_by_package[get_document_shard_key(relative_path, package_depth)].append(position)
+    return positions_by_package
+
+
+class _SymbolGraphShard:
+    """The graph and navigator for the documents of a single shard, held by a worker."""
+
+    # The navigator methods which the coordinator may call
+    NAVIGATOR_METHODS = {
+        "get_sorted_supported_symbols",
+        "get_symbol_dependencies",
+        "get_symbol_dependencies_bulk",
+        "get_symbol_relationships",
+        "get_potential_symbol_callers",
+        "get_potential_symbol_callees",
+        "get_references_to_symbol",
+        "filter_symbols",
+    }
+    # The navigator methods which are sent to every shard, and which return None from the
+    # shards without the symbol instead of failing
+    BROADCAST_METHODS = {
+        "get_symbol_relationships",
+        "get_potential_symbol_callers",
+        "get_references_to_symbol",
+    }
+
+    def __init__(
+        self,
+        index_path: str,
+        document_positions: List[int],
+        bounding_box_cache_dir: Optional[str],
+        bounding_box_strategy: Optional[ParsingStrategy],
+    ) -> None:
+        index = Index()
+        with ScipIndexReader(index_path) as reader:
+            for position in document_positions:
+                index.documents.add().MergeFromString(reader.get_serialized_document(position))
+        self.document_positions = {
+            document.relative_path: position
+            for document, position in zip(index.documents, document_positions)
+        }
+        # The position of the last document of the shard which defines each symbol
+        self.definition_positions = {
+            occurrence.symbol: position
+            for document, position in zip(index.documents, document_positions)
+            for occurrence in document.occurrences
+            if occurrence.symbol_roles & SymbolRole.Definition
+        }
+
+        bounding_box_cache = (
+            BoundingBoxCache(bounding_box_cache_dir) if bounding_box_cache_dir else None
+        )
+        self.graph = GraphBuilder(
+            index,
+            bounding_box_cache=bounding_box_cache,
+            bounding_box_strategy=bounding_box_strategy,
+        ).build_graph()
+        self.navigator = _SymbolGraphNavigator(
+            self.graph,
+            bounding_box_cache,
+            bounding_box_strategy,
+            lazy_caller_relationships=True,
+        )
+
+    def handle(self, method: str, args: Tuple[Any, ...], loader_args: Optional[LoaderArgs]) -> Any:
+        """Answers a request, with the module loader initialized like the coordinator's."""
+        if not py_module_loader.initialized and loader_args is not None:
+            py_module_loader.initialize(*loader_args)
+        if method in _SymbolGraphShard.BROADCAST_METHODS and args[0] not in self.graph:
+            return None
+        if method in _SymbolGraphShard.NAVIGATOR_METHODS:
+            return getattr(self.navigator, method)(*args)
+        elif method == "pre_compute_rankable_bounding_boxes":
+            return self.pre_compute_rankable_bounding_boxes()
+        elif method == "release_contained_symbols":
+            return self.release_contained_symbols(*args)
+        raise ValueError(f"Unknown shard method {method}")
+
+    def get_contained_symbols(self) -> Dict[Symbol, SymbolOwnership]:
+        """
+        Gets the symbols contained by the files of the shard, with the document which
+        contains them. That is the document which defines a symbol, if the shard has one,
+        otherwise the first document which lists it.
+        """
+        contained_symbols: Dict[Symbol, SymbolOwnership] = {}
+        for node in self.graph.nodes:
+            if not isinstance(node, str):
+                continue
+            for _, symbol, __ in self.graph.get_labeled_out_edges(node, "contains"):
+                if symbol.uri in self.definition_positions:
+                    contained_symbols[symbol] = (True, self.definition_positions[symbol.uri])
+                else:
+                    position = self.document_positions[node]
+                    contained_symbols[symbol] = (
+                        False,
+                        min(position, contained_symbols.get(symbol, (False, position))[1]),
+                    )
+        return contained_symbols
+
+    def release_contained_symbols(self, symbols: Iterable[Symbol]) -> None:
+        """
+        Removes the "contains" edges of symbols which another shard defines, as a serial
+        build does once it reaches their definition, so that the modules of the shard do
+        not list them, e.g. as the callers in a module.
+        """
+        for symbol in symbols:
+            self.graph.remove_labeled_in_edges(symbol, "contains")
+
+    def pre_compute_rankable_bounding_boxes(self) -> None:
+        """
+        Loads the bounding boxes of the rankable symbols of the shard. This is done serially,
+        as the shards already compute their bounding boxes in parallel.
+        """
+        if len(self.navigator.bounding_box) > 0:
+            return
+        self.navigator.bounding_box = self.navigator._load_bounding_boxes(
+            get_rankable_symbols(self.navigator.get_sorted_supported_symbols())
+        )
+
+
+def _serve_shard(
+    connection: Connection,
+    index_path: str,
+    document_positions: List[int],
+    bounding_box_cache_dir: Optional[str],
+    bounding_box_strategy: Optional[ParsingStrategy],
+) -> None:
+    """Builds a shard and answers the requests of the coordinator until it is closed."""
+    try:
+        shard = _SymbolGraphShard(
+            index_path, document_positions, bounding_box_cache_dir, bounding_box_strategy
+        )
+        connection.send((True, shard.get_contained_symbols()))
+    except Exception as e:
+        connection.send((False, e))
+        return
+
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            connection.send((True, shard.handle(*request)))
+        except Exception as e:
+            connection.send((False, e))
+
+
+class ShardedSymbolGraph(ISymbolProvider):
+    """
+    A `SymbolGraph` whose documents are partitioned by package across worker processes.
+
+    Each worker builds and holds the graph of its own shard, so neither the memory of the
+    graph nor the queries over it are bound to a single process. The coordinator exposes
+    the query methods of `SymbolGraph` by scatter-gather over the workers. Edges across
+    shards are resolved by symbol, i.e. queries about a symbol are sent to the shard which
+    contains it, and queries whose results span files, like references and callers, are
+    sent to every shard and merged.
+
+    Note - Callers and callees are computed lazily by the workers, see
+        `lazy_caller_relationships` in `SymbolGraph`. The coordinator is not thread-safe.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        shard_count: int = MAX_WORKERS,
+        package_depth: int = 1,
+        bounding_box_cache_dir: Optional[str] = None,
+        bounding_box_strategy: Optional[ParsingStrategy] = None,
+    ) -> None:
+        """
+        Args:
+            index_path: The path to the SCIP index the graph is built from.
+            shard_count: The maximum number of worker processes.
+            package_depth: The number of leading directories of a document path which
+                make up its package, documents of the same package share a shard. Deeper
+                directories are used when this many do not split the documents, see
+                `partition_documents`.
+            bounding_box_cache_dir: If provided, the workers cache bounding boxes here.
+            bounding_box_strategy: How symbol bounding boxes are computed.
+        """
+        super().__init__()
+        now = time()
+        with ScipIndexReader(index_path) as reader:
+            relative_paths = reader.get_document_paths()
+        self.shards = partition_documents(relative_paths, max(1, shard_count), package_depth)
+
+        self._connections: List[Connection] = []
+        self._workers: List[multiprocessing.Process] = []
+        for document_positions in self.shards:
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_serve_shard,
+                args=(
+                    worker_connection,
+                    index_path,
+                    document_positions,
+                    bounding_box_cache_dir,
+                    bounding_box_strategy,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+        # Maps each symbol to the shard of the document which contains it in a serial build,
+        # i.e. the last one which defines it, or else the first one which lists it
+        self._symbol_shards: Dict[Symbol, int] = {}
+        try:
+            shard_contained_symbols = self._gather(range(len(self.shards)))
+            priorities: Dict[Symbol, SymbolOwnership] = {}
+            for shard_id, contained_symbols in enumerate(shard_contained_symbols):
+                for symbol, (is_defined, position) in contained_symbols.items():
+                    priority = (is_defined, position if is_defined else -position)
+                    if symbol not in priorities or priority > priorities[symbol]:
+                        priorities[symbol] = priority
+                        self._symbol_shards[symbol] = shard_id
+            # The other shards which list a defined symbol drop it from their documents
+            self._scatter(
+                {
+                    shard_id: (
+                        "release_contained_symbols",
+                        (
+                            [
+                                symbol
+                                for symbol in contained_symbols
+                                if self._symbol_shards[symbol] != shard_id
+                                and priorities[symbol][0]
+                            ],
+                        ),
+                    )
+                    for shard_id, contained_symbols in enumerate(shard_contained_symbols)
+                }
+            )
+        except Exception:
+            self.close()
+            raise
+        self._rankable_subgraphs: Dict[Optional[str], nx.DiGraph] = {}
+        logger.info(
+            f"Built a symbol graph with {len(self.shards)} shards in {time() - now} seconds"
+        )
+
+    def __enter__(self) -> "ShardedSymbolGraph":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops the workers."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for worker in self._workers:
+            worker.join()
+        self._connections.clear()
+        self._workers.clear()
+
+    def get_symbol_dependencies(self, symbol: Symbol) -> Set[Symbol]:
+        return self._call(self._get_symbol_shard(symbol), "get_symbol_dependencies", symbol)
+
+    def get_symbol_dependencies_bulk(self, symbols: Iterable[Symbol]) -> Dict[Symbol, Set[Symbol]]:
+        """
+        Gets the dependencies of many symbols, with a single request to each shard.
+        Symbols whose scope cannot be resolved are left out of the result.
+        """
+        symbols = list(symbols)
+        symbols_by_shard: Dict[int, List[Symbol]] = defaultdict(list)
+        for symbol in symbols:
+            if symbol not in self._symbol_shards:
+                logger.error(f"Failed to get references in scope for {symbol.uri}: not contained")
+                continue
+            symbols_by_shard[self._get_symbol_shard(symbol)].append(symbol)
+        shard_dependencies: Dict[Symbol, Set[Symbol]] = {}
+        for result in self._scatter(
+            {
+                shard_id: ("get_symbol_dependencies_bulk", (shard_symbols,))
+                for shard_id, shard_symbols in symbols_by_shard.items()
+            }
+        ):
+            shard_dependencies.update(result)
+        return {
+            symbol: shard_dependencies[symbol]
+            for symbol in symbols
+            if symbol in shard_dependencies
+        }
+
+    def get_symbol_relationships(self, symbol: Symbol) -> Set[Symbol]:
+        return set().union(*self._broadcast_symbol_query("get_symbol_relationships", symbol))
+
+    def get_potential_symbol_callers(self, symbol: Symbol) -> Dict[SymbolReference, Symbol]:
+        callers: Dict[SymbolReference, Symbol] = {}
+        for shard_callers in self._broadcast_symbol_query("get_potential_symbol_callers", symbol):
+            callers.update(shard_callers)
+        return callers
+
+    def get_potential_symbol_callees(self, symbol: Symbol) -> Dict[Symbol, SymbolReference]:
+        return self._call(self._get_symbol_shard(symbol), "get_potential_symbol_callees", symbol)
+
+    def get_references_to_symbol(self, symbol: Symbol) -> Dict[str, List[SymbolReference]]:
+        references: Dict[str, List[SymbolReference]] = {}
+        for shard_references in self._broadcast_symbol_query("get_references_to_symbol", symbol):
+            references.update(shard_references)
+        return references
+
+    @property
+    def default_rankable_subgraph(self) -> nx.DiGraph:
+        return self.get_rankable_subgraph()
+
+    def get_rankable_subgraph(self, path_filter: Optional[str] = None) -> nx.DiGraph:
+        """See `SymbolGraph.get_rankable_subgraph`."""
+        if path_filter not in self._rankable_subgraphs:
+            supported_symbols = self.get_sorted_supported_symbols()
+            filtered_symbols = get_rankable_symbols(supported_symbols)
+            if path_filter is not None:
+                filtered_symbols = [
+                    symbol
+                    for symbol in filtered_symbols
+                    if symbol.dotpath.startswith(path_filter)  # type: ignore
+                ]
+
+            self._broadcast("pre_compute_rankable_bounding_boxes")
+            self._rankable_subgraphs[path_filter] = build_rankable_subgraph(
+                self.get_symbol_dependencies_bulk(filtered_symbols), set(supported_symbols)
+            )
+        return self._rankable_subgraphs[path_filter]
+
+    # ISymbolProvider methods
+    def _get_sorted_supported_symbols(self) -> List[Symbol]:
+        supported_symbols: Set[Symbol] = set().union(
+            *self._broadcast("get_sorted_supported_symbols")
+        )
+        return sorted(supported_symbols, key=lambda symbol: symbol.dotpath)
+
+    def filter_symbols(self, sorted_supported_symbols: List[Symbol]) -> None:
+        self._broadcast("filter_symbols", sorted_supported_symbols)
+        self._rankable_subgraphs.clear()
+
+    def _get_symbol_shard(self, symbol: Symbol) -> int:
+        """
+        Gets the shard which contains a symbol.
+
+        Raises:
+            NetworkXError: If no shard contains the symbol.
+        """
+        if symbol not in self._symbol_shards:
+            raise nx.NetworkXError(f"The node {symbol} is not contained by any shard.")
+        return self._symbol_shards[symbol]
+
+    def _call(self, shard_id: int, method: str, *args: Any) -> Any:
+        return self._scatter({shard_id: (method, args)})[0]
+
+    def _broadcast(self, method: str, *args: Any) -> List[Any]:
+        return self._scatter({shard_id: (method, args) for shard_id in range(len(self.shards))})
+
+    def _broadcast_symbol_query(self, method: str, symbol: Symbol) -> List[Any]:
+        """
+        Gets the results of a query about a symbol from the shards which have it.
+
+        Raises:
+            NetworkXError: If no shard has the symbol, like the `MultiDiGraph` would.
+        """
+        results = [result for result in self._broadcast(method, symbol) if result is not None]
+        if not results:
+            raise nx.NetworkXError(f"The node {symbol} is not in the graph.")
+        return results
+
+    def _scatter(self, requests: Dict[int, Tuple[str, Tuple[Any, ...]]]) -> List[Any]:
+        """
+        Sends each shard its request before waiting on any of them, so that the shards
+        process their requests concurrently, and returns the results in request order.
+        """
+        if not self._connections:
+            raise RuntimeError("The sharded symbol graph has been closed")
+        loader_args = get_loader_args()
+        for shard_id, (method, args) in requests.items():
+            self._connections[shard_id].send((method, args, loader_args))
+        return self._gather(requests)
+
+    def _gather(self, shard_ids: Iterable[int]) -> List[Any]:
+        """
+        Raises:
+            Exception: The first error raised by a shard, once every shard has replied.
+        """
+        results: List[Any] = []
+        error: Optional[Exception] = None
+        for shard_id in shard_ids:
+            succeeded, result = self._connections[shard_id].recv()
+            if succeeded:
+                results.append(result)
+            elif error is None:
+                error = result
+        if error is not None:
+            raise error
+        return results
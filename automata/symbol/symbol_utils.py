@@ -1,10 +1,33 @@
-from typing import List, cast
+import ast
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, cast
 
 from redbaron import RedBaron
 
-from automata.singletons.py_module_loader import py_module_loader
+from automata.singletons.py_module_loader import ParsingStrategy, py_module_loader
 from automata.symbol.base import Symbol, SymbolDescriptor
 
+logger = logging.getLogger(__name__)
+
+# The nesting path of a class or function, e.g. ((Class, "Foo"), (Method, "bar"))
+DefinitionPath = Tuple[Tuple[SymbolDescriptor.PyKind, str], ...]
+
+
+class Point(NamedTuple):
+    """A 1-indexed position in a source file, as reported by RedBaron."""
+
+    line: int
+    column: int
+
+
+class BoundingBox(NamedTuple):
+    """A lightweight, picklable copy of a RedBaron `absolute_bounding_box`."""
+
+    top_left: Point
+    bottom_right: Point
+
 
 def convert_to_fst_object(symbol: Symbol) -> RedBaron:
     """
@@ -82,3 +105,99 @@ def get_rankable_symbols(
 
         filtered_symbols.append(symbol)
     return filtered_symbols
+
+
+def get_symbol_bounding_box(
+    symbol: Symbol, parsing_strategy: Optional[ParsingStrategy] = None
+) -> BoundingBox:
+    """
+    Computes the bounding box of a symbol.
+
+    With `ParsingStrategy.PYAST` the box is read from the stdlib ast of the module,
+    falling back to RedBaron when the symbol cannot be resolved that way. The
+    strategy defaults to the one of the module loader.
+
+    Raises:
+        ValueError: If the symbol is not found
+    """
+    if (parsing_strategy or py_module_loader.parsing_strategy) == ParsingStrategy.PYAST:
+        try:
+            return get_ast_bounding_box(symbol)
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.debug(f"Falling back to RedBaron for the bounding box of {symbol.uri}: {e}")
+
+    bounding_box = convert_to_fst_object(symbol).absolute_bounding_box
+    return BoundingBox(
+        Point(bounding_box.top_left.line, bounding_box.top_left.column),
+        Point(bounding_box.bottom_right.line, bounding_box.bottom_right.column),
+    )
+
+
+def get_ast_bounding_box(symbol: Symbol) -> BoundingBox:
+    """
+    Computes the bounding box of a symbol from the stdlib ast of its module, in the
+    same coordinates as RedBaron. The box starts at the first decorator and ends one
+    line past the last line of the body. RedBaron extends a node up to the start of
+    the next statement instead, which only differs by blank and comment lines.
+
+    Raises:
+        ValueError: If the module or the symbol is not found
+    """
+    module_dotpath = None
+    definition_path: List[Tuple[SymbolDescriptor.PyKind, str]] = []
+    for descriptor in symbol.descriptors:
+        kind = SymbolDescriptor.convert_scip_to_python_suffix(descriptor.suffix)
+        if kind == SymbolDescriptor.PyKind.Module:
+            module_dotpath = descriptor.name
+        elif kind in (SymbolDescriptor.PyKind.Class, SymbolDescriptor.PyKind.Method):
+            definition_path.append((kind, descriptor.name))
+
+    module_fpath = (
+        py_module_loader.get_module_fpath_by_dotpath(module_dotpath) if module_dotpath else None
+    )
+    if module_fpath is None or not os.path.exists(module_fpath):
+        raise ValueError(f"Module descriptor {module_dotpath} not found")
+
+    definitions = _build_ast_definition_index(module_fpath, os.stat(module_fpath).st_mtime_ns)
+    bounding_box = definitions.get(tuple(definition_path))
+    if bounding_box is None:
+        raise ValueError(f"Symbol {symbol} not found")
+    return bounding_box
+
+
+@lru_cache(maxsize=256)
+def _build_ast_definition_index(
+    module_fpath: str, modified_time: int
+) -> Dict[DefinitionPath, BoundingBox]:
+    """
+    Parses a module with ast and indexes the bounding boxes of its classes and
+    functions by their nesting path. The modification time is part of the cache key.
+    """
+    with open(module_fpath) as f:
+        tree = ast.parse(f.read())
+
+    definitions: Dict[DefinitionPath, BoundingBox] = {}
+
+    def visit(node: ast.AST, path: DefinitionPath) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = (
+                    SymbolDescriptor.PyKind.Class
+                    if isinstance(child, ast.ClassDef)
+                    else SymbolDescriptor.PyKind.Method
+                )
+                child_path = path + ((kind, child.name),)
+                top_line = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                definitions.setdefault(
+                    child_path,
+                    BoundingBox(
+                        Point(top_line, child.col_offset + 1),
+                        Point((child.end_lineno or child.lineno) + 1, 0),
+                    ),
+                )
+                visit(child, child_path)
+            else:
+                visit(child, path)
+
+    visit(tree, ())
+    return definitions
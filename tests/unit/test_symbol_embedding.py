@@ -162,3 +162,27 @@ def test_get_embedding_exception(monkeypatch, mock_simple_method_symbols):
         pass
 
     assert len(cem.embedding_db.data) == 0  # Expect empty embedding map because of exception
+
+
+def test_openai_batch_embeddings_are_requested_in_chunks(monkeypatch):
+    from automata.llm.providers.openai import OpenAIEmbeddingProvider
+
+    requested_sizes = []
+
+    def get_embeddings(list_of_text, engine):
+        requested_sizes.append(len(list_of_text))
+        return [[float(text)] for text in list_of_text]
+
+    monkeypatch.setattr("openai.embeddings_utils.get_embeddings", get_embeddings)
+    monkeypatch.setattr("automata.llm.providers.openai.set_openai_api_key", lambda: None)
+
+    provider = OpenAIEmbeddingProvider()
+    symbol_sources = [
+        str(index) for index in range(2 * OpenAIEmbeddingProvider.MAX_BATCH_SIZE + 1)
+    ]
+    embeddings = provider.batch_build_embedding_vector(symbol_sources)
+
+    assert requested_sizes == [2048, 2048, 1]
+    assert [embedding[0] for embedding in embeddings] == [
+        float(source) for source in symbol_sources
+    ]
@@ -1,11 +1,31 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import networkx as nx
+import pytest
+
 from automata.context_providers.symbol_synchronization import (
     SymbolProviderSynchronizationContext,
 )
-from automata.singletons.py_module_loader import py_module_loader
+from automata.singletons.py_module_loader import ParsingStrategy, py_module_loader
 from automata.symbol.base import Symbol
-from automata.symbol.graph import SymbolGraph
+from automata.symbol.bounding_box_cache import BoundingBoxCache
+from automata.symbol.dependency_index import SymbolDependencyIndex
+from automata.symbol.federation import IndexSource, rewrite_symbol_version
+from automata.symbol.graph import GraphBuilder, SymbolGraph, SymbolGraphBackend
+from automata.symbol.index_reader import ScipIndexReader
+from automata.symbol.labeled_graph import LabeledMultiDiGraph
+from automata.symbol.parser import parse_symbol
+from automata.symbol.scip_pb2 import Index, SymbolRole  # type: ignore
+from automata.symbol.sharded_graph import ShardedSymbolGraph, partition_documents
+from automata.symbol.symbol_utils import BoundingBox, Point, get_rankable_symbols
 
 from ..utils.factories import symbol_graph_static_test  # noqa: F401
+from ..utils.factories import INDEX_PATH, describe_graph
 
 
 def test_get_all_symbols(symbol_graph_static_test):  # noqa: F811
@@ -43,3 +63,707 @@ def test_build_real_graph_and_subgraph(symbol_graph_static_test):  # noqa: F811
     assert len(subgraph) == 36
 
     py_module_loader.initialized = False
+
+
+def test_rankable_subgraphs_are_cached_per_path_filter(symbol_graph_static_test):  # noqa: F811
+    with SymbolProviderSynchronizationContext() as synchronization_context:
+        synchronization_context.register_provider(symbol_graph_static_test)
+        synchronization_context.synchronize()
+
+    py_module_loader.initialize()
+
+    subgraph = symbol_graph_static_test.get_rankable_subgraph("automata.core")
+    assert 0 < len(subgraph) <= len(symbol_graph_static_test.default_rankable_subgraph)
+    assert all(
+        source.dotpath.startswith("automata.core") or target.dotpath.startswith("automata.core")
+        for source, target in subgraph.edges()
+    )
+    assert symbol_graph_static_test.get_rankable_subgraph("automata.core") is subgraph
+
+    symbol_graph_static_test.filter_symbols(
+        symbol_graph_static_test.get_sorted_supported_symbols()
+    )
+    assert symbol_graph_static_test.get_rankable_subgraph("automata.core") is not subgraph
+
+    py_module_loader.initialized = False
+
+
+def test_symbol_graph_cache_round_trip(tmp_path, mocker):
+    built_graph = SymbolGraph(INDEX_PATH, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+
+    # The cache is loaded in a fresh interpreter, with a different hash seed
+    script = (
+        "import json, sys\n"
+        "from unittest import mock\n"
+        "from automata.symbol.base import Symbol\n"
+        "from automata.symbol.graph import SymbolGraph\n"
+        "from automata.symbol.parser import parse_symbol\n"
+        "with mock.patch('automata.symbol.graph.GraphBuilder.build_graph') as build_graph:\n"
+        "    graph = SymbolGraph(sys.argv[1], cache_dir=sys.argv[2])\n"
+        "assert not build_graph.called\n"
+        "print(json.dumps({\n"
+        "    symbol.uri: len(graph.get_references_to_symbol(parse_symbol(symbol.uri)))\n"
+        "    for symbol in graph._graph.nodes if isinstance(symbol, Symbol)\n"
+        "}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, INDEX_PATH, str(tmp_path)],
+        env={**os.environ, "PYTHONHASHSEED": "1", "PYTHONPATH": os.pathsep.join(sys.path)},
+        capture_output=True,
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    assert json.loads(result.stdout) == {
+        symbol.uri: len(built_graph.get_references_to_symbol(symbol))
+        for symbol in built_graph._graph.nodes
+        if isinstance(symbol, Symbol)
+    }
+
+    build_graph = mocker.patch("automata.symbol.graph.GraphBuilder.build_graph")
+    cached_graph = SymbolGraph(INDEX_PATH, cache_dir=str(tmp_path))
+    build_graph.assert_not_called()
+    assert set(cached_graph._graph.nodes) == set(built_graph._graph.nodes)
+    assert cached_graph._graph.number_of_edges() == built_graph._graph.number_of_edges()
+
+    # Different builder options must not reuse the same entry
+    mocker.stopall()
+    SymbolGraph(INDEX_PATH, build_caller_relationships=True, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+
+    # Caller/callee edges depend on how the bounding boxes are computed
+    for bounding_box_strategy in ParsingStrategy:
+        SymbolGraph(
+            INDEX_PATH,
+            build_caller_relationships=True,
+            bounding_box_strategy=bounding_box_strategy,
+            cache_dir=str(tmp_path),
+        )
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_bounding_boxes_are_reused_from_the_cache(tmp_path, mocker):
+    py_module_loader.initialize()
+
+    try:
+        built_graph = SymbolGraph(INDEX_PATH, cache_dir=str(tmp_path))
+        built_graph.set_synchronized(True)
+        built_graph.navigator._pre_compute_rankable_bounding_boxes()
+        assert len(built_graph.navigator.bounding_box) > 0
+
+        process_pool = mocker.patch("automata.symbol.graph.ProcessPoolExecutor")
+        cached_graph = SymbolGraph(INDEX_PATH, cache_dir=str(tmp_path))
+        cached_graph.set_synchronized(True)
+        cached_graph.navigator._pre_compute_rankable_bounding_boxes()
+        process_pool.assert_not_called()
+        assert cached_graph.navigator.bounding_box == built_graph.navigator.bounding_box
+    finally:
+        py_module_loader.initialized = False
+
+
+def test_bounding_box_cache_ignores_changed_modules(tmp_path):
+    module_fpath = tmp_path / "module.py"
+    module_fpath.write_text("def foo():\n    pass\n")
+    cache = BoundingBoxCache(str(tmp_path / "cache"))
+    bounding_boxes = {"foo": BoundingBox(Point(1, 1), Point(3, 0)), "bar": None}
+
+    content_hash = cache.get_content_hash(str(module_fpath))
+    cache.save(str(module_fpath), content_hash, ParsingStrategy.REDBARON, bounding_boxes)
+    assert cache.load(str(module_fpath), content_hash, ParsingStrategy.REDBARON) == bounding_boxes
+    assert cache.load(str(module_fpath), content_hash, ParsingStrategy.PYAST) is None
+
+    module_fpath.write_text("def foo():\n    return 1\n")
+    content_hash = cache.get_content_hash(str(module_fpath))
+    assert cache.load(str(module_fpath), content_hash, ParsingStrategy.REDBARON) is None
+
+
+def test_ast_bounding_boxes_match_redbaron(symbol_graph_static_test):  # noqa: F811
+    navigator = symbol_graph_static_test.navigator
+    symbols = get_rankable_symbols(navigator.get_sorted_supported_symbols())
+    py_module_loader.initialize()
+
+    try:
+        redbaron_boxes = navigator._compute_bounding_boxes(
+            symbols, ParsingStrategy.REDBARON, parallel=False
+        )
+        ast_boxes = navigator._compute_bounding_boxes(
+            symbols, ParsingStrategy.PYAST, parallel=False
+        )
+        assert len(redbaron_boxes) > 0
+        assert set(redbaron_boxes) <= set(ast_boxes)
+
+        for symbol, redbaron_box in redbaron_boxes.items():
+            ast_box = ast_boxes[symbol]
+            assert ast_box.top_left == redbaron_box.top_left
+            # RedBaron extends the box over the blank and comment lines which follow it
+            with open(py_module_loader.get_module_fpath_by_dotpath(symbol.module_name)) as f:
+                lines = f.read().splitlines()
+            assert ast_box.bottom_right.line <= redbaron_box.bottom_right.line
+            assert all(
+                line.strip() == "" or line.strip().startswith("#")
+                for line in lines[
+                    ast_box.bottom_right.line - 1 : redbaron_box.bottom_right.line - 1
+                ]
+            )
+    finally:
+        py_module_loader.initialized = False
+
+
+def test_parallel_build_matches_serial_build():
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+
+    serial_graph = GraphBuilder(index).build_graph()
+    parallel_graph = GraphBuilder(index, parallel=True, max_workers=2).build_graph()
+
+    def contains_edges(graph):
+        return sorted(
+            (source, target.uri)
+            for source, target, data in graph.edges(data=True)
+            if data["label"] == "contains"
+        )
+
+    assert set(parallel_graph.nodes) == set(serial_graph.nodes)
+    assert parallel_graph.number_of_edges() == serial_graph.number_of_edges()
+    assert contains_edges(parallel_graph) == contains_edges(serial_graph)
+
+
+def test_compact_backend_matches_networkx_backend(symbol_graph_static_test):  # noqa: F811
+    compact_graph = SymbolGraph(INDEX_PATH, backend=SymbolGraphBackend.COMPACT)
+
+    symbols = symbol_graph_static_test._get_sorted_supported_symbols()
+    assert compact_graph._get_sorted_supported_symbols() == symbols
+
+    for symbol in symbols[::10]:
+        assert compact_graph.get_symbol_relationships(
+            symbol
+        ) == symbol_graph_static_test.get_symbol_relationships(symbol)
+        assert compact_graph.get_references_to_symbol(
+            symbol
+        ) == symbol_graph_static_test.get_references_to_symbol(symbol)
+
+    kept_symbols = symbols[::2]
+    compact_graph.filter_symbols(kept_symbols)
+    symbol_graph_static_test.filter_symbols(kept_symbols)
+    assert compact_graph._get_sorted_supported_symbols() == kept_symbols
+    for symbol in kept_symbols[::10]:
+        assert compact_graph.get_references_to_symbol(
+            symbol
+        ) == symbol_graph_static_test.get_references_to_symbol(symbol)
+
+
+def test_apply_index_delta_keeps_filtered_symbols_out():
+    graphs = [
+        SymbolGraph(INDEX_PATH),
+        SymbolGraph(INDEX_PATH, backend=SymbolGraphBackend.COMPACT),
+    ]
+    symbols = graphs[0]._get_sorted_supported_symbols()
+    kept_symbols = symbols[::2]
+
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+    new_index = Index()
+    new_index.CopyFrom(index)
+    for occurrence in new_index.documents[7].occurrences:
+        occurrence.range[0] += 1
+    added_document = new_index.documents.add()
+    added_document.CopyFrom(index.documents[3])
+    added_document.relative_path = "automata/added_module.py"
+
+    for graph in graphs:
+        graph.filter_symbols(kept_symbols)
+        graph.apply_index_delta(new_index)
+
+    networkx_symbols, compact_symbols = (graph._get_sorted_supported_symbols() for graph in graphs)
+    assert compact_symbols == networkx_symbols
+    # Only the symbols of the processed documents can be supported again
+    changed_document_symbols = {
+        parse_symbol(symbol.symbol)
+        for document in (index.documents[3], index.documents[7])
+        for symbol in document.symbols
+    }
+    assert all(
+        symbol not in compact_symbols or symbol in changed_document_symbols
+        for symbol in symbols[1::2]
+    )
+
+
+def test_labeled_graph_index_stays_in_sync():
+    graph = LabeledMultiDiGraph()
+    graph.add_edge("module.py", "symbol_a", label="contains")
+    graph.add_edges_from(
+        [
+            ("symbol_a", "module.py", {"label": "reference"}),
+            ("symbol_b", "module.py", {"label": "reference"}),
+            ("module.py", "symbol_b", {"label": "contains"}),
+        ]
+    )
+
+    def labeled_in_edges(node, label):
+        return sorted(source for source, _, __ in graph.get_labeled_in_edges(node, label))
+
+    assert labeled_in_edges("module.py", "reference") == ["symbol_a", "symbol_b"]
+    assert labeled_in_edges("module.py", "contains") == []
+
+    graph.remove_edge("module.py", "symbol_b")
+    assert labeled_in_edges("symbol_b", "contains") == []
+
+    graph.remove_node("symbol_a")
+    assert labeled_in_edges("module.py", "reference") == ["symbol_b"]
+    assert list(graph.get_labeled_out_edges("module.py", "contains")) == []
+
+
+def test_module_reference_index_matches_linear_scan(symbol_graph_static_test):  # noqa: F811
+    compact_graph = SymbolGraph(
+        INDEX_PATH,
+        backend=SymbolGraphBackend.COMPACT,
+    )
+    module_names = sorted(
+        node for node in symbol_graph_static_test._graph.nodes if isinstance(node, str)
+    )[:10]
+
+    for module_name in module_names:
+        references = symbol_graph_static_test.navigator._get_references_to_module(module_name)
+        for start_line, end_line, start_col in [(0, 10_000, 0), (10, 40, 4), (25, 26, 0)]:
+            expected = sorted(
+                (
+                    ref
+                    for ref in references
+                    if start_line <= ref.line_number < end_line and ref.column_number >= start_col
+                ),
+                key=lambda ref: (ref.line_number, ref.column_number),
+            )
+            for graph in (symbol_graph_static_test, compact_graph):
+                assert (
+                    graph.navigator._get_module_references_in_range(
+                        module_name, start_line, end_line, start_col
+                    )
+                    == expected
+                )
+
+
+def test_bulk_dependencies_match_single_lookups(symbol_graph_static_test):  # noqa: F811
+    navigator = symbol_graph_static_test.navigator
+    symbols = [
+        symbol
+        for symbol in navigator.get_sorted_supported_symbols()
+        if not Symbol.is_local(symbol)
+    ][:200]
+
+    def make_bounding_box(start_line, start_col, end_line):
+        return SimpleNamespace(
+            top_left=SimpleNamespace(line=start_line, column=start_col),
+            bottom_right=SimpleNamespace(line=end_line, column=0),
+        )
+
+    # Overlapping and nested scopes, including empty ones
+    navigator.bounding_box = {
+        symbol: make_bounding_box(
+            1 + 7 * (i % 13), 1 + 4 * (i % 3), 1 + 7 * (i % 13) + 5 * (i % 5)
+        )
+        for i, symbol in enumerate(symbols)
+    }
+    try:
+        bulk_dependencies = symbol_graph_static_test.get_symbol_dependencies_bulk(symbols)
+        assert list(bulk_dependencies) == symbols
+        for symbol in symbols:
+            assert bulk_dependencies[symbol] == symbol_graph_static_test.get_symbol_dependencies(
+                symbol
+            )
+            assert navigator._get_symbol_references_in_scope_bulk([symbol])[
+                symbol
+            ] == navigator._get_symbol_references_in_scope(symbol)
+    finally:
+        navigator.bounding_box = {}
+
+
+def test_apply_index_delta_matches_full_build(symbol_graph_static_test):  # noqa: F811
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+    unchanged_subgraph = nx.DiGraph()
+    symbol_graph_static_test._rankable_subgraphs["automata.tools"] = unchanged_subgraph
+    assert symbol_graph_static_test.apply_index_delta(index).is_empty()
+
+    new_index = Index()
+    new_index.CopyFrom(index)
+    documents = new_index.documents
+    for occurrence in documents[7].occurrences:
+        occurrence.range[0] += 1
+    occurrences = [occurrence for i, occurrence in enumerate(documents[5].occurrences) if i % 3]
+    del documents[5].occurrences[:]
+    documents[5].occurrences.extend(occurrences)
+    del documents[9].symbols[0]
+    removed_path = documents[11].relative_path
+    del documents[11]
+    added_document = documents.add()
+    added_document.CopyFrom(index.documents[3])
+    added_document.relative_path = "automata/added_module.py"
+
+    delta = symbol_graph_static_test.apply_index_delta(new_index)
+    assert delta.added == ["automata/added_module.py"]
+    assert delta.removed == [removed_path]
+    assert len(delta.changed) == 3
+    assert symbol_graph_static_test._rankable_subgraphs == {"automata.tools": unchanged_subgraph}
+
+    assert describe_graph(symbol_graph_static_test._graph) == describe_graph(
+        GraphBuilder(new_index).build_graph()
+    )
+
+
+def test_apply_index_delta_to_index_regenerated_in_place(tmp_path, mocker):
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+    index_path = tmp_path / "index.scip"
+    index_path.write_bytes(index.SerializeToString())
+    with ScipIndexReader(str(index_path)) as reader:
+        # The documents are hashed as they are encoded, without decoding them
+        assert [
+            reader.get_document_fingerprint(position) for position in range(len(reader.documents))
+        ] == [
+            hashlib.sha256(document.SerializeToString()).hexdigest()
+            for document in index.documents
+        ]
+
+    # The records of the documents are only read once a delta is applied
+    graph = SymbolGraph(str(index_path))
+    assert graph._document_records is None
+
+    new_index = Index()
+    new_index.CopyFrom(index)
+    for occurrence in new_index.documents[7].occurrences:
+        occurrence.range[0] += 1
+    del new_index.documents[11]
+    index_path.write_bytes(new_index.SerializeToString())
+    build_graph = mocker.spy(SymbolGraph, "_build_graph")
+    delta = graph.apply_index_delta(str(index_path))
+    assert len(delta.changed) == 1 and len(delta.removed) == 1 and not delta.added
+    assert build_graph.call_count == 1
+    assert describe_graph(graph._graph) == describe_graph(GraphBuilder(new_index).build_graph())
+
+    # The records are known after the rebuild, so the next delta is applied in place
+    del new_index.documents[3]
+    index_path.write_bytes(new_index.SerializeToString())
+    delta = graph.apply_index_delta(str(index_path))
+    assert len(delta.removed) == 1 and not delta.added and not delta.changed
+    assert build_graph.call_count == 1
+    assert describe_graph(graph._graph) == describe_graph(GraphBuilder(new_index).build_graph())
+
+
+def test_index_reader_decodes_documents_lazily():
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+
+    with ScipIndexReader(INDEX_PATH) as reader:
+        assert len(reader.documents) == len(index.documents)
+        assert reader.metadata == index.metadata
+        assert list(reader.documents) == list(index.documents)
+        assert reader.get_document_paths() == [
+            document.relative_path for document in index.documents
+        ]
+        assert reader.get_document_by_path(index.documents[3].relative_path) == index.documents[3]
+        assert reader.get_document_by_path("missing.py") is None
+
+        graph = GraphBuilder(reader).build_graph()
+    assert set(graph.nodes) == set(GraphBuilder(index).build_graph().nodes)
+
+
+def test_lazy_caller_relationships_match_eager_build():
+    py_module_loader.initialize()
+
+    try:
+        eager_graph = SymbolGraph(
+            INDEX_PATH,
+            build_caller_relationships=True,
+            bounding_box_strategy=ParsingStrategy.PYAST,
+        )
+        lazy_graph = SymbolGraph(
+            INDEX_PATH,
+            lazy_caller_relationships=True,
+            bounding_box_strategy=ParsingStrategy.PYAST,
+        )
+        assert lazy_graph.navigator._module_calls == {}
+
+        for symbol in eager_graph.navigator.get_sorted_supported_symbols():
+            assert lazy_graph.get_potential_symbol_callers(
+                symbol
+            ) == eager_graph.get_potential_symbol_callers(symbol)
+            assert lazy_graph.get_potential_symbol_callees(
+                symbol
+            ) == eager_graph.get_potential_symbol_callees(symbol)
+
+        # Caller/callee edges store the role bitmask rather than a dictionary per edge
+        call_roles = [
+            data["roles"]
+            for _, __, data in eager_graph._graph.edges(data=True)
+            if data.get("label") in ("caller", "callee")
+        ]
+        assert call_roles and all(isinstance(roles, int) for roles in call_roles)
+
+        module_name = "automata/core/utils.py"
+        module_calls = lazy_graph.navigator._module_calls[module_name]
+        assert len(module_calls) > 0
+        lazy_graph.navigator.invalidate([module_name], [])
+        assert module_name not in lazy_graph.navigator._module_calls
+    finally:
+        py_module_loader.initialized = False
+
+
+def test_transitive_dependencies_match_breadth_first_search(
+    symbol_graph_static_test,  # noqa: F811
+):
+    symbols = [
+        symbol
+        for symbol in symbol_graph_static_test.navigator.get_sorted_supported_symbols()
+        if not Symbol.is_local(symbol)
+    ][:60]
+    # A chain with a cycle back to its start, and a fan-out from the end of it
+    dependencies = {symbol: {symbols[(i + 1) % 40]} for i, symbol in enumerate(symbols[:40])}
+    dependencies[symbols[39]] |= set(symbols[40:])
+    dependencies[symbols[0]].add(symbols[0])
+    dependency_index = SymbolDependencyIndex(dependencies)
+
+    expected_graph = nx.DiGraph(
+        [(symbol, target) for symbol, targets in dependencies.items() for target in targets]
+    )
+    for symbol in symbols:
+        for max_depth in (None, 1, 3):
+            for reverse, query in (
+                (False, dependency_index.get_dependencies),
+                (True, dependency_index.get_dependents),
+            ):
+                expected = nx.single_source_shortest_path_length(
+                    expected_graph.reverse() if reverse else expected_graph, symbol, max_depth
+                )
+                del expected[symbol]
+                result = query(symbol, max_depth)
+                assert result == expected
+                assert list(result.values()) == sorted(result.values())
+
+    kinds = {symbols[45].symbol_kind_by_suffix()}
+    assert all(
+        symbol.symbol_kind_by_suffix() in kinds
+        for symbol in dependency_index.get_dependencies(symbols[0], kinds=kinds)
+    )
+    assert dependency_index.get_dependents(symbols[0], 2) is not dependency_index.get_dependents(
+        symbols[0], 2
+    )
+    assert len(dependency_index._closures) == 2 * len(symbols)
+
+
+def test_transitive_dependencies_of_symbol_graph(symbol_graph_static_test):  # noqa: F811
+    with SymbolProviderSynchronizationContext() as synchronization_context:
+        synchronization_context.register_provider(symbol_graph_static_test)
+        synchronization_context.synchronize()
+
+    py_module_loader.initialize()
+
+    try:
+        supported_symbols = set(symbol_graph_static_test.get_sorted_supported_symbols())
+        rankable_symbols = get_rankable_symbols(list(supported_symbols))
+        dependency_index = symbol_graph_static_test.dependency_index
+        assert len(dependency_index) > 0
+        bulk_dependencies = symbol_graph_static_test.get_symbol_dependencies_bulk(rankable_symbols)
+        for symbol, dependencies in bulk_dependencies.items():
+            direct_dependencies = {
+                dependency
+                for dependency in dependencies
+                if dependency in supported_symbols and dependency != symbol
+            }
+            assert (
+                set(symbol_graph_static_test.get_transitive_dependencies(symbol, 1))
+                == direct_dependencies
+            )
+            for dependency in direct_dependencies:
+                assert symbol_graph_static_test.get_transitive_dependents(dependency)[symbol] == 1
+
+        symbol_graph_static_test.filter_symbols(
+            symbol_graph_static_test.get_sorted_supported_symbols()
+        )
+        assert symbol_graph_static_test.dependency_index is not dependency_index
+    finally:
+        py_module_loader.initialized = False
+
+
+def test_federated_graph_matches_single_index_build(tmp_path, mocker):
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+    package_name = "automata"
+    half = len(index.documents) // 2
+    service_index, library_index = Index(), Index()
+    service_index.documents.extend(index.documents[:half])
+    library_index.documents.extend(index.documents[half:])
+    # The library is indexed at a different version than the service references it with
+    library_index.ParseFromString(
+        library_index.SerializeToString().replace(
+            b"75482692a6fe30c72db516201a6f47d9fb4af065", b"0" * 40
+        )
+    )
+    service_path, library_path = tmp_path / "service.scip", tmp_path / "library.scip"
+    service_path.write_bytes(service_index.SerializeToString())
+    library_path.write_bytes(library_index.SerializeToString())
+
+    sources = [
+        IndexSource(str(service_path), "service"),
+        IndexSource(str(library_path), "library", package_version="1.0.0"),
+    ]
+    build_index_source_graph = mocker.spy(SymbolGraph, "_build_index_source_graph")
+    graph = SymbolGraph(sources, cache_dir=str(tmp_path / "cache"))
+    assert build_index_source_graph.call_count == 2
+
+    def get_expected_graph(*namespaced_indices):
+        expected_index = Index()
+        for namespace, source_index in namespaced_indices:
+            for document in source_index.documents:
+                expected_document = expected_index.documents.add()
+                expected_document.CopyFrom(document)
+                expected_document.relative_path = f"{namespace}/{document.relative_path}"
+        for document in expected_index.documents:
+            for occurrence in document.occurrences:
+                occurrence.symbol = rewrite_symbol_version(
+                    occurrence.symbol, {package_name: "1.0.0"}
+                )
+            for symbol_information in document.symbols:
+                symbol_information.symbol = rewrite_symbol_version(
+                    symbol_information.symbol, {package_name: "1.0.0"}
+                )
+                for relationship in symbol_information.relationships:
+                    relationship.symbol = rewrite_symbol_version(
+                        relationship.symbol, {package_name: "1.0.0"}
+                    )
+        return GraphBuilder(expected_index).build_graph()
+
+    assert describe_graph(graph._graph) == describe_graph(
+        get_expected_graph(("service", service_index), ("library", library_index))
+    )
+    assert all(
+        symbol.package.version == "1.0.0"
+        for symbol in graph._graph.nodes
+        if isinstance(symbol, Symbol)
+        and not Symbol.is_local(symbol)
+        and symbol.package.name == package_name
+    )
+
+    # Reloading reuses both cached indices, and updating one leaves the other untouched
+    SymbolGraph(sources, cache_dir=str(tmp_path / "cache"))
+    assert build_index_source_graph.call_count == 2
+    del library_index.documents[0]
+    updated_library_path = tmp_path / "updated_library.scip"
+    updated_library_path.write_bytes(library_index.SerializeToString())
+    sources[1] = IndexSource(str(updated_library_path), "library", package_version="1.0.0")
+    load_federated_graph = mocker.spy(SymbolGraph, "_load_federated_graph")
+    delta = graph.update_index_source(sources[1])
+    assert len(delta.removed) == 1 and not delta.added and not delta.changed
+    assert load_federated_graph.call_count == 0
+    assert describe_graph(graph._graph) == describe_graph(
+        get_expected_graph(("service", service_index), ("library", library_index))
+    )
+    SymbolGraph(sources, cache_dir=str(tmp_path / "cache"))
+    assert build_index_source_graph.call_count == 3
+
+    with pytest.raises(ValueError):
+        graph.apply_index_delta(index)
+    with pytest.raises(ValueError):
+        SymbolGraph([IndexSource(str(service_path), "a/b")])
+
+
+def test_partition_documents_keeps_packages_together():
+    paths = ["a/x/1.py", "a/y/1.py", "a/x/2.py", "b/1.py", "a/x/3.py", "setup.py"]
+    assert partition_documents(paths, 2) == [[0, 1, 2, 4], [3, 5]]
+    assert partition_documents(paths, 3, package_depth=2) == [[0, 2, 4], [3, 5], [1]]
+    assert partition_documents(paths, 10) == [[0, 1, 2, 4], [5], [3]]
+
+    # A single top-level package is split at the first directory level which splits it
+    package_paths = ["pkg/a/1.py", "pkg/b/1.py", "pkg/a/2.py", "pkg/1.py", "setup.py"]
+    assert partition_documents(package_paths, 2) == [[0, 1, 2], [3, 4]]
+    assert partition_documents(package_paths, 1) == [[0, 1, 2, 3, 4]]
+    # Documents which no directory level splits are split by count
+    flat_paths = ["pkg/1.py", "pkg/2.py", "pkg/3.py", "pkg/4.py", "setup.py"]
+    assert partition_documents(flat_paths, 2) == [[0, 1, 2], [3, 4]]
+
+
+def test_sharded_graph_matches_symbol_graph(symbol_graph_static_test):  # noqa: F811
+    with ShardedSymbolGraph(INDEX_PATH, shard_count=3, package_depth=2) as sharded_graph:
+        assert len(sharded_graph.shards) == 3
+        for graph in (symbol_graph_static_test, sharded_graph):
+            with SymbolProviderSynchronizationContext() as synchronization_context:
+                synchronization_context.register_provider(graph)
+                synchronization_context.synchronize()
+
+        supported_symbols = symbol_graph_static_test.get_sorted_supported_symbols()
+        assert sharded_graph.get_sorted_supported_symbols() == supported_symbols
+        for symbol in supported_symbols[::10]:
+            assert sharded_graph.get_references_to_symbol(
+                symbol
+            ) == symbol_graph_static_test.get_references_to_symbol(symbol)
+            assert sharded_graph.get_symbol_relationships(
+                symbol
+            ) == symbol_graph_static_test.get_symbol_relationships(symbol)
+
+        py_module_loader.initialize()
+        try:
+            assert set(sharded_graph.default_rankable_subgraph.edges()) == set(
+                symbol_graph_static_test.default_rankable_subgraph.edges()
+            )
+        finally:
+            py_module_loader.initialized = False
+
+        with pytest.raises(nx.NetworkXError):
+            sharded_graph.get_references_to_symbol(parse_symbol("local missing"))
+
+
+def test_sharded_graph_routes_symbols_to_their_defining_shard(tmp_path):
+    index = SymbolGraph._load_index_protobuf(INDEX_PATH)
+    defining_document = next(
+        document
+        for document in index.documents
+        if document.relative_path == "automata/core/utils.py"
+    )
+    # A document of another package lists the symbols of the module before it defines them
+    new_index = Index()
+    listing_document = new_index.documents.add()
+    listing_document.relative_path = "automata/core/agent/listing.py"
+    listing_document.symbols.extend(defining_document.symbols)
+    # It also references them next to the places the module defines them
+    for occurrence in defining_document.occurrences:
+        listing_document.occurrences.add(
+            range=[occurrence.range[0], occurrence.range[1] + 1, *occurrence.range[2:]],
+            symbol=occurrence.symbol,
+            symbol_roles=occurrence.symbol_roles & ~SymbolRole.Definition,
+        )
+    new_index.documents.extend(index.documents)
+    index_path = str(tmp_path / "index.scip")
+    with open(index_path, "wb") as f:
+        f.write(new_index.SerializeToString())
+
+    symbol_graph = SymbolGraph(index_path, lazy_caller_relationships=True)
+    symbols = [
+        symbol
+        for _, symbol, __ in symbol_graph._graph.get_labeled_out_edges(
+            "automata/core/utils.py", "contains"
+        )
+        if not Symbol.is_local(symbol)
+    ]
+    py_module_loader.initialize()
+    try:
+        with ShardedSymbolGraph(index_path, shard_count=4, package_depth=3) as sharded_graph:
+            listing_shard, defining_shard = (
+                next(
+                    shard_id
+                    for shard_id, shard in enumerate(sharded_graph.shards)
+                    if position in shard
+                )
+                for position in (0, 1 + list(index.documents).index(defining_document))
+            )
+            assert listing_shard < defining_shard
+            assert all(
+                sharded_graph._get_symbol_shard(symbol) == defining_shard for symbol in symbols
+            )
+            assert sharded_graph.get_symbol_dependencies_bulk(
+                symbols
+            ) == symbol_graph.get_symbol_dependencies_bulk(symbols)
+            assert any(sharded_graph.get_symbol_dependencies(symbol) for symbol in symbols)
+            # The listing document does not contain the symbols, so none of them calls from it
+            called_symbols = set().union(
+                *symbol_graph.get_symbol_dependencies_bulk(symbols).values()
+            )
+            for symbol in called_symbols:
+                assert sharded_graph.get_potential_symbol_callers(
+                    symbol
+                ) == symbol_graph.get_potential_symbol_callers(symbol)
+            with pytest.raises(nx.NetworkXError):
+                sharded_graph.get_symbol_dependencies(parse_symbol("local missing"))
+    finally:
+        py_module_loader.initialized = False
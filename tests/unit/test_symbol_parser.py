@@ -1,4 +1,15 @@
-from automata.symbol.parser import Symbol, is_global_symbol, is_local_symbol
+import os
+import pickle
+import subprocess
+import sys
+
+from automata.symbol.base import SymbolReference
+from automata.symbol.parser import (
+    Symbol,
+    is_global_symbol,
+    is_local_symbol,
+    parse_symbol,
+)
 
 
 def test_parse_symbol(symbols):
@@ -28,3 +39,59 @@ def _unparse(symbol: Symbol):
 def test_unparse_symbol(symbols):
     for symbol in symbols:
         assert _unparse(symbol) == symbol.uri
+
+
+def test_parse_symbol_interns_symbols(symbols):
+    uri = symbols[0].uri
+    cache_info = parse_symbol.cache_info()
+
+    symbol = parse_symbol(uri)
+    assert parse_symbol(uri) is symbol
+    assert parse_symbol.cache_info().hits >= cache_info.hits + 1
+
+    # Descriptors and packages are shared between the symbols of the same module
+    sibling_uri = uri[: -len(symbol.descriptors[-1].unparse())] + "sibling()."
+    sibling = parse_symbol(sibling_uri)
+    assert sibling.package is symbol.package
+    assert sibling.descriptors[0] is symbol.descriptors[0]
+
+
+def test_symbols_and_references_are_slotted(symbols):
+    symbol = symbols[0]
+    assert not hasattr(symbol, "__dict__")
+    assert hash(symbol) == hash(symbol.uri)
+    assert symbol.dotpath == ".".join(descriptor.name for descriptor in symbol.descriptors)
+
+    reference = SymbolReference(symbol, 3, 4, {"Definition": True, "ReadAccess": False})
+    assert not hasattr(reference, "__dict__")
+    assert reference.role_mask == 1
+    assert reference.roles == {"Definition": True}
+    assert reference == SymbolReference(symbol, 3, 4, 0)
+    assert hash(reference) == hash(SymbolReference(symbol, 3, 4, 0))
+
+    restored_symbol, restored_reference = pickle.loads(pickle.dumps((symbol, reference)))
+    assert restored_symbol == symbol and restored_symbol.dotpath == symbol.dotpath
+    assert restored_reference == reference and restored_reference.roles == reference.roles
+
+
+def test_unpickled_symbols_hash_in_another_process(symbols):
+    symbol = symbols[0]
+    script = (
+        "import pickle, sys\n"
+        "from automata.symbol.parser import parse_symbol\n"
+        "symbol = pickle.loads(sys.stdin.buffer.read())\n"
+        "assert {parse_symbol(symbol.uri): True}[symbol]\n"
+        "assert symbol in {parse_symbol(symbol.uri)}\n"
+    )
+    for hash_seed in ("1", "2"):
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            input=pickle.dumps(symbol),
+            env={
+                **os.environ,
+                "PYTHONHASHSEED": hash_seed,
+                "PYTHONPATH": os.pathsep.join(sys.path),
+            },
+            capture_output=True,
+        )
+        assert result.returncode == 0, result.stderr.decode()
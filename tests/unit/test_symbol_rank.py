@@ -1,10 +1,19 @@
+import json
+import os
 import random
+import subprocess
+import sys
 
 import networkx as nx
+import numpy as np
 import pytest
 from networkx import DiGraph
 
-from automata.experimental.search.rank import SymbolRank, SymbolRankConfig
+from automata.experimental.search.rank import (
+    SymbolRank,
+    SymbolRankConfig,
+    SymbolRankEngine,
+)
 
 
 def generate_random_graph(nodes, edges):
@@ -72,3 +81,268 @@ def test_get_ranks_small_graph():
     ranks = pagerank.get_ranks()
     assert len(ranks) == 3
     assert sum(ele[1] for ele in ranks) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("personalized", [False, True])
+def test_sparse_engine_matches_python_engine(personalized):
+    random.seed(0)
+    G = generate_random_graph(50, 120)
+    for u, v in G.edges:
+        G[u][v]["weight"] = random.uniform(0.5, 2.0)
+    similarity = {node: random.random() for node in G} if personalized else None
+    dangling = {node: random.random() for node in G} if personalized else None
+    initial_weights = {node: random.random() for node in G} if personalized else None
+
+    ranks_by_engine = [
+        SymbolRank(G, SymbolRankConfig(engine=engine)).get_ranks(
+            query_to_symbol_similarity=similarity,
+            initial_weights=initial_weights,
+            dangling=dangling,
+        )
+        for engine in (SymbolRankEngine.PYTHON, SymbolRankEngine.SPARSE)
+    ]
+    python_ranks, sparse_ranks = (dict(ranks) for ranks in ranks_by_engine)
+
+    assert python_ranks.keys() == sparse_ranks.keys()
+    for node, rank in python_ranks.items():
+        assert sparse_ranks[node] == pytest.approx(rank, abs=1e-9)
+
+
+def test_transition_structure_is_reused_until_invalidated(mocker):
+    random.seed(1)
+    G = generate_random_graph(20, 40)
+    for engine in (SymbolRankEngine.PYTHON, SymbolRankEngine.SPARSE):
+        rank = SymbolRank(G.copy(), SymbolRankConfig(engine=engine))
+        prepare_graph = mocker.spy(rank, "_prepare_graph")
+        prepare_transition_structure = mocker.spy(rank, "_prepare_transition_structure")
+
+        ranks = rank.get_ranks()
+        assert rank.get_ranks() == ranks
+        assert prepare_graph.call_count + prepare_transition_structure.call_count == 1
+
+        rank.graph.add_edge(0, 19)
+        rank.graph.add_edge(19, 1)
+        assert rank.get_ranks() == ranks
+
+        rank.invalidate()
+        updated_ranks = rank.get_ranks()
+        assert prepare_graph.call_count + prepare_transition_structure.call_count == 2
+        assert updated_ranks == SymbolRank(rank.graph, SymbolRankConfig(engine=engine)).get_ranks()
+
+
+def test_get_ranks_batch_matches_get_ranks():
+    random.seed(2)
+    G = generate_random_graph(40, 100)
+    rank = SymbolRank(G, SymbolRankConfig())
+    similarities = [{node: random.random() for node in G} for _ in range(5)]
+    # The columns are in a different order than the nodes, and include a node outside the graph
+    symbols = list(reversed(list(G))) + [40]
+    matrix = np.array(
+        [[similarity.get(node, 0.5) for node in symbols] for similarity in similarities]
+    )
+
+    batch_ranks = rank.get_ranks_batch(matrix, symbols=symbols)
+    top_ranks = rank.get_ranks_batch(matrix, symbols=symbols, top_k=3)
+    assert rank.last_stats.converged and rank.last_stats.node_count == 40
+
+    assert len(batch_ranks) == len(top_ranks) == len(similarities)
+    for similarity, ranks, top in zip(similarities, batch_ranks, top_ranks):
+        expected = rank.get_ranks(query_to_symbol_similarity={**similarity, 40: 0.5})
+        assert [node for node, _ in ranks] == [node for node, _ in expected]
+        assert [score for _, score in ranks] == pytest.approx([score for _, score in expected])
+        assert top == ranks[:3]
+
+    with pytest.raises(nx.NetworkXError):
+        rank.get_ranks_batch(matrix[:, 1:], symbols=symbols[1:])
+
+    # A query without any similarity gets the ranks of a uniform personalization
+    zero_ranks = rank.get_ranks_batch(np.vstack([matrix[0], np.zeros(len(symbols))]), symbols)
+    uniform_ranks = rank.get_ranks(query_to_symbol_similarity={node: 0.0 for node in symbols})
+    assert not np.isnan([score for _, score in zero_ranks[1]]).any()
+    assert [node for node, _ in zero_ranks[1]] == [node for node, _ in uniform_ranks]
+    assert [score for _, score in zero_ranks[1]] == pytest.approx(
+        [score for _, score in uniform_ranks]
+    )
+
+
+def test_warm_start_after_graph_updates():
+    random.seed(3)
+    G = generate_random_graph(200, 800)
+    similarity = {node: random.random() for node in G}
+    removed_edges = list(G.edges)[:3]
+    added_edges = [(0, 199), (5, 17)]
+    updated_G = G.copy()
+    updated_G.add_edges_from(added_edges)
+    updated_G.remove_edges_from(removed_edges)
+
+    for engine in (SymbolRankEngine.PYTHON, SymbolRankEngine.SPARSE):
+        rank = SymbolRank(G.copy(), SymbolRankConfig(engine=engine))
+        rank.get_ranks(similarity, warm_start_key="query")
+        rank.update_edges(added_edges=added_edges, removed_edges=removed_edges)
+        expected = dict(
+            SymbolRank(updated_G, SymbolRankConfig(engine=engine)).get_ranks(similarity)
+        )
+        ranks = dict(rank.get_ranks(similarity, warm_start_key="query"))
+        assert ranks.keys() == expected.keys()
+        assert list(ranks.values()) == pytest.approx(list(expected.values()), abs=1e-4)
+
+    # The updated transition structure is the one a rebuild prepares
+    rebuilt_structure = SymbolRank(updated_G, SymbolRankConfig()).transition_structure
+    assert abs(rank.transition_structure.matrix - rebuilt_structure.matrix).max() < 1e-12
+    assert list(rank.transition_structure.dangling_indices) == list(
+        rebuilt_structure.dangling_indices
+    )
+
+    # A warm started query converges in a few iterations, a cold started one does not
+    rank.config.max_iterations = 4
+    with pytest.raises(nx.NetworkXError):
+        SymbolRank(updated_G, rank.config).get_ranks(similarity)
+    rank.update_edges(added_edges=[(1, 2)])
+    rank.get_ranks(similarity, warm_start_key="query")
+
+    # Nodes added to the graph start from uniform ranks
+    grown_G = rank.graph.copy()
+    grown_G.add_edge(200, 0)
+    rank.config.max_iterations = 100
+    rank.update_graph(grown_G)
+    grown_similarity = {**similarity, 200: 0.5}
+    ranks = dict(rank.get_ranks(grown_similarity, warm_start_key="query"))
+    expected = dict(SymbolRank(grown_G, SymbolRankConfig()).get_ranks(grown_similarity))
+    assert list(ranks.values()) == pytest.approx([expected[node] for node in ranks], abs=1e-4)
+
+
+def test_approximate_ranks_are_bounded_by_exact_ranks():
+    random.seed(4)
+    G = generate_random_graph(300, 900)
+    similarity = {node: random.random() ** 4 for node in G}
+    config = SymbolRankConfig(push_seed_count=len(G), tolerance=2.0e-8)
+    rank = SymbolRank(G, config)
+    exact_ranks = dict(rank.get_ranks(similarity))
+
+    for threshold in (1.0e-3, 1.0e-5):
+        rank.config.push_residual_threshold = threshold
+        approximate_ranks = rank.get_approximate_ranks(similarity, top_k=len(G))
+        error_bound = approximate_ranks[0].error_bound
+        for symbol, approximate_rank, _ in approximate_ranks:
+            assert approximate_rank - 1e-6 <= exact_ranks[symbol]
+            assert exact_ranks[symbol] <= approximate_rank + error_bound + 1e-6
+    assert error_bound < 1e-2
+    top = [symbol for symbol, _, _ in rank.get_approximate_ranks(similarity, top_k=5)]
+    assert top == [symbol for symbol, _ in rank.get_ranks(similarity)[:5]]
+
+    # With few seeds only their neighborhood is ranked
+    rank.config.push_seed_count = 1
+    seed = max(similarity, key=similarity.get)
+    approximate_ranks = rank.get_approximate_ranks(similarity, top_k=len(G))
+    assert approximate_ranks[0].symbol == seed
+    assert {symbol for symbol, _, _ in approximate_ranks} <= {seed} | nx.descendants(G, seed)
+    with pytest.raises(ValueError):
+        rank.get_approximate_ranks({"missing": 1.0})
+
+
+def test_stats_and_top_k_stability():
+    random.seed(6)
+    G = generate_random_graph(100, 300)
+    similarity = {node: random.random() for node in G}
+
+    for engine in (SymbolRankEngine.PYTHON, SymbolRankEngine.SPARSE):
+        recorded_stats = []
+        rank = SymbolRank(
+            G, SymbolRankConfig(engine=engine, tolerance=2.0e-8), recorded_stats.append
+        )
+        ranks = rank.get_ranks(similarity)
+        stats = rank.last_stats
+        assert recorded_stats == [stats]
+        assert stats.converged and not stats.top_k_stable
+        assert stats.node_count == 100 and stats.wall_time > 0
+        assert stats.iterations == len(stats.residuals)
+        assert stats.residuals[-1] < 100 * 2.0e-8 <= stats.residuals[-2]
+
+        rank.config.top_k_stability = 5
+        rank.config.top_k_stability_iterations = 2
+        stable_ranks = rank.get_ranks(similarity)
+        assert rank.last_stats.top_k_stable and not rank.last_stats.converged
+        assert rank.last_stats.iterations < stats.iterations
+        assert [node for node, _ in stable_ranks[:5]] == [node for node, _ in ranks[:5]]
+
+        rank.config.top_k_stability = None
+        rank.config.max_iterations = 2
+        with pytest.raises(nx.NetworkXError):
+            rank.get_ranks(similarity)
+        assert rank.last_stats.iterations == 2 and not rank.last_stats.converged
+        assert len(recorded_stats) == 3
+
+    with pytest.raises(ValueError):
+        SymbolRankConfig.validate_config(SymbolRankConfig(top_k_stability=0))
+
+
+def test_global_ranks_are_cached_and_persisted(mocker, tmp_path):
+    random.seed(7)
+    G = generate_random_graph(50, 150)
+    rank = SymbolRank(G, SymbolRankConfig(), global_rank_dir=str(tmp_path))
+    get_ranks = mocker.spy(rank, "get_ranks")
+
+    assert rank.get_cached_global_ranks() is None
+    global_ranks = rank.get_global_ranks()
+    assert rank.get_global_ranks() is global_ranks
+    assert get_ranks.call_count == 1
+    assert global_ranks == SymbolRank(G, SymbolRankConfig()).get_ranks()
+    assert rank.get_global_rank(global_ranks[0][0]) == global_ranks[0][1]
+    assert rank.get_global_rank("missing") == 0.0
+
+    # Another instance loads the persisted ranks of the same graph
+    loaded_rank = SymbolRank(G, SymbolRankConfig(), global_rank_dir=str(tmp_path))
+    loaded_get_ranks = mocker.spy(loaded_rank, "get_ranks")
+    assert loaded_rank.get_cached_global_ranks() == global_ranks
+    assert loaded_rank.get_global_ranks() == global_ranks
+    assert loaded_get_ranks.call_count == 0
+
+    # Ranks persisted with other options of the config are not used
+    for config in (
+        SymbolRankConfig(max_iterations=50),
+        SymbolRankConfig(engine=SymbolRankEngine.PYTHON),
+        SymbolRankConfig(top_k_stability=5),
+    ):
+        assert (
+            SymbolRank(G, config, global_rank_dir=str(tmp_path)).get_cached_global_ranks() is None
+        )
+
+    # The ranks are recomputed once the graph changes
+    rank.update_edges(added_edges=[(0, 50)])
+    assert len(rank.get_global_ranks()) == 51
+    assert get_ranks.call_count == 2
+
+
+def test_persisted_global_ranks_of_symbols_load_in_another_process(tmp_path, symbols):
+    random.seed(7)
+    G = nx.relabel_nodes(
+        generate_random_graph(len(symbols), 3 * len(symbols)), dict(enumerate(symbols))
+    )
+    global_ranks = SymbolRank(
+        G, SymbolRankConfig(), global_rank_dir=str(tmp_path)
+    ).get_global_ranks()
+
+    script = (
+        "import json, sys\n"
+        "from unittest import mock\n"
+        "import networkx as nx\n"
+        "from automata.experimental.search.rank import SymbolRank, SymbolRankConfig\n"
+        "from automata.symbol.parser import parse_symbol\n"
+        "nodes, edges = json.loads(sys.stdin.read())\n"
+        "G = nx.DiGraph()\n"
+        "G.add_nodes_from(parse_symbol(uri) for uri in nodes)\n"
+        "G.add_edges_from((parse_symbol(s), parse_symbol(t)) for s, t in edges)\n"
+        "rank = SymbolRank(G, SymbolRankConfig(), global_rank_dir=sys.argv[1])\n"
+        "with mock.patch.object(rank, 'get_ranks', side_effect=AssertionError):\n"
+        "    print(json.dumps({uri: rank.get_global_rank(parse_symbol(uri)) for uri in nodes}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path)],
+        input=json.dumps(
+            [[node.uri for node in G], [[s.uri, t.uri] for s, t in G.edges]]
+        ).encode(),
+        env={**os.environ, "PYTHONHASHSEED": "1", "PYTHONPATH": os.pathsep.join(sys.path)},
+        capture_output=True,
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    assert json.loads(result.stdout) == {symbol.uri: rank for symbol, rank in global_ranks}
@@ -0,0 +1,103 @@
+import json
+import os
+import random
+import subprocess
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from automata.experimental.search.rank import SymbolRank, SymbolRankConfig
+from automata.experimental.search.rank_basis import SymbolRankBasis
+
+from .test_symbol_rank import generate_random_graph
+
+
+@pytest.fixture
+def ranked_graph():
+    random.seed(5)
+    G = generate_random_graph(300, 900)
+    similarity = {node: random.random() ** 4 for node in G}
+    return G, similarity
+
+
+def test_basis_ranks_match_symbol_ranks(ranked_graph):
+    G, similarity = ranked_graph
+    rank = SymbolRank(G, SymbolRankConfig(rank_basis_size=len(G), tolerance=2.0e-8))
+    basis = SymbolRankBasis.build(rank)
+
+    basis_ranks = basis.get_ranks(similarity, seed_count=len(G))
+    expected_ranks = rank.get_ranks(similarity)
+    assert [node for node, _ in basis_ranks[:10]] == [node for node, _ in expected_ranks[:10]]
+    expected = dict(expected_ranks)
+    for node, basis_rank in basis_ranks:
+        assert basis_rank == pytest.approx(expected[node], abs=1e-6)
+    assert basis.get_ranks(similarity, seed_count=len(G), top_k=3) == basis_ranks[:3]
+
+
+def test_truncated_basis(ranked_graph):
+    G, similarity = ranked_graph
+    basis = SymbolRankBasis.build(SymbolRank(G, SymbolRankConfig(rank_basis_size=8)))
+
+    assert np.diff(basis.indptr).max() <= 8
+    ranks = basis.get_ranks(similarity, seed_count=16)
+    assert 0 < sum(rank for _, rank in ranks) <= 1.0
+    with pytest.raises(ValueError):
+        basis.get_ranks({"missing": 1.0}, seed_count=16)
+
+
+def test_basis_is_persisted(mocker, tmp_path, ranked_graph):
+    G, similarity = ranked_graph
+    rank = SymbolRank(G, SymbolRankConfig(rank_basis_size=32))
+    build = mocker.spy(SymbolRankBasis, "build")
+
+    basis = SymbolRankBasis.load_or_build(rank, str(tmp_path))
+    loaded_basis = SymbolRankBasis.load_or_build(rank, str(tmp_path))
+
+    assert build.call_count == 1
+    assert isinstance(loaded_basis.data, np.memmap)
+    assert loaded_basis.get_ranks(similarity, 64) == basis.get_ranks(similarity, 64)
+
+    # A different number of iterations gives a different basis
+    SymbolRankBasis.load_or_build(
+        SymbolRank(G, SymbolRankConfig(rank_basis_size=32, max_iterations=5)), str(tmp_path)
+    )
+    assert build.call_count == 2
+
+    # A different graph has a different basis
+    G.add_edge(0, len(G))
+    SymbolRankBasis.load_or_build(SymbolRank(G, rank.config), str(tmp_path))
+    assert build.call_count == 3
+
+
+def test_persisted_basis_of_symbols_loads_in_another_process(tmp_path, symbols):
+    random.seed(7)
+    G = nx.relabel_nodes(
+        generate_random_graph(len(symbols), 3 * len(symbols)), dict(enumerate(symbols))
+    )
+    basis_path = str(tmp_path / "basis")
+    SymbolRankBasis.build(SymbolRank(G, SymbolRankConfig(rank_basis_size=len(G)))).save(basis_path)
+    loaded_basis = SymbolRankBasis.load(basis_path)
+    assert loaded_basis is not None and loaded_basis.nodes == list(G)
+
+    script = (
+        "import json, sys\n"
+        "from automata.experimental.search.rank_basis import SymbolRankBasis\n"
+        "from automata.symbol.parser import parse_symbol\n"
+        "basis = SymbolRankBasis.load(sys.argv[1])\n"
+        "similarity = {parse_symbol(uri): 1.0 for uri in sys.argv[2:]}\n"
+        "ranks = basis.get_ranks(similarity, seed_count=len(similarity))\n"
+        "print(json.dumps([(symbol.uri, rank) for symbol, rank in ranks]))\n"
+    )
+    seed_uris = [symbol.uri for symbol in symbols[:3]]
+    result = subprocess.run(
+        [sys.executable, "-c", script, basis_path, *seed_uris],
+        env={**os.environ, "PYTHONHASHSEED": "1", "PYTHONPATH": os.pathsep.join(sys.path)},
+        capture_output=True,
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    expected_ranks = loaded_basis.get_ranks({symbol: 1.0 for symbol in symbols[:3]}, seed_count=3)
+    assert [tuple(rank) for rank in json.loads(result.stdout)] == [
+        (symbol.uri, pytest.approx(rank)) for symbol, rank in expected_ranks
+    ]
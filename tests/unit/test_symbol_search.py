@@ -1,8 +1,16 @@
 from unittest.mock import patch
 
+import networkx as nx
+import numpy as np
 import pytest
 
+from automata.embedding.base import EmbeddingSimilarityCalculator
+from automata.experimental.search.rank import SymbolRankConfig
+from automata.experimental.search.rank_basis import SymbolRankBasis
+from automata.experimental.search.symbol_search import SymbolSearch
+from automata.symbol.base import SymbolDescriptor
 from automata.symbol.parser import parse_symbol
+from automata.symbol_embedding.base import SymbolCodeEmbedding
 
 
 def test_retrieve_source_code_by_symbol(symbols, symbol_search):
@@ -65,3 +73,140 @@ def test_process_queries(symbols, symbol_search, symbol_graph_mock):
 
     with pytest.raises(ValueError):
         symbol_search.process_query("type:unknown query")
+
+
+def test_process_dependency_queries(symbols, symbol_search, symbol_graph_mock):
+    symbol_graph_mock.get_transitive_dependents.return_value = {symbols[1]: 1}
+    result = symbol_search.process_query("type:symbol_impact depth:2 %s" % symbols[0].uri)
+    assert result == {symbols[1]: 1}
+    symbol_graph_mock.get_transitive_dependents.assert_called_once_with(
+        parse_symbol(symbols[0].uri), 2, None
+    )
+
+    symbol_graph_mock.get_transitive_dependencies.return_value = {}
+    assert symbol_search.process_query("type:symbol_dependencies %s" % symbols[0].uri) == {}
+    symbol_graph_mock.get_transitive_dependencies.assert_called_once_with(
+        parse_symbol(symbols[0].uri), None, None
+    )
+
+    symbol_graph_mock.get_transitive_dependencies.reset_mock()
+    symbol_search.process_query(
+        "type:symbol_dependencies kind:Class,method depth:0 %s" % symbols[0].uri
+    )
+    symbol_graph_mock.get_transitive_dependencies.assert_called_once_with(
+        parse_symbol(symbols[0].uri),
+        0,
+        [SymbolDescriptor.PyKind.Class, SymbolDescriptor.PyKind.Method],
+    )
+
+    for invalid_options in ("depth:two", "depth:-1", "depth:1.5", "kind:function"):
+        with pytest.raises(ValueError):
+            symbol_search.process_query(
+                "type:symbol_impact %s %s" % (invalid_options, symbols[0].uri)
+            )
+
+    with pytest.raises(ValueError):
+        symbol_search.process_query("type:symbol_impact depth:2")
+
+
+def _create_ranked_symbol_search(mocker, symbols, symbol_graph_mock, query_vectors):
+    """Creates a SymbolSearch which ranks a chain of symbols, with random embeddings."""
+    rng = np.random.default_rng(0)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(symbols)
+    graph.add_edges_from(zip(symbols, symbols[1:]))
+    symbol_graph_mock.default_rankable_subgraph = graph
+
+    embeddings = [SymbolCodeEmbedding(symbol, "", rng.random(8)) for symbol in symbols]
+    embedding_provider = mocker.MagicMock()
+    embedding_provider.build_embedding_vector.side_effect = query_vectors.get
+    embedding_provider.batch_build_embedding_vector.side_effect = lambda queries: [
+        query_vectors[query] for query in queries
+    ]
+    embedding_handler = mocker.MagicMock()
+    embedding_handler.get_ordered_embeddings.return_value = embeddings
+
+    return SymbolSearch(
+        symbol_graph_mock,
+        SymbolRankConfig(),
+        embedding_handler,
+        EmbeddingSimilarityCalculator(embedding_provider),
+    )
+
+
+def test_symbol_rank_search_batch(mocker, symbols, symbol_graph_mock):
+    rng = np.random.default_rng(1)
+    query_vectors = {"query1": rng.random(8), "query2": rng.random(8)}
+    symbol_search = _create_ranked_symbol_search(mocker, symbols, symbol_graph_mock, query_vectors)
+    embedding_provider = symbol_search.embedding_similarity_calculator.embedding_provider
+    batch_results = symbol_search.symbol_rank_search_batch(["query1", "query2"])
+
+    embedding_provider.batch_build_embedding_vector.assert_called_once_with(["query1", "query2"])
+    for query, batch_result in zip(["query1", "query2"], batch_results):
+        result = symbol_search.symbol_rank_search(query)
+        assert [symbol for symbol, _ in batch_result] == [symbol for symbol, _ in result]
+        assert [rank for _, rank in batch_result] == pytest.approx([rank for _, rank in result])
+    (top_result,) = symbol_search.symbol_rank_search_batch(["query2"], top_k=2)
+    assert [symbol for symbol, _ in top_result] == [symbol for symbol, _ in batch_results[1][:2]]
+    assert symbol_search.symbol_rank_search_batch([]) == []
+
+
+def test_approximate_symbol_rank_search(mocker, symbols, symbol_graph_mock):
+    query_vectors = {"query": np.random.default_rng(1).random(8)}
+    symbol_search = _create_ranked_symbol_search(mocker, symbols, symbol_graph_mock, query_vectors)
+    symbol_search.symbol_rank_config.push_seed_count = len(symbols)
+    symbol_search.symbol_rank_config.push_residual_threshold = 1.0e-8
+
+    approximate_results = symbol_search.approximate_symbol_rank_search("query", top_k=3)
+    exact_results = dict(symbol_search.symbol_rank_search("query"))
+
+    assert len(approximate_results) == 3
+    for symbol, rank, error_bound in approximate_results:
+        assert rank <= exact_results[symbol] + 1e-6
+        assert exact_results[symbol] <= rank + error_bound + 1e-6
+
+
+def test_symbol_rank_search_ranks_from_a_built_basis(mocker, tmp_path, symbols, symbol_graph_mock):
+    query_vectors = {"query": np.random.default_rng(1).random(8)}
+    symbol_search = _create_ranked_symbol_search(mocker, symbols, symbol_graph_mock, query_vectors)
+    symbol_search.rank_basis_dir = str(tmp_path)
+    load_or_build = mocker.spy(SymbolRankBasis, "load_or_build")
+
+    # The basis is only built through `build_rank_basis`, not by a query
+    exact_results = symbol_search.symbol_rank_search("query")
+    assert symbol_search.symbol_rank_basis is None
+    assert load_or_build.call_count == 0
+
+    symbol_search.build_rank_basis()
+    assert symbol_search.symbol_rank_basis is not None
+    basis_results = symbol_search.symbol_rank_search("query")
+    assert load_or_build.call_count == 1
+    assert {symbol for symbol, _ in basis_results} <= {symbol for symbol, _ in exact_results}
+
+    # A basis built for a previous rankable subgraph is not used
+    symbol_graph_mock.default_rankable_subgraph = nx.DiGraph(
+        symbol_graph_mock.default_rankable_subgraph
+    )
+    assert symbol_search.symbol_rank_basis is None
+
+
+def test_ties_are_broken_by_global_rank(mocker, symbols, symbol_search):
+    global_ranks = {symbols[0]: 0.1, symbols[1]: 0.3, symbols[2]: 0.2}
+    symbol_rank = mocker.MagicMock()
+    symbol_rank.get_global_rank.side_effect = lambda symbol: global_ranks.get(symbol, 0.0)
+    symbol_search._symbol_rank = symbol_rank
+
+    ranks = [(symbols[3], 0.5), (symbols[0], 0.2), (symbols[1], 0.2), (symbols[2], 0.2)]
+    assert symbol_search._break_ties_by_global_rank(ranks) == [
+        (symbols[3], 0.5),
+        (symbols[1], 0.2),
+        (symbols[2], 0.2),
+        (symbols[0], 0.2),
+    ]
+
+    # The global ranks are not computed while searching when they were not built
+    symbol_rank.get_cached_global_ranks.return_value = None
+    symbol_rank.get_global_rank.reset_mock()
+    assert symbol_search._break_ties_by_global_rank(ranks) == ranks
+    symbol_rank.get_global_ranks.assert_not_called()
+    symbol_rank.get_global_rank.assert_not_called()
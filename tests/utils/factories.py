@@ -1,11 +1,16 @@
 import os
+from collections import Counter
+from typing import Any, Dict, Tuple
 
+import networkx as nx
 import pytest
 
 from automata.experimental.search.symbol_search import SymbolSearch
 from automata.singletons.dependency_factory import dependency_factory
 from automata.symbol.graph import SymbolGraph
 
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "index.scip")
+
 
 @pytest.fixture
 def symbol_graph_static_test() -> SymbolGraph:
@@ -17,9 +22,20 @@ def symbol_graph_static_test() -> SymbolGraph:
         This is because the graph is loading up indices that point to the actual code.
     """
     # assuming the path to a valid index protobuf file, you should replace it with your own file path
-    file_dir = os.path.dirname(os.path.abspath(__file__))
-    index_path = os.path.join(file_dir, "..", "index.scip")
-    return SymbolGraph(index_path)
+    return SymbolGraph(INDEX_PATH)
+
+
+def describe_graph(graph: nx.MultiDiGraph) -> Tuple[Dict[str, Any], Counter]:
+    """
+    Describes the nodes and edges of a graph, so that graphs built in different ways can be
+    compared regardless of the order their nodes and edges were added in
+    """
+    nodes = {str(node): data for node, data in graph.nodes(data=True)}
+    edges = Counter(
+        (str(source), str(target), repr(sorted(data.items())))
+        for source, target, data in graph.edges(data=True)
+    )
+    return nodes, edges
 
 
 @pytest.fixture